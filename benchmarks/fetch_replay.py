@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmark of the DBLP fetch layer against the replay server.
+
+Writes synthetic dblpperson records (benchmarks/scale.py SyntheticData) as
+fixtures, starts src/http_replay.py with the given latency, jitter, error rate
+and 429 throttling, and downloads every record with
+dblp_utils.get_DBLP_record from a thread pool of each --workers size. Reports
+the throughput, the records that were fetched and parse to the served record,
+and the responses by HTTP status. With --history the results are appended to
+benchmarks/fetch_replay_history.jsonl (not tracked by git).
+
+Usage:
+    python benchmarks/fetch_replay.py [--authors N] [--workers 1,4,8] [--latency S] [--jitter S]
+                                      [--error-rate P] [--rate-limit R] [--burst B] [--history]
+"""
+import sys, os
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_src = os.path.join(_root, "src")
+if _root not in sys.path: sys.path.insert(0, _root)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import contextlib
+import datetime
+import io
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from io_utils import append_jsonl
+
+HISTORY_PATH = os.path.join(_root, "benchmarks", "fetch_replay_history.jsonl")
+
+
+def write_fixtures(data, fixtures_dir: str) -> Dict[int, int]:
+    """Save the DBLP record of every synthetic author; returns {author: number of records}."""
+    import xmltodict
+    from http_replay import save_fixture
+    sizes = {}
+    for i, pid in enumerate(data.pids):
+        record = data.dblp_record(i)
+        body = xmltodict.unparse(record).encode("utf-8")
+        save_fixture(fixtures_dir, "GET", f"/pid/{pid}.xml", 200, body, {"Content-Type": "application/xml"})
+        sizes[i] = len(record["dblpperson"]["r"])
+    return sizes
+
+
+def fetch_all(dblp_utils, data, sizes: Dict[int, int], workers: int) -> Dict:
+    def fetch(i):
+        record = dblp_utils.get_DBLP_record(f"/pid/{data.pids[i]}", data.names[i], force=True)
+        if record is None:
+            return "failed"
+        r = record["dblpperson"]["r"]
+        return "ok" if len(r if isinstance(r, list) else [r]) == sizes[i] else "wrong"
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(fetch, range(data.n_authors)))
+    seconds = time.perf_counter() - start
+    return {"workers": workers, "seconds": round(seconds, 3),
+            "records_per_s": round(len(outcomes) / seconds, 1) if seconds else None,
+            "ok": outcomes.count("ok"), "failed": outcomes.count("failed"), "wrong": outcomes.count("wrong")}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--papers", type=float, default=60, help="mean number of DBLP records per author")
+    parser.add_argument("--workers", default="1,4,8", help="comma separated thread pool sizes")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429 (0: no limit)")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--history", action="store_true", help=f"append the results to {os.path.relpath(HISTORY_PATH, _root)}")
+    args = parser.parse_args(argv)
+
+    from scale import SyntheticData, git_commit
+    import dblp_utils
+    import http_replay
+
+    data = SyntheticData(args.authors, args.papers)
+    cwd = os.getcwd()
+    base = tempfile.mkdtemp(prefix="fetch_bench_")
+    results = []
+    try:
+        fixtures = os.path.join(base, "fixtures")
+        sizes = write_fixtures(data, fixtures)
+        os.chdir(base)  # get_DBLP_record writes the records under dblp/
+        for workers in [int(w) for w in args.workers.split(",")]:
+            server = http_replay.start_server(fixtures, latency=args.latency, jitter=args.jitter,
+                                              error_rate=args.error_rate, rate_limit=args.rate_limit,
+                                              burst=args.burst, seed=args.seed)
+            dblp_utils.DBLP_BASE_URL = server.url
+            try:
+                r = fetch_all(dblp_utils, data, sizes, workers)
+            finally:
+                server.shutdown()
+                server.server_close()
+            r["status"] = {str(k): v for k, v in sorted(server.stats.items())}
+            results.append(r)
+            print(f"{workers:>3} workers: {r['seconds']:.2f}s, {r['records_per_s']} records/s, "
+                  f"{r['ok']} ok, {r['failed']} failed, {r['wrong']} wrong, HTTP {r['status']}", flush=True)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(base, ignore_errors=True)
+
+    if args.history:
+        stamp = datetime.datetime.now().isoformat(timespec="seconds")
+        settings = {k: getattr(args, k) for k in ("authors", "papers", "latency", "jitter", "error_rate", "rate_limit", "burst", "seed")}
+        with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+            for r in results:
+                append_jsonl(f, {"date": stamp, "commit": git_commit(), **settings, **r})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Import-time benchmark of the entry points.
+
+Runs `python -X importtime -c "import <module>"` a few times per module in a
+fresh interpreter, takes the median cumulative import time and compares it with
+the startup budget. Heavy dependencies (pandas, matplotlib, ...) must not be
+loaded by a plain import. With --history the run is appended to
+benchmarks/import_time_history.jsonl (not tracked by git), so the startup time
+can be followed over time.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--history] [module ...]
+
+Exits with 1 if a module is over its budget or loads a heavy dependency.
+"""
+import sys, os
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_src = os.path.join(_root, "src")
+if _root not in sys.path: sys.path.insert(0, _root)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import datetime
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+from io_utils import append_jsonl
+
+# startup budget (cumulative import time, ms) of the entry points
+BUDGETS_MS = {
+    "tudometer": 200,
+    "run_every_day": 200,
+    "src.google_author_sheet": 200,
+    "src.classify_paper": 50,
+}
+# dependencies that should only be loaded by the code paths that use them
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "adjustText", "xmltodict"]
+HISTORY_PATH = os.path.join(_root, "benchmarks", "import_time_history.jsonl")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """{module: (self µs, cumulative µs)} from the -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        times[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return times
+
+
+def measure(module: str) -> Dict[str, Tuple[int, int]]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=_root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def benchmark(module: str, runs: int = 5) -> Dict:
+    totals = []
+    times = {}
+    for _ in range(runs):
+        times = measure(module)
+        totals.append(times[module][1] / 1000.0)
+    slowest = sorted(times.items(), key=lambda kv: kv[1][0], reverse=True)[:5]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "budget_ms": BUDGETS_MS.get(module),
+        "heavy": [m for m in HEAVY_MODULES if m in times],
+        "slowest": [(name, round(t[0] / 1000.0, 1)) for name, t in slowest],
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_root,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--history", action="store_true", help=f"append the results to {os.path.relpath(HISTORY_PATH, _root)}")
+    args = parser.parse_args(argv)
+
+    failed = False
+    results = []
+    for module in args.modules:
+        r = benchmark(module, args.runs)
+        results.append(r)
+        over = r["budget_ms"] is not None and r["median_ms"] > r["budget_ms"]
+        ok = not over and not r["heavy"]
+        failed |= not ok
+        budget = f"{r['budget_ms']} ms" if r["budget_ms"] is not None else "-"
+        print(f"{'✅' if ok else '❌'} {module}: {r['median_ms']} ms (min {r['min_ms']}, budget {budget})")
+        if r["heavy"]:
+            print(f"   loads heavy modules: {', '.join(r['heavy'])}")
+        print("   slowest: " + ", ".join(f"{name} {ms} ms" for name, ms in r["slowest"]))
+
+    if args.history:
+        stamp = datetime.datetime.now().isoformat(timespec="seconds")
+        commit = git_commit()
+        python = ".".join(map(str, sys.version_info[:3]))
+        with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+            for r in results:
+                append_jsonl(f, {"date": stamp, "commit": commit, "python": python,
+                                 **{k: r[k] for k in ("module", "median_ms", "min_ms", "budget_ms", "heavy")}})
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
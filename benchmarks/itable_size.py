@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Page weight benchmark of the author table (create_itable).
+
+Writes authors_table.html in html mode (every row rendered into the page) and
+in data mode (shell + columnar JSON feed, plain and gzipped) into a temporary
+directory and reports the bytes to download, the build time and a parse time
+proxy: the page parsed with html.parser vs the feed parsed with json, as the
+browser has to parse the whole page before it can show the table. In data mode
+DataTables renders only the rows of the visible page (deferRender).
+
+Usage:
+    python benchmarks/itable_size.py [--authors N] [--real]
+
+--real uses results/full_authors_data.json instead of synthetic authors.
+"""
+import sys, os
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_src = os.path.join(_root, "src")
+if _root not in sys.path: sys.path.insert(0, _root)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import random
+import tempfile
+import time
+from html.parser import HTMLParser
+from typing import Dict
+
+import create_itable
+from io_utils import read_json
+
+PAGE_LENGTH = 100  # DataTables pageLength of the table
+
+
+def synthetic_authors(n: int, seed: int = 1) -> Dict[str, Dict]:
+    """Author records with the fields used by the table and paper list tooltips like tudometer's."""
+    rnd = random.Random(seed)
+    venues = ["STOC", "FOCS", "SODA", "ICALP", "INFOCOM", "SIGCOMM", "NeurIPS", "ICML", "CVPR", "ICSE"]
+    data = {}
+    for i in range(n):
+        name = f"Author {i}"
+        rec = {
+            "dblp_author_name": name, "mtmt_name": f"Author, {i}",
+            "institution": rnd.choice(["BME", "ELTE", "SZTE", "SZTAKI", ""]),
+            "works": rnd.choice(["hungary", "abroad", "company"]), "status": "active",
+            "location": [f"Hungary {rnd.randint(1990, 2010)}-"], "category": rnd.choice(["theory", "applied"]),
+            "Career Length": rnd.randint(1, 40), "affiliations_": ["Budapest University of Technology"],
+            "mta_topic": "informatika", "Years Since PhD": rnd.randint(0, 30), "mta_tud_fokozat": "PhD",
+            "Core A* equivalent": rnd.random() * 20, "Hungarian Core A* equivalent": rnd.random() * 10,
+            "dblp_url_": f"https://dblp.org/pid/{i}/{i}", "mtmt_id_": f"https://m2.mtmt.hu/gui2/?type=authors&mode=browse&sel={10000 + i}",
+            "mta_image_": f"https://mta.hu/images/{i}.jpg" if i % 3 == 0 else "",
+            "mtmt_total_citations": rnd.randint(0, 5000),
+        }
+        for rank in ["A*", "A", "B", "C", "no_rank"]:
+            # tudometer lists the papers as "<booktitle><year> " tokens
+            papers = [f"{rnd.choice(venues)}{rnd.randint(1995, 2025)} " for _ in range(rnd.randint(0, 40))]
+            for prefix, share in [("", 1.0), ("hungarian_", 0.6), ("first_author_", 0.3)]:
+                part = papers[:int(len(papers) * share)]
+                rec[f"{prefix}paper_count{rank}"] = len(part)
+                rec[f"{prefix}papers{rank}"] = "".join(part)
+        data[name] = rec
+    return data
+
+
+class _CountingParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.rows += 1
+
+
+def _build(mode: str, data, compress=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_itable.main(data, mode=mode, compress=compress)
+            build = time.perf_counter() - t
+            files = {name: open(name, "rb").read() for name in os.listdir(tmp) if os.path.isfile(name)}
+        finally:
+            os.chdir(cwd)
+    return build, files
+
+
+def measure(data) -> Dict[str, Dict]:
+    results = {}
+
+    build, files = _build("html", data)
+    page = files["authors_table.html"]
+    parser = _CountingParser()
+    t = time.perf_counter()
+    parser.feed(page.decode("utf-8"))
+    parse = time.perf_counter() - t
+    results["html"] = {"bytes": len(page), "gzip_bytes": len(gzip.compress(page)), "build_s": build,
+                       "parse_s": parse, "rendered_rows": parser.rows}
+
+    for compress in (False, True):
+        build, files = _build("data", data, compress)
+        shell = files["authors_table.html"]
+        feed = next(v for k, v in files.items() if k.startswith(create_itable.TABLE_DATA_FILE))
+        t = time.perf_counter()
+        json.loads(gzip.decompress(feed) if compress else feed)
+        parse = time.perf_counter() - t
+        transfer = len(gzip.compress(shell)) + (len(feed) if compress else len(gzip.compress(feed)))
+        results["data+gzip" if compress else "data"] = {
+            "bytes": len(shell) + len(feed), "gzip_bytes": transfer, "build_s": build,
+            "parse_s": parse, "rendered_rows": min(PAGE_LENGTH, len(data)) + 2,
+        }
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--authors", type=int, default=700)
+    parser.add_argument("--real", action="store_true", help="use results/full_authors_data.json")
+    args = parser.parse_args(argv)
+
+    if args.real:
+        data = read_json(os.path.join(_root, "results", "full_authors_data.json"))
+    else:
+        data = synthetic_authors(args.authors)
+    print(f"{len(data)} authors")
+    results = measure(data)
+    base = results["html"]
+    print(f"{'mode':<10} {'size':>10} {'transfer':>10} {'build':>8} {'parse':>8} {'DOM rows':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['bytes'] / 1024:>8.0f}kB {r['gzip_bytes'] / 1024:>8.0f}kB "
+              f"{r['build_s']:>7.2f}s {r['parse_s']:>7.3f}s {r['rendered_rows']:>9}")
+    for mode in ("data", "data+gzip"):
+        print(f"{mode}: {base['bytes'] / results[mode]['bytes']:.1f}x smaller page weight, "
+              f"{base['parse_s'] / max(results[mode]['parse_s'], 1e-9):.1f}x faster parse")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""Scale benchmark of the classification and scoring pipeline.
+
+Generates synthetic but realistic inputs offline in a temporary directory: an
+author sheet with N researchers (Hungarian affiliations with year ranges,
+theory/applied categories), dblpperson records with a log-normal number of
+papers per author (conference and journal papers, co-authors from the sheet
+and from abroad, missing page ranges), a CORE table and MTMT records. The real
+paper lists of inputs/ are copied, so the short paper checks cost what they
+cost in the daily run.
+
+Then it times, at every scale (multiples of --authors, the size of the
+current sheet):
+    sheet          google_author_sheet.download_author_google_sheet (parsing + affiliations)
+    process_paper  classify_paper.process_paper over every DBLP record
+    count_core     tudometer.count_CORE_papers_by_author for every author
+    author_sheet   google_author_sheet.generate_author_google_sheet (cold and with the score cache)
+    charts         generate_chart.main
+The per-item steps stop after --step-seconds and report the measured rate and
+the projected time of the full scale; author_sheet is skipped when the
+projected scoring time is over the limit. With --history the results are
+appended to benchmarks/scale_history.jsonl (not tracked by git) for comparison
+between commits.
+
+Usage:
+    python benchmarks/scale.py [--scales 1,10,100] [--authors N] [--papers M] [--step-seconds S] [--history]
+"""
+import sys, os
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_src = os.path.join(_root, "src")
+if _root not in sys.path: sys.path.insert(0, _root)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import contextlib
+import csv
+import datetime
+import hashlib
+import io
+import math
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+from io_utils import append_jsonl
+
+BASE_AUTHORS = 700  # about the number of researchers in the current author sheet
+HISTORY_PATH = os.path.join(_root, "benchmarks", "scale_history.jsonl")
+RANK_HISTORY = ["CORE2008", "ERA2010", "CORE2013", "CORE2014", "CORE2017", "CORE2018", "CORE2020", "CORE2021", "CORE2023"]
+INSTITUTIONS = ["Budapest University of Technology", "Eötvös Loránd University", "University of Szeged",
+                "SZTAKI", "Alfréd Rényi Institute", "Óbuda University", "Ericsson Research Hungary"]
+PAPER_LISTS = ["regular_paper_list.txt", "short_paper_list.txt", "no_hungarian_affil_list.txt", "doi_short_paper_list.txt"]
+
+
+class SyntheticData:
+    """Deterministic synthetic inputs; the DBLP/MTMT records are generated per author on demand."""
+
+    def __init__(self, n_authors: int, papers_mean: float = 60, venues: int = 400, seed: int = 1):
+        self.n_authors = n_authors
+        self.papers_mean = papers_mean
+        self.n_venues = venues
+        self.seed = seed
+        self.pids = [f"{100 + i % 900}/{i}" for i in range(n_authors)]
+        self.names = [f"Kutató {i} Szintetikus" for i in range(n_authors)]
+
+    def core_table_rows(self) -> List[Dict]:
+        rnd = random.Random(self.seed)
+        rows = []
+        for v in range(self.n_venues):
+            base = rnd.choice(["A*", "A", "A", "B", "B", "C"])
+            history = [f"{year}_{base if rnd.random() < 0.8 else rnd.choice(['A*', 'A', 'B', 'C'])}"
+                       for year in RANK_HISTORY[rnd.randint(0, 5):]]
+            rows.append({"ID": v, "Name": f"Synthetic Conference {v}", "Acronym": f"SC{v}",
+                         "YearsListed": ", ".join(history), "dblp_venue": f"conf/sc{v}", "mta_class": rnd.randint(1, 6)})
+        return rows
+
+    def sheet_rows(self) -> List[Dict]:
+        rnd = random.Random(self.seed + 1)
+        rows = []
+        for i, name in enumerate(self.names):
+            start = rnd.randint(1985, 2020)
+            affiliations = [f"{rnd.choice(INSTITUTIONS)} - {start}-"]
+            if rnd.random() < 0.3:
+                affiliations.insert(0, f"University of Somewhere - {start - 6}-{start - 1}")
+            rows.append({
+                "Author": name, "DBLP URL": f"https://dblp.org/pid/{self.pids[i]}",
+                "MTMT id": str(10000000 + i), "MTMT name": name, "Category": rnd.choice(["theory", "applied"]),
+                "MTMT Status": "active", "Works": rnd.choice(["hungary", "hungary", "abroad", "company"]),
+                "Affiliations": "; ".join(affiliations),
+            })
+        return rows
+
+    def sheet_csv(self) -> bytes:
+        rows = self.sheet_rows()
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return out.getvalue().encode("utf-8")
+
+    def _coauthor(self, rnd: random.Random) -> Dict:
+        if rnd.random() < 0.5:
+            j = min(int(rnd.paretovariate(1.2)) - 1, self.n_authors - 1)  # prolific sheet authors co-author more
+            j = (j * 7919 + rnd.randrange(self.n_authors)) % self.n_authors if rnd.random() < 0.5 else j
+            return {"@pid": self.pids[j], "#text": self.names[j]}
+        k = rnd.randrange(50 * self.n_authors)
+        return {"@pid": f"f/{k}", "#text": f"Foreign Author {k}"}
+
+    def dblp_record(self, i: int) -> Dict:
+        """dblpperson record of author i (as cached in dblp/<name>.json)."""
+        rnd = random.Random(self.seed * 1000003 + i)
+        n = max(1, int(rnd.lognormvariate(math.log(self.papers_mean) - 0.5, 1.0)))
+        me = {"@pid": self.pids[i], "#text": self.names[i]}
+        papers = []
+        for k in range(n):
+            year = rnd.randint(1995, 2025)
+            authors = [self._coauthor(rnd) for _ in range(rnd.randint(0, 5))]
+            authors.insert(rnd.randint(0, len(authors)), me)
+            if rnd.random() < 0.35:
+                papers.append({"article": {"@key": f"journals/sj{rnd.randrange(200)}/P{i}x{k}", "author": authors,
+                                           "title": f"Synthetic journal paper {i}-{k}.", "year": str(year),
+                                           "journal": "Synthetic Journal", "pages": f"{k}-{k + 20}"}})
+                continue
+            v = min(int(rnd.paretovariate(0.8)) - 1, self.n_venues - 1)  # a few popular venues
+            first = rnd.randint(1, 900)
+            info = {"@key": f"conf/sc{v}/P{i}x{k}", "author": authors if len(authors) > 1 else authors[0],
+                    "title": f"Synthetic paper {i}-{k} on graphs.", "year": str(year), "booktitle": f"SC{v}",
+                    "crossref": f"conf/sc{v}/{year}{'w' if rnd.random() < 0.05 else ''}",
+                    "ee": f"https://doi.org/10.0/{i}.{k}", "url": f"db/conf/sc{v}/sc{v}{year}.html#P{i}x{k}"}
+            if rnd.random() < 0.9:
+                info["pages"] = f"{first}-{first + rnd.choice([1, 3, 7, 9, 11, 14])}"
+            papers.append({"inproceedings": info})
+        return {"dblpperson": {"@name": self.names[i], "@pid": self.pids[i], "@n": str(n),
+                               "person": {"author": self.names[i]}, "r": papers}}
+
+    def mtmt_record(self, i: int) -> Dict:
+        rnd = random.Random(self.seed * 7919 + i)
+        pubs = [{"otype": rnd.choice(["JournalArticle", "JournalArticle", "Chapter"]),
+                 "ratingsForSort": rnd.choice(["D1", "Q1", "Q2", "Q3", "Q4"])} for _ in range(rnd.randint(0, 60))]
+        for p in pubs[:len(pubs) // 3]:
+            p["conference"] = {"label": "Synthetic Conference"}
+        return {"author": {"citationCount": rnd.randint(0, 5000), "label": self.names[i]}, "publications": pubs}
+
+
+def _reset_state(modules):
+    """Drop the per-process state that the pipeline modules keep between calls."""
+    for name in ("classify_author", "src.classify_author"):
+        m = sys.modules.get(name)
+        if m is not None:
+            m.pid_to_name.clear()
+            m.authors_data = {}
+    for name in ("classify_paper", "src.classify_paper"):
+        m = sys.modules.get(name)
+        if m is not None:
+            m.all_authors.clear()
+            m.no_page_is_given.clear()
+            m._core_tables = None
+    modules["google_author_sheet"]._sheet_cache.clear()
+
+
+def _use_results_dir(modules, path: str):
+    """Point the modules with an absolute results/ path to the benchmark directory."""
+    modules["io_utils"].RESULTS_DIR = path
+    modules["paper_cube"].RESULTS_DIR = path
+    modules["paper_cube"].CUBE_PATH = os.path.join(path, "paper_cube.csv")
+    modules["figure_cache"].FIGURE_MANIFEST = os.path.join(path, "figure_manifest.json")
+
+
+def _step_result(done: int, total: int, seconds: float, units: int = 0, unit: str = "") -> Dict:
+    r = {"done": done, "total": total, "seconds": round(seconds, 3),
+         "projected_s": round(seconds * total / done, 2) if done else None}
+    if unit:
+        r[unit] = units
+        r[f"{unit}_per_s"] = round(units / seconds, 1) if seconds else None
+    return r
+
+
+def run_scale(modules, data: SyntheticData, workdir: str, step_seconds: float) -> Dict:
+    gas, tudometer, classify_paper = modules["google_author_sheet"], modules["tudometer"], modules["classify_paper"]
+    io_utils, dblp_utils = modules["io_utils"], modules["dblp_utils"]
+    for d in ("inputs", "results", "dblp", "mtmt"):
+        os.makedirs(os.path.join(workdir, d), exist_ok=True)
+    with open(os.path.join(workdir, "inputs", "core_table.csv"), "w", encoding="utf-8", newline="") as f:
+        rows = data.core_table_rows()
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    for name in PAPER_LISTS:
+        shutil.copy(os.path.join(_root, "inputs", name), os.path.join(workdir, "inputs", name))
+    os.chdir(workdir)
+    _reset_state(modules)
+    _use_results_dir(modules, os.path.join(workdir, "results"))
+    result = {"authors": data.n_authors}
+
+    # the sheet is served from the per-process cache of fetch_author_google_sheet, no network
+    raw = data.sheet_csv()
+    gas._sheet_cache.update({"raw_bytes": raw, "sha256": hashlib.sha256(raw).hexdigest()})
+    t = time.perf_counter()
+    authors_data = gas.download_author_google_sheet()
+    result["sheet"] = {"seconds": round(time.perf_counter() - t, 3)}
+    modules["author_directory"].get_directory(authors_data)
+    modules["classify_author"].create_pid_to_name_map(authors_data)
+
+    papers = {rank: {} for rank in ["A*", "A", "B", "C", "no_rank"]}
+    foreign_papers = {rank: {} for rank in ["A*", "A"]}
+    short_papers = {rank: {} for rank in ["A*", "A"]}
+
+    def classify(i):
+        record = data.dblp_record(i)["dblpperson"]
+        t = time.perf_counter()
+        for paper in record["r"]:
+            classify_paper.process_paper(paper, papers, "", foreign_papers, short_papers)
+        return len(record["r"]), time.perf_counter() - t
+
+    # the record generation is not timed, only the classification
+    spent, done, n_papers = 0.0, 0, 0
+    for i in range(data.n_authors):
+        n, s = classify(i)
+        spent += s
+        done += 1
+        n_papers += n
+        if spent > step_seconds:
+            break
+    result["process_paper"] = _step_result(done, data.n_authors, spent, n_papers, "papers")
+
+    spent, done = 0.0, 0
+    for i, name in enumerate(data.names):
+        record = data.dblp_record(i)
+        io_utils.write_json(os.path.join("mtmt", f"{10000000 + i}.json"), data.mtmt_record(i))
+        author = dict(authors_data[name])
+        t = time.perf_counter()
+        tudometer.count_CORE_papers_by_author(name, author, record)
+        spent += time.perf_counter() - t
+        done += 1
+        if spent > step_seconds:
+            break
+    result["count_core"] = _step_result(done, data.n_authors, spent)
+
+    projected = result["count_core"]["projected_s"] or 0
+    if projected <= step_seconds:
+        for i, name in enumerate(data.names):
+            io_utils.write_json(dblp_utils.dblp_cache_path(name), data.dblp_record(i))
+            io_utils.write_json(os.path.join("mtmt", f"{10000000 + i}.json"), data.mtmt_record(i))
+        sheet = {}
+        for run in ("cold", "cached"):
+            scored = gas.download_author_google_sheet()
+            t = time.perf_counter()
+            gas.generate_author_google_sheet(scored)
+            sheet[f"{run}_s"] = round(time.perf_counter() - t, 3)
+        result["author_sheet"] = sheet
+    else:
+        result["author_sheet"] = {"skipped": f"projected scoring time {projected:.0f}s > {step_seconds:.0f}s"}
+
+    # charts from the classified papers
+    modules["paper_cube"].save_cube(modules["paper_cube"].build_cube({"hungarian": papers, "already_abroad": foreign_papers}))
+    t = time.perf_counter()
+    try:
+        modules["generate_chart"].main()
+        result["charts"] = {"seconds": round(time.perf_counter() - t, 3)}
+    except Exception as e:
+        result["charts"] = {"seconds": round(time.perf_counter() - t, 3), "error": f"{type(e).__name__}: {e}"}
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_root,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _fmt(step: Dict) -> str:
+    if not step:
+        return "-"
+    if "skipped" in step:
+        return "skipped"
+    if "error" in step:
+        return f"{step['seconds']:.1f}s (error)"
+    if "projected_s" in step:
+        s = f"{step['projected_s']:.1f}s"
+        return s if step["done"] == step["total"] else s + "*"
+    if "cold_s" in step:
+        return f"{step['cold_s']:.1f}/{step['cached_s']:.1f}s"
+    return f"{step['seconds']:.1f}s"
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scales", default="1,10,100", help="comma separated multiples of --authors")
+    parser.add_argument("--authors", type=int, default=BASE_AUTHORS, help="authors at scale 1")
+    parser.add_argument("--papers", type=float, default=60, help="mean number of DBLP records per author")
+    parser.add_argument("--venues", type=int, default=400, help="conferences in the CORE table")
+    parser.add_argument("--step-seconds", type=float, default=60, help="time limit of one measured step")
+    parser.add_argument("--keep", action="store_true", help="keep the generated inputs (printed path)")
+    parser.add_argument("--history", action="store_true", help=f"append the results to {os.path.relpath(HISTORY_PATH, _root)}")
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    base = tempfile.mkdtemp(prefix="scale_bench_")
+    results = []
+    try:
+        os.makedirs(os.path.join(base, "init", "inputs"))
+        os.chdir(os.path.join(base, "init"))
+        for name in PAPER_LISTS:  # classify_paper reads the paper lists on import
+            shutil.copy(os.path.join(_root, "inputs", name), os.path.join("inputs", name))
+        with contextlib.redirect_stdout(io.StringIO()):
+            import io_utils, dblp_utils, classify_paper, classify_author, author_directory
+            import google_author_sheet, paper_cube, figure_cache, generate_chart
+            import tudometer
+        modules = {m.__name__.split(".")[-1]: m for m in (io_utils, dblp_utils, classify_paper, classify_author, author_directory,
+                                                          google_author_sheet, paper_cube, figure_cache, generate_chart, tudometer)}
+        for scale in [float(s) for s in args.scales.split(",")]:
+            data = SyntheticData(int(args.authors * scale), args.papers, args.venues)
+            with contextlib.redirect_stdout(io.StringIO()):
+                r = run_scale(modules, data, os.path.join(base, f"x{scale:g}"), args.step_seconds)
+            r["scale"] = scale
+            results.append(r)
+            print(f"x{scale:g}: {r['authors']} authors, sheet {_fmt(r['sheet'])}, process_paper {_fmt(r['process_paper'])} "
+                  f"({r['process_paper']['papers_per_s']} papers/s), count_core {_fmt(r['count_core'])}, "
+                  f"author_sheet {_fmt(r['author_sheet'])}, charts {_fmt(r['charts'])}", flush=True)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"Inputs kept in {base}")
+        else:
+            shutil.rmtree(base, ignore_errors=True)
+    print("* projected from the part measured in --step-seconds; author_sheet: cold/with score cache")
+
+    if args.history:
+        stamp = datetime.datetime.now().isoformat(timespec="seconds")
+        python = ".".join(map(str, sys.version_info[:3]))
+        with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+            for r in results:
+                append_jsonl(f, {"date": stamp, "commit": git_commit(), "python": python,
+                                 "papers_mean": args.papers, "venues": args.venues, **r})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
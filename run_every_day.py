@@ -1,16 +1,13 @@
 # -*- coding: utf-8 -*-
 # compatible with python 3.5
-import requests
-import re
-import xmltodict
-import json
-from collections import defaultdict
-from urllib.parse import quote
 import os
-import pandas as pd
+import threading
 from src import google_author_sheet
 from src import classify_author
+from src import author_directory
 from src import dblp_utils
+from src.io_utils import json_file, read_json, write_json
+from src import pipeline
 from src import classify_paper #import core_rank, classify_paper, process_paper, all_authors, no_page_is_given
 
 
@@ -25,7 +22,6 @@ else:
 
 #url = "https://docs.google.com/spreadsheets/d/124qQX0h0CqPZZhBJiUT7myNqonp4dLJ4uyYZTtfauZI/export?format=csv"
 
-pid_to_name = {}
 authors_data = None
 
 # central results directory for JSON/BIB outputs
@@ -42,77 +38,16 @@ def author_string(author_field):
 def get_dblp_record(author_name):
     author_safe = google_author_sheet.remove_accents(author_name).replace(" ", "_")
     file_path = os.path.join("dblp", author_safe+".json")
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                return data.get('dblpperson',{})
-            except Exception as e:
-                print("Error loading {}: {}".format(file_path,e))
+    if json_file(file_path):
+        try:
+            data = read_json(file_path)
+            return data.get('dblpperson',{})
+        except Exception as e:
+            print("Error loading {}: {}".format(file_path,e))
     else:
         print("{} not found ".format(file_path))
     return None  
 
-def create_bibtex(papers_rank, rank_name):
-    all_keywords = set()
-    author_publication_count = defaultdict(int)
-
-    # --- BibTeX rekordok generálása ---
-
-    def convert_to_latex_hungarian(text):
-        latex_map = {
-            'á': "\\'a", 'é': "\\'e", 'í': "\\'i", 'ó': "\\'o", 'ö': '\\"o', 'ő': '\\H{o}',
-            'ú': "\\'u", 'ü': '\\"u', 'ű': '\\H{u}',
-            'Á': "\\'A", 'É': "\\'E", 'Í': "\\'I", 'Ó': "\\'O", 'Ö': '\\"O', 'Ő': '\\H{O}',
-            'Ú': "\\'U", 'Ü': '\\"U', 'Ű': '\\H{U}'
-        }
-        # ensure join gets an iterable of str (not Optional[str]) by using a list comprehension
-        return ''.join([latex_map.get(c, c) or c for c in text])
-
-    def json_to_bibtex_entry(key, entry, all_keywords):
-        #global pid_to_name
-        bibkey = key.replace("conf/", "").replace("/", "")[:30]
-        authors = entry.get("authors", [])
-        author_names = []
-        for author, pid in authors:
-            author_=pid_to_name.get('/'+pid, author)
-            author_publication_count[author_] += 1
-            author_names.append(author_)
-        authors_bib = convert_to_latex_hungarian(" and ".join(author_names))
-        authors_bib = re.sub(r'\d+', '', authors_bib).strip()
-
-        bibtex = "@inproceedings{{{},\n".format(bibkey)
-        bibtex += "  author    = {{{}}},\n".format(authors_bib)
-        bibtex += "  title     = {{{}}},\n".format(entry.get('title', ''))
-        if "venue" in entry:
-            bibtex += "  booktitle = {{{}}},\n".format(entry['venue'])
-        if "year" in entry:
-            bibtex += "  year      = {},\n".format(entry['year'])
-        if "ee" in entry: 
-            bibtex += "  doi      = {{{}}},\n".format(entry['ee'])
-        if "classfiied" in entry:
-            for kw in entry["classfiied"]:
-                all_keywords.add(kw)
-            keywords = " and ".join(entry["classfiied"])
-            bibtex += "  keywords  = {{{}}}\n".format(keywords)
-        bibtex += "}"
-        return bibtex
-
-    bibtex_entries = []
-    all_keywords = set()
-
-    for key, paper in papers_rank.items():
-        bibtex_entries.append(json_to_bibtex_entry(key, paper, all_keywords))
-
-    # --- Mentés .bib fájlba ---
-    bib_out = os.path.join(RESULTS_DIR, "core{}.bib".format(rank_name))
-    with open(bib_out, "w", encoding="utf-8") as f:
-        f.write("\n\n".join(bibtex_entries))
-
-    #print(", ".join(all_keywords))
-    import sys
-    print(", ".join(all_keywords).encode(sys.stdout.encoding or "utf-8", errors="replace").decode(sys.stdout.encoding or "utf-8"))
-
 # Check for pid collisions in all_authors (same pid used for multiple names)
 def check_pid_collisions(all_authors):
     pid_to_names = {}
@@ -128,17 +63,53 @@ def check_pid_collisions(all_authors):
         for pid, names in collisions.items():
             print(" PID {} -> {}".format(pid, ", ".join(sorted(names))))
                 
-if __name__ == "__main__":
-    authors_data=google_author_sheet.download_author_google_sheet()
+RANKS = ["A*", "A", "B", "C", "no_rank"]
+_ctx_lock = threading.Lock()
+
+
+def _authors_data(ctx):
+    """The parsed author sheet; loaded here if the sheet stage did not run in this invocation."""
+    with _ctx_lock:
+        if "authors_data" not in ctx:
+            ctx["authors_data"] = google_author_sheet.download_author_google_sheet()
+            author_directory.get_directory(ctx["authors_data"])
+        return ctx["authors_data"]
+
+
+def _papers(ctx):
+    """The classified papers {rank: {key: paper}}, from results/ if the classify stage was skipped."""
+    with _ctx_lock:
+        if "papers" not in ctx:
+            ctx["papers"] = {rank: read_json(os.path.join(RESULTS_DIR, "hungarian_papers_core{}.json".format(rank.replace('*', 'star'))))
+                             for rank in RANKS}
+        return ctx["papers"]
+
+
+def _scored_authors_data(ctx):
+    """authors_data with the computed ranking fields, from results/full_authors_data.json if not computed now."""
+    with _ctx_lock:
+        if "scored_authors_data" not in ctx:
+            ctx["scored_authors_data"] = read_json(os.path.join(RESULTS_DIR, "full_authors_data.json"))
+        return ctx["scored_authors_data"]
+
+
+def stage_sheet(ctx):
+    authors_data = google_author_sheet.download_author_google_sheet()
+    ctx["authors_data"] = authors_data
 
     # check is author names are all unique
-    author_names = [google_author_sheet.remove_accents(name) for name in authors_data.keys()]
-    if len(author_names) != len(set(author_names)):
-        print("Warning: Duplicate author names found!")
+    directory = author_directory.get_directory(authors_data)
+    if directory.duplicate_names():
+        print("Warning: Duplicate author names found!", directory.duplicate_names())
+
 
+def stage_dblp(ctx):
     #step 1: perform DBLP queries
-    dblp_utils.cache_DBLP_query(authors_data,force=force)
+    dblp_utils.cache_DBLP_query(_authors_data(ctx), force=force)
+
 
+def stage_classify(ctx):
+    authors_data = _authors_data(ctx)
     classify_author.create_pid_to_name_map(authors_data)
     
     dbld_author={}
@@ -146,7 +117,7 @@ if __name__ == "__main__":
     #step 2: process papers
     search_log = ""
     papers = {}
-    for rank_name in ["A*", "A","B","C","no_rank"]:
+    for rank_name in RANKS:
         papers[rank_name] = {}
     foreign_papers = {}
     short_papers = {}
@@ -180,45 +151,134 @@ if __name__ == "__main__":
         rank_name = rank.replace('*','star')
         if foreign_papers:
             outp = os.path.join(RESULTS_DIR, 'already_abroad_papers_core{}.json'.format(rank_name))
-            with open(outp, 'w', encoding='utf-8') as f:
-                json.dump(foreign_papers.get(rank, {}), f, indent=2, ensure_ascii=False)
+            write_json(outp, foreign_papers.get(rank, {}), compress=False)
         if short_papers:
             outp = os.path.join(RESULTS_DIR, 'short_papers_core{}.json'.format(rank_name))
-            with open(outp, 'w', encoding='utf-8') as f:
-                json.dump(short_papers.get(rank, {}), f, indent=2, ensure_ascii=False)
+            write_json(outp, short_papers.get(rank, {}), compress=False)
 
-    for rank in ["A*", "A","B","C","no_rank"]:
+    for rank in RANKS:
         rank_name=rank.replace('*','star')
         # Mentés JSON a results/ könyvtárba
         outp = os.path.join(RESULTS_DIR, "hungarian_papers_core{}.json".format(rank_name))
-        with open(outp, "w", encoding="utf-8") as f:
-            json.dump(papers[rank], f, indent=2, ensure_ascii=False)
+        write_json(outp, papers[rank], compress=False)
         print("Elmentve: {} with {} papers".format(os.path.basename(outp), len(papers[rank])))
+    ctx["papers"] = papers
 
-        # Bib fájlok is results/ könyvtárba
-        create_bibtex(papers[rank], rank_name)
-        
+    # aggregated counts for the charts and LaTeX tables
+    from src import paper_cube
+    paper_cube.save_cube(paper_cube.build_cube({"hungarian": papers, "already_abroad": foreign_papers}))
 
     #check_pid_collisions(all_authors)
 
     out_auth = os.path.join(RESULTS_DIR, 'all_authors.json')
-    with open(out_auth, 'w', encoding='utf-8') as f:
-        json.dump(classify_paper.all_authors, f, indent=2, ensure_ascii=False)
+    write_json(out_auth, classify_paper.all_authors, pretty=True)
 
     out_no_page = os.path.join(RESULTS_DIR, 'papers_with_no_page.json')
-    with open(out_no_page, 'w', encoding='utf-8') as f:
-        json.dump(classify_paper.no_page_is_given, f, indent=2, ensure_ascii=False)
+    write_json(out_no_page, classify_paper.no_page_is_given, pretty=True)
 
+
+def stage_bibtex(ctx):
+    # Bib fájlok is results/ könyvtárba (egy menetben, a változatlan rekordok a cache-ből)
+    from src import bibtex_export
+    directory = author_directory.get_directory(_authors_data(ctx))  # PID -> name
+    bibtex_export.write_bibtex(_papers(ctx), directory=directory)
+
+
+def stage_search_index(ctx):
+    from src import title_search
+    directory = author_directory.get_directory(_authors_data(ctx))  # PID -> name
+    title_search.save_index(title_search.build_index(directory=directory))
+
+
+def stage_author_sheet(ctx):
+    authors_data = _authors_data(ctx)
     google_author_sheet.generate_author_google_sheet(authors_data)
+    ctx["scored_authors_data"] = authors_data
+
 
+def stage_charts(ctx):
     from src import generate_chart
     generate_chart.main()
 
+
+def stage_itable(ctx):
     from src import create_itable
-    create_itable.main(authors_data)
-    
+    # --table-data: authors_table.html loads its rows from authors_table_data.json
+    create_itable.main(_scored_authors_data(ctx), mode=table_mode)
+
+
+def stage_journal_vs_conference(ctx):
     from src import plot_author_journal_vs_conference
-    plot_author_journal_vs_conference.main(authors_data)
+    plot_author_journal_vs_conference.main(_scored_authors_data(ctx))
+
+
+table_mode = "data" if "--table-data" in sys.argv else "html"
+_sheet_csv = os.path.join("results", "author_sheet.csv")
+_paper_jsons = os.path.join("results", "hungarian_papers_core*.json")
+_full_authors = os.path.join("results", "full_authors_data.json")
+
+# The stages of the daily run; see src/pipeline.py. The inputs include the code of the stage.
+# charts and journal_vs_conference draw with matplotlib (pyplot state, figure_cache
+# process pools), which is not safe from the pipeline's worker threads: they stay serial.
+STAGES = [
+    pipeline.stage("sheet", stage_sheet, always=True, outputs=[_sheet_csv]),
+    pipeline.stage("dblp", stage_dblp, after=["sheet"], always=force,
+                   inputs=[_sheet_csv, "src/dblp_utils.py"], outputs=["dblp"]),
+    pipeline.stage("classify", stage_classify, after=["dblp"],
+                   inputs=[_sheet_csv, "dblp", "inputs", "run_every_day.py", "src/classify_paper.py",
+                           "src/classify_author.py", "src/affiliation_matcher.py", "src/paper_cube.py"],
+                   outputs=[_paper_jsons, os.path.join("results", "paper_cube.csv"), os.path.join("results", "all_authors.json")]),
+    pipeline.stage("bibtex", stage_bibtex, after=["classify"], parallel=True,
+                   inputs=[_sheet_csv, _paper_jsons, "src/bibtex_export.py"],
+                   outputs=[os.path.join("results", "core*.bib")]),
+    pipeline.stage("search_index", stage_search_index, after=["classify"], parallel=True,
+                   inputs=[_sheet_csv, _paper_jsons, "src/title_search.py"],
+                   outputs=[os.path.join("results", "title_index.pickle")]),
+    pipeline.stage("author_sheet", stage_author_sheet, after=["classify"],
+                   inputs=[_sheet_csv, "dblp", "mtmt", "inputs", "tudometer.py", "src/google_author_sheet.py",
+                           "src/classify_paper.py", "src/classify_author.py", "src/mta_att_utils.py",
+                           "src/create_author_order.py", "src/score_cache.py"],
+                   outputs=[_full_authors, "authors_data.csv"]),
+    pipeline.stage("charts", stage_charts, after=["classify"],
+                   inputs=[_sheet_csv, os.path.join("results", "paper_cube.csv"), os.path.join("inputs", "core_table.csv"),
+                           os.path.join("results", "papers_in_mtmt_*.json"), "src/generate_chart.py"],
+                   outputs=["figures"]),
+    pipeline.stage("itable", stage_itable, after=["author_sheet"], parallel=True, params={"mode": table_mode},
+                   inputs=[_full_authors, "src/create_itable.py"], outputs=["authors_table.html"]),
+    pipeline.stage("journal_vs_conference", stage_journal_vs_conference, after=["author_sheet"],
+                   inputs=[_full_authors, "src/plot_author_journal_vs_conference.py", "src/plot_dgf_journal_cvs_conference.py"],
+                   outputs=[os.path.join("results", "journal_vs_conference_plot.png")]),
+]
+
+
+def _arg_value(flag):
+    """Value of `flag value` or `flag=value` on the command line, None if not given."""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg[len(flag) + 1:]
+    return None
+
+
+if __name__ == "__main__":
+    # --only a,b: run just these stages; --from x: run x and the stages after it;
+    # --rerun: ignore the stored input hashes (see results/pipeline_state.json)
+    # --profile-stage x [--profiler pyinstrument]: profile stage x; --trace-memory: tracemalloc peaks
+    from src import run_profile
+    profiler = run_profile.RunProfiler(profile_stage=_arg_value("--profile-stage"),
+                                       profiler=_arg_value("--profiler") or "cprofile",
+                                       trace_memory="--trace-memory" in sys.argv)
+    only = _arg_value("--only")
+    try:
+        status = pipeline.run_pipeline(STAGES, {}, only=only.split(",") if only else None,
+                                       start=_arg_value("--from"), rerun="--rerun" in sys.argv, profiler=profiler)
+    finally:
+        profiler.close()
+    print("Pipeline: " + ", ".join("{} {}".format(name, st) for name, st in status.items()))
+    profiler.save(status)
+    if "failed" in status.values():
+        sys.exit(1)
     
     if False:
         import shutil
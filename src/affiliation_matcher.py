@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Affiliation matching shared by the author sheet, DBLP and tudometer.
+
+All keyword tables are compiled into a single regex; one scan of a lowercased
+affiliation string tells the (first) Hungarian institution, the BME department
+and whether the affiliation is in Hungary. Matching is plain substring matching,
+like the original keyword loops.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+#the list of hungarian research institutions (in priority order)
+institutions = {
+    "BME": ["bme", "budapest university of technology", "műegyetem"],
+    "ELTE": ["elte", "loránd eötvös", "eötvös loránd university"],
+    "SZTE": ["szte", "szegedi tudományegyetem", "university of szeged"],
+    "ÓE": ["óbudai egyetem", "obuda university"],
+    "SZTAKI": ["sztaki", "institute for computer science and control"],
+    "PPKE": ["ppke", "pázmány", "peter pazmany", "pazmany peter"],
+    "Corvinus": ["corvinus"],
+    "Rényi": ["rényi", "renyi", "alfréd rényi", "renyi alfréd", "rényi alfréd institute", "renyi institute","ranki"],
+    "Ericsson": ["ericsson", "ericsson research"],
+    "Hungary": ["mta", "hungarian", "hungary","budapest","debrecen"],
+}
+# for BME we have 3 departments
+departments = {
+    "BME-TMIT": ["bme-tmit", "department of telecommunications and media informatics","telecommunications and artificial intelligence"],
+    "BME-HIT": ["bme-hit", "department of networked systems and services"],
+    "BME-MIT": ["bme-mit", "department of measurement and information systems"]
+}
+# keywords of a Hungarian DBLP/MTMT affiliation note
+hungary_keywords = ["budapest", "hungary", "magyarország", "szeged", "egyetem", "renyi"]
+
+AffiliationMatch = namedtuple("AffiliationMatch", ["institution", "department", "hungary"])
+
+_matcher = None
+
+
+def _build_matcher():
+    """Compile the keyword tables into (regex, keyword -> tags).
+
+    The regex is an alternation inside a lookahead, longest keyword first, so
+    it reports the longest keyword starting at every position. Keywords that
+    are substrings of a longer keyword inherit its tags, which makes the result
+    the same as testing every keyword with `in`.
+    """
+    tags = {}
+    for order, (inst, keywords) in enumerate(institutions.items()):
+        for kw in keywords:
+            tags.setdefault(kw, set()).add(("institution", order, inst))
+    for order, (dep, keywords) in enumerate(departments.items()):
+        for kw in keywords:
+            tags.setdefault(kw, set()).add(("department", order, dep))
+    for kw in hungary_keywords:
+        tags.setdefault(kw, set()).add(("hungary", 0, True))
+    closure = {}
+    for kw in tags:
+        closure[kw] = frozenset().union(*(t for other, t in tags.items() if other in kw))
+    keywords = sorted(tags, key=len, reverse=True)
+    regex = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+    return regex, closure
+
+
+def reset_matcher():
+    """Rebuild the matcher after the keyword tables were changed."""
+    global _matcher
+    _matcher = None
+    match_affiliation.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def match_affiliation(text: str) -> AffiliationMatch:
+    """Return (institution, department, hungary) of an affiliation string in one scan.
+
+    institution is the first matching entry of `institutions`, department the
+    first matching entry of `departments` (None if there is none), hungary
+    tells if one of `hungary_keywords` occurs.
+    """
+    global _matcher
+    if _matcher is None:
+        _matcher = _build_matcher()
+    regex, closure = _matcher
+    found = set()
+    for m in regex.finditer(text.lower()):
+        found |= closure[m.group(1)]
+    inst = min((t for t in found if t[0] == "institution"), default=None)
+    dep = min((t for t in found if t[0] == "department"), default=None)
+    return AffiliationMatch(
+        inst[2] if inst else None,
+        dep[2] if dep else None,
+        any(t[0] == "hungary" for t in found),
+    )
+
+
+def location_of(text: str) -> str:
+    """'hungary' or 'abroad' for a DBLP/MTMT affiliation note."""
+    return "hungary" if match_affiliation(text).hungary else "abroad"
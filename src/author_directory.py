@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Author directory: hash indexes over the author sheet.
+
+Built once from authors_data (the dict produced by google_author_sheet.load_table)
+and reused for lookups by MTMT id, DBLP PID, accent-stripped name and DBLP alias,
+instead of scanning authors_data in every module.
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import threading
+from typing import Dict, Optional, Tuple
+from unidecode import unidecode
+
+
+def name_key(name: str) -> str:
+    """Normalized name key: accents removed, case folded, whitespace collapsed."""
+    return " ".join(unidecode(str(name)).lower().split())
+
+
+def pid_key(pid: str) -> str:
+    """Normalize a DBLP PID or URL to the '/xx/yyyy' form used in the sheet."""
+    pid = str(pid).strip()
+    if not pid:
+        return ""
+    pid = pid.replace("https://dblp.org/pid", "").replace("http://dblp.org/pid", "")
+    if pid.endswith(".html") or pid.endswith(".xml"):
+        pid = pid.rsplit(".", 1)[0]
+    return pid if pid.startswith("/") else "/" + pid
+
+
+def mtmt_key(mtmt_id) -> str:
+    """Normalize an MTMT id (int, str or author URL) to its digit string."""
+    mtmt_id = str(mtmt_id).strip().replace("https://m2.mtmt.hu/api/author/", "")
+    try:
+        return str(int(mtmt_id))
+    except ValueError:
+        return ""
+
+
+class AuthorDirectory:
+    """Indexes of authors_data by MTMT id, DBLP PID, name and DBLP aliases.
+
+    The records are not copied: lookups return the dicts stored in authors_data.
+    build/add/clear are serialized; build swaps in complete indexes, so lookups
+    from other threads never see a half-built directory.
+    """
+
+    def __init__(self, authors_data: Optional[Dict[str, Dict]] = None):
+        self._lock = threading.RLock()
+        self.authors_data: Dict[str, Dict] = {}
+        self.by_mtmt_id: Dict[str, str] = {}
+        self.by_pid: Dict[str, str] = {}
+        self.by_name: Dict[str, str] = {}
+        self.by_alias: Dict[str, str] = {}
+        if authors_data is not None:
+            self.build(authors_data)
+
+    def __len__(self):
+        return len(self.authors_data)
+
+    def __contains__(self, name):
+        return name in self.authors_data
+
+    def clear(self):
+        with self._lock:
+            self.authors_data = {}
+            self.by_mtmt_id = {}
+            self.by_pid = {}
+            self.by_name = {}
+            self.by_alias = {}
+
+    def build(self, authors_data: Dict[str, Dict]) -> "AuthorDirectory":
+        """(Re)build all indexes from authors_data."""
+        with self._lock:
+            fresh = AuthorDirectory()
+            for name, data in authors_data.items():
+                fresh._index(name, data)
+            self.by_mtmt_id, self.by_pid, self.by_name, self.by_alias = fresh.by_mtmt_id, fresh.by_pid, fresh.by_name, fresh.by_alias
+            # set last: get_directory treats the directory as built for authors_data from here on
+            self.authors_data = authors_data
+        return self
+
+    def add(self, name: str, data: Dict) -> None:
+        """Add or replace one author and index it."""
+        with self._lock:
+            self.authors_data[name] = data
+            self._index(name, data)
+
+    def add_aliases(self, name: str, aliases) -> None:
+        """Register extra DBLP name variants of an author (e.g. from the DBLP person record)."""
+        if isinstance(aliases, str):
+            aliases = [aliases]
+        with self._lock:
+            for alias in aliases or []:
+                if isinstance(alias, dict):
+                    alias = alias.get("#text", "")
+                key = name_key(alias)
+                if key:
+                    self.by_alias.setdefault(key, name)
+
+    def _index(self, name: str, data: Dict) -> None:
+        mtmt = mtmt_key(data.get("mtmt_id", ""))
+        if mtmt:
+            self.by_mtmt_id[mtmt] = name
+        pid = pid_key(data.get("dblp_url", ""))
+        if pid:
+            if pid in self.by_pid and self.by_pid[pid] != name:
+                print(f"Warning: Duplicate DBLP PID {pid} for authors {self.by_pid[pid]} and {name}")
+            self.by_pid[pid] = name
+        key = name_key(name)
+        if key in self.by_name and self.by_name[key] != name:
+            print(f"Warning: Duplicate author name {name} ({self.by_name[key]})")
+        self.by_name[key] = name
+        self.add_aliases(name, data.get("dblp_aliases", []))
+
+    def _entry(self, name: Optional[str]) -> Tuple[Optional[str], Optional[Dict]]:
+        if name is None or name not in self.authors_data:
+            return None, None
+        return name, self.authors_data[name]
+
+    def get_by_mtmt_id(self, mtmt_id) -> Tuple[Optional[str], Optional[Dict]]:
+        return self._entry(self.by_mtmt_id.get(mtmt_key(mtmt_id)))
+
+    def get_by_pid(self, pid) -> Tuple[Optional[str], Optional[Dict]]:
+        return self._entry(self.by_pid.get(pid_key(pid)))
+
+    def get_by_name(self, name: str, aliases: bool = True) -> Tuple[Optional[str], Optional[Dict]]:
+        """Look up by accent-insensitive name, falling back to the DBLP aliases."""
+        key = name_key(name)
+        found = self.by_name.get(key)
+        if found is None and aliases:
+            found = self.by_alias.get(key)
+        return self._entry(found)
+
+    def name_for_pid(self, pid, default: Optional[str] = None) -> Optional[str]:
+        return self.by_pid.get(pid_key(pid), default)
+
+    def pid_to_name(self) -> Dict[str, str]:
+        """The PID → sheet name map (keys have the '/' prefix)."""
+        return dict(self.by_pid)
+
+    def duplicate_names(self):
+        """Names that collide after accent stripping."""
+        seen = {}
+        for name in self.authors_data:
+            seen.setdefault(name_key(name), []).append(name)
+        return [names for names in seen.values() if len(names) > 1]
+
+
+# Shared instance of this module (see get_directory). The modules import this file
+# both as "author_directory" and "src.author_directory", so pass the directory
+# explicitly where it has to be the one built by the caller.
+directory = AuthorDirectory()
+
+
+def get_directory(authors_data: Optional[Dict[str, Dict]] = None) -> AuthorDirectory:
+    """Return the shared directory, rebuilding it if a different authors_data object is given.
+
+    Build it before starting worker threads (see tudometer.load_shared_state);
+    concurrent callers wait for a running build instead of starting another.
+    """
+    if authors_data is not None and authors_data is not directory.authors_data:
+        with directory._lock:
+            if authors_data is not directory.authors_data:
+                directory.build(authors_data)
+    return directory
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""BibTeX export of the classified papers (results/core<rank>.bib).
+
+All rank files are written in one pass over the classified papers, entry by
+entry, into temporary files that replace the old .bib files at the end.
+Rendering an entry is cheaper than hashing the paper record, so every entry is
+rendered on every run (no entry cache).
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import re
+from typing import Dict, List, Optional
+
+import author_directory
+from io_utils import RESULTS_DIR
+
+BIBTEX_RANKS = ["A*", "A", "B", "C", "no_rank"]
+
+LATEX_HUNGARIAN = str.maketrans({
+    'á': "\\'a", 'é': "\\'e", 'í': "\\'i", 'ó': "\\'o", 'ö': '\\"o', 'ő': '\\H{o}',
+    'ú': "\\'u", 'ü': '\\"u', 'ű': '\\H{u}',
+    'Á': "\\'A", 'É': "\\'E", 'Í': "\\'I", 'Ó': "\\'O", 'Ö': '\\"O', 'Ő': '\\H{O}',
+    'Ú': "\\'U", 'Ü': '\\"U', 'Ű': '\\H{U}',
+})
+_DIGITS = re.compile(r'\d+')
+
+
+def bib_path(rank: str) -> str:
+    return os.path.join(RESULTS_DIR, "core{}.bib".format(rank.replace('*', 'star')))
+
+
+def author_names(entry: Dict, directory: author_directory.AuthorDirectory) -> List[str]:
+    """Author names of a paper, with the sheet name for the known DBLP PIDs."""
+    return [directory.name_for_pid(pid, author) for author, pid in entry.get("authors", [])]
+
+
+def bibtex_entry(key: str, entry: Dict, names: List[str]) -> str:
+    """One @inproceedings entry of a classified paper."""
+    bibkey = key.replace("conf/", "").replace("/", "")[:30]
+    authors_bib = _DIGITS.sub('', " and ".join(names).translate(LATEX_HUNGARIAN)).strip()
+    lines = [
+        "@inproceedings{{{},".format(bibkey),
+        "  author    = {{{}}},".format(authors_bib),
+        "  title     = {{{}}},".format(entry.get('title', '')),
+    ]
+    if "venue" in entry:
+        lines.append("  booktitle = {{{}}},".format(entry['venue']))
+    if "year" in entry:
+        lines.append("  year      = {},".format(entry['year']))
+    if "ee" in entry:
+        lines.append("  doi      = {{{}}},".format(entry['ee']))
+    if "classfiied" in entry:
+        lines.append("  keywords  = {{{}}}".format(" and ".join(entry["classfiied"])))
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def write_bibtex(papers: Dict[str, Dict[str, Dict]], ranks: List[str] = BIBTEX_RANKS,
+                 directory: Optional[author_directory.AuthorDirectory] = None) -> Dict[str, int]:
+    """Write results/core<rank>.bib for every rank of papers ({rank: {key: paper}}).
+
+    Author names are resolved with directory (default: this module's shared one).
+    Returns the number of entries per rank.
+    """
+    directory = author_directory.get_directory() if directory is None else directory
+    counts = {}
+    keywords = {}
+    files = {}
+    try:
+        for rank in ranks:
+            files[rank] = open(bib_path(rank) + ".tmp", "w", encoding="utf-8")
+            counts[rank] = 0
+            keywords[rank] = set()
+        for rank in ranks:
+            f = files[rank]
+            for key, paper in papers.get(rank, {}).items():
+                keywords[rank].update(paper.get("classfiied", []))
+                if counts[rank]:
+                    f.write("\n\n")
+                f.write(bibtex_entry(key, paper, author_names(paper, directory)))
+                counts[rank] += 1
+    except BaseException:
+        for f in files.values():
+            f.close()
+            os.remove(f.name)
+        raise
+    for rank, f in files.items():
+        f.close()
+        os.replace(f.name, bib_path(rank))
+
+    total = sum(counts.values())
+    print("BibTeX: {} entries".format(total))
+    for rank in ranks:
+        if keywords[rank]:
+            print("core{} keywords: {}".format(rank.replace('*', 'star'), ", ".join(sorted(keywords[rank])))
+                  .encode(sys.stdout.encoding or "utf-8", errors="replace").decode(sys.stdout.encoding or "utf-8"))
+    return counts
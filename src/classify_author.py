@@ -9,12 +9,16 @@ if _parent not in sys.path: sys.path.insert(0, _parent)
 if _src not in sys.path: sys.path.insert(0, _src)
 
 from typing import Dict, Tuple
-import google_author_sheet
+from author_directory import AuthorDirectory
 
 # Shared mutable state (initialized externally)
 authors_data: Dict[str, Dict] = {}
 pid_to_name: Dict[str, str] = {}
 
+# google_author_sheet.is_year_range; google_author_sheet imports this module,
+# so it is resolved on first use (see _year_range_check)
+_is_year_range = None
+
 
 def reset_state():
     """Reset in-memory maps (useful for tests)."""
@@ -30,24 +34,16 @@ def create_pid_to_name_map(authors_data_input: Dict[str, Dict]) -> None:
     if pid_to_name:
         return
     authors_data = authors_data_input
-    for name, data in authors_data.items():
-        pid = data.get("dblp_url", "").strip()
-        if not pid:
-            continue
-        if pid in pid_to_name and pid_to_name[pid] != name:
-            print(f"Warning: Duplicate DBLP PID {pid} for authors {pid_to_name[pid]} and {name}")
-        pid_to_name[pid] = name
+    # a snapshot of this authors_data, independent of the shared directory
+    pid_to_name.update(AuthorDirectory(authors_data).pid_to_name())
 
 
-def has_worked_in_hungary(author_name: str) -> bool:
-    """Quick affiliation presence check for author."""
-    global authors_data
-    author_key = google_author_sheet.remove_accents(author_name)
-    info = authors_data.get(author_key)
-    if not info:
-        return False
-    locs = info.get("location", [])
-    return bool(locs)
+def _year_range_check():
+    global _is_year_range
+    if _is_year_range is None:
+        from google_author_sheet import is_year_range
+        _is_year_range = is_year_range
+    return _is_year_range
 
 
 def classify_author(author_name: str, pid: str, year: int) -> Dict[str, str]:
@@ -63,7 +59,7 @@ def classify_author(author_name: str, pid: str, year: int) -> Dict[str, str]:
         if author_info:
             if "location" in author_info:
                 for location in author_info["location"]:
-                    if "Hungary" in location and google_author_sheet.is_year_range(location, year):
+                    if "Hungary" in location and (_is_year_range or _year_range_check())(location, year):
                         return {
                             "location": "Hungary",
                             "institution": author_info.get("institution", "Unknown"),
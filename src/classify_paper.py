@@ -10,9 +10,7 @@ from typing import List, Tuple, Dict, Optional
 import re
 import os
 import json
-import pandas as pd
 from collections import defaultdict
-import google_author_sheet
 # Import from src to ensure we use the same module instance as run_every_day
 from src import classify_author
 
@@ -50,21 +48,83 @@ doi_short_paper_list = _load_list("doi_short_paper_list.txt")
 # Load core table and prepare two indexed variants:
 #  - core_table_by_dblp_venue: indexed by 'dblp_venue' (DBLP-style keys), expands ';'-separated lists
 #  - core_table_by_acronym: indexed by 'Acronym' (uppercased), expands ';'-separated lists
-core_table_raw = pd.read_csv(os.path.join(_inputs_dir, "core_table.csv"))
+# The tables are built on first use (see load_core_tables and __getattr__), so
+# importing this module does not read and expand the CORE table.
+CORE_TABLE_NAMES = ("core_table_raw", "core_table_by_dblp_venue", "core_table_by_acronym",
+                    "core_table", "core_table_acronym")
+_core_tables: Optional[Dict] = None
+
+
+def load_core_tables() -> Dict:
+    """Read inputs/core_table.csv and build the indexed variants (once per process)."""
+    global _core_tables
+    if _core_tables is not None:
+        return _core_tables
+    import pandas as pd
+    core_table_raw = pd.read_csv(os.path.join(_inputs_dir, "core_table.csv"))
+
+    # Normalize Acronym to uppercase for case-insensitive matching
+    if "Acronym" in core_table_raw.columns:
+        core_table_raw["Acronym"] = (
+            core_table_raw["Acronym"].fillna("").astype(str).str.upper()
+        )
+
+    # Build dblp_venue-indexed table with expansion
+    _df = core_table_raw.copy()
+    if "dblp_venue" in _df.columns:
+        expanded_rows = []
+        for _, row in _df.iterrows():
+            venues_field = row.get("dblp_venue")
+            if pd.isna(venues_field) or str(venues_field).strip() == "":
+                continue
+            for key in str(venues_field).split(";"):
+                key = key.strip()
+                if not key:
+                    continue
+                r = row.copy()
+                r["dblp_venue"] = key
+                expanded_rows.append(r)
+        if expanded_rows:
+            core_table_by_dblp_venue = pd.DataFrame(expanded_rows)
+        else:
+            core_table_by_dblp_venue = _df.copy()
+    else:
+        core_table_by_dblp_venue = _df.copy()
 
-# Normalize Acronym to uppercase for case-insensitive matching
-if "Acronym" in core_table_raw.columns:
-    core_table_raw["Acronym"] = (
-        core_table_raw["Acronym"].fillna("").astype(str).str.upper()
-    )
+    core_table_by_dblp_venue = core_table_by_dblp_venue.set_index("dblp_venue", drop=False)
 
-# Build dblp_venue-indexed table with expansion
-_df = core_table_raw.copy()
-if "dblp_venue" in _df.columns:
+    # Build Acronym-indexed table with expansion (supports ';' separated acronyms)
+    _df2 = core_table_raw.copy()
+    expanded_acr_rows = []
+    if "Acronym" in _df2.columns:
+        for _, row in _df2.iterrows():
+            acr_field = row.get("Acronym", "")
+            if pd.isna(acr_field):
+                continue
+            for ac in str(acr_field).split(";"):
+                ac = ac.strip().upper()
+                if not ac:
+                    continue
+                r = row.copy()
+                r["Acronym"] = ac
+                expanded_acr_rows.append(r)
+        if expanded_acr_rows:
+            core_table_by_acronym = pd.DataFrame(expanded_acr_rows)
+        else:
+            core_table_by_acronym = _df2.copy()
+    else:
+        core_table_by_acronym = _df2.copy()
+
+    core_table_by_acronym = core_table_by_acronym.set_index("Acronym", drop=False)
+
+    # Backward-compatible alias (historically dblp_venue indexed)
+    core_table = core_table_by_dblp_venue
+    # Expand semicolon-separated dblp_venue entries into multiple rows
+    core_table_acronym=core_table.copy()
     expanded_rows = []
-    for _, row in _df.iterrows():
-        venues_field = row.get("dblp_venue")
-        if pd.isna(venues_field) or str(venues_field).strip() == "":
+    for _, row in core_table.iterrows():
+        venues_field = row.get("Acronym")
+        if pd.isna(venues_field):
             continue
         for key in str(venues_field).split(";"):
             key = key.strip()
@@ -74,59 +134,27 @@ if "dblp_venue" in _df.columns:
             r["dblp_venue"] = key
             expanded_rows.append(r)
     if expanded_rows:
-        core_table_by_dblp_venue = pd.DataFrame(expanded_rows)
-    else:
-        core_table_by_dblp_venue = _df.copy()
-else:
-    core_table_by_dblp_venue = _df.copy()
-
-core_table_by_dblp_venue = core_table_by_dblp_venue.set_index("dblp_venue", drop=False)
-
-# Build Acronym-indexed table with expansion (supports ';' separated acronyms)
-_df2 = core_table_raw.copy()
-expanded_acr_rows = []
-if "Acronym" in _df2.columns:
-    for _, row in _df2.iterrows():
-        acr_field = row.get("Acronym", "")
-        if pd.isna(acr_field):
-            continue
-        for ac in str(acr_field).split(";"):
-            ac = ac.strip().upper()
-            if not ac:
-                continue
-            r = row.copy()
-            r["Acronym"] = ac
-            expanded_acr_rows.append(r)
-    if expanded_acr_rows:
-        core_table_by_acronym = pd.DataFrame(expanded_acr_rows)
-    else:
-        core_table_by_acronym = _df2.copy()
-else:
-    core_table_by_acronym = _df2.copy()
-
-core_table_by_acronym = core_table_by_acronym.set_index("Acronym", drop=False)
-
-# Backward-compatible alias (historically dblp_venue indexed)
-core_table = core_table_by_dblp_venue
-# Expand semicolon-separated dblp_venue entries into multiple rows
-core_table_acronym=core_table.copy()
-expanded_rows = []
-for _, row in core_table.iterrows():
-    venues_field = row.get("Acronym")
-    if pd.isna(venues_field):
-        continue
-    for key in str(venues_field).split(";"):
-        key = key.strip()
-        if not key:
-            continue
-        r = row.copy()
-        r["dblp_venue"] = key
-        expanded_rows.append(r)
-if expanded_rows:
-    core_table = pd.DataFrame(expanded_rows)
+        core_table = pd.DataFrame(expanded_rows)
+
+    # Index by dblp_venue for fast lookup using DBLP-style venue keys
+    core_table = core_table.set_index("dblp_venue", drop=False)
+
+    _core_tables = {
+        "core_table_raw": core_table_raw,
+        "core_table_by_dblp_venue": core_table_by_dblp_venue,
+        "core_table_by_acronym": core_table_by_acronym,
+        "core_table": core_table,
+        "core_table_acronym": core_table_acronym,
+    }
+    return _core_tables
+
+
+def __getattr__(name):
+    # classify_paper.core_table_by_acronym etc. build the tables on first access
+    if name in CORE_TABLE_NAMES:
+        return load_core_tables()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Index by dblp_venue for fast lookup using DBLP-style venue keys
-core_table = core_table.set_index("dblp_venue", drop=False)
 
 all_authors: List[Tuple[str, str]] = []
 no_page_is_given: List[str] = []
@@ -142,6 +170,8 @@ def remove_numbers_and_parentheses(text: str) -> str:
 
 
 def core_rank_old(venue: str, pub_year: int) -> str:
+    import pandas as pd
+    core_table_by_acronym = load_core_tables()["core_table_by_acronym"]
     venue = remove_numbers_and_parentheses(venue).upper()
     if venue not in core_table_by_acronym.index:
         return "no_rank"
@@ -191,6 +221,10 @@ def get_core_rank(pub: dict) -> str:
     return rank
 
 def identify_conference(venue_name: str, venue_crossref, venue_dblp: str):
+    import pandas as pd
+    tables = load_core_tables()
+    core_table_by_dblp_venue = tables["core_table_by_dblp_venue"]
+    core_table_by_acronym = tables["core_table_by_acronym"]
     acronym_row = None
     short_paper=False
     
@@ -242,6 +276,7 @@ def core_rank(venue_name: str, venue_crossref, venue_dblp: str, pub_year: int) -
       - YearsListed column missing or empty
       - Unexpected format encountered
     """
+    import pandas as pd
     acronym_row, short_paper = identify_conference(venue_name, venue_crossref, venue_dblp)
     if acronym_row is None:
         return "no_rank"
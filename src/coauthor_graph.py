@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Co-authorship graph of the classified papers.
+
+Nodes are the DBLP PIDs of the authors of every classified paper (the
+results/{hungarian,already_abroad}_papers_core*.json files, as in paper_cube)
+and of results/all_authors.json. Two scipy.sparse CSR adjacency matrices are
+built over them: `papers` counts the joint papers, `weight` sums the CORE
+rank weights of the joint papers (the A* equivalents of tudometer). A third
+matrix, `hungarian_abroad`, holds the joint papers of an author working in
+Hungary at the time of the paper (row, see the sheet's affiliation years)
+and a co-author who was not (column).
+
+Everything stays sparse; only the institution x institution matrix is dense.
+
+Usage:
+    python src/coauthor_graph.py top <PID or name> [-n 10] [--by papers]
+    python src/coauthor_graph.py institutions [--by papers]
+    python src/coauthor_graph.py components [-n 10]
+    python src/coauthor_graph.py abroad [-n 20]
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+from author_directory import AuthorDirectory, name_key, pid_key
+from io_utils import RESULTS_DIR, json_file, read_json
+
+GRAPH_FILES = ["hungarian", "already_abroad"]
+GRAPH_RANKS = ["A*", "A", "B", "C", "no_rank"]
+# weight of a joint paper by rank: the A* equivalent weights of tudometer.count_CORE_papers_by_author
+RANK_WEIGHTS = {"A*": 1.0, "A": 1 / 2.9, "B": 1 / 4.9, "C": 1 / 9.2, "no_rank": 1 / 19.6}
+
+
+def load_papers(results_dir: str = RESULTS_DIR) -> Dict[str, Dict[str, Dict]]:
+    """{file: {rank: {key: paper}}} of the classified paper files that exist."""
+    papers = {}
+    for file in GRAPH_FILES:
+        papers[file] = {}
+        for rank in GRAPH_RANKS:
+            path = os.path.join(results_dir, "{}_papers_core{}.json".format(file, rank.replace("*", "star")))
+            papers[file][rank] = read_json(path) if json_file(path) else {}
+    return papers
+
+
+class CoauthorGraph:
+    """Sparse co-authorship matrices over PIDs with the node attributes from the author sheet."""
+
+    def __init__(self, pids: List[str], names: List[str], papers, weight, hungarian_abroad, directory: AuthorDirectory):
+        self.pids = pids
+        self.names = names
+        self.papers = papers
+        self.weight = weight
+        self.hungarian_abroad = hungarian_abroad
+        self.directory = directory
+        self.index = {pid: i for i, pid in enumerate(pids)}
+        self._by_dblp_name = {}
+        for i, name in enumerate(names):
+            self._by_dblp_name.setdefault(name_key(name), i)
+        # sheet attributes: the sheet name and institution of the PIDs in the author sheet
+        self.sheet_names = [directory.name_for_pid(pid) for pid in pids]
+        self.institutions = [(directory.authors_data[n].get("institution", "") if n else "") for n in self.sheet_names]
+
+    def __len__(self):
+        return len(self.pids)
+
+    def summary(self) -> Dict:
+        return {"authors": len(self), "edges": int(self.papers.nnz // 2),
+                "sheet_authors": sum(1 for n in self.sheet_names if n),
+                "hungarian_abroad_edges": int(self.hungarian_abroad.nnz)}
+
+    def node(self, who: str) -> Optional[int]:
+        """Node of a DBLP PID, a sheet name or a DBLP author name; None if unknown."""
+        pid = pid_key(who)
+        if pid in self.index:
+            return self.index[pid]
+        name, data = self.directory.get_by_name(who)
+        if data and pid_key(data.get("dblp_url", "")) in self.index:
+            return self.index[pid_key(data["dblp_url"])]
+        return self._by_dblp_name.get(name_key(who))
+
+    def label(self, i: int) -> str:
+        return self.sheet_names[i] or self.names[i]
+
+    def _matrix(self, by: str):
+        if by not in ("papers", "weight"):
+            raise ValueError(f"Unknown edge measure: {by} (papers or weight)")
+        return self.papers if by == "papers" else self.weight
+
+    def top_collaborators(self, who: str, n: int = 10, by: str = "weight") -> List[Dict]:
+        """The n strongest co-authors of an author; KeyError if the author is not in the graph."""
+        import numpy as np
+        i = self.node(who)
+        if i is None:
+            raise KeyError(who)
+        row = self._matrix(by).getrow(i)
+        order = np.argsort(-row.data, kind="stable")[:n]
+        papers, weight = self.papers.getrow(i), self.weight.getrow(i)
+        paper_counts = dict(zip(papers.indices.tolist(), papers.data.tolist()))
+        weights = dict(zip(weight.indices.tolist(), weight.data.tolist()))
+        return [{"pid": self.pids[j], "name": self.label(j), "institution": self.institutions[j],
+                 "papers": int(paper_counts[j]), "weight": round(weights[j], 3)}
+                for j in row.indices[order].tolist()]
+
+    def institution_matrix(self, by: str = "weight"):
+        """DataFrame of the joint papers (or weights) between the institutions of the sheet authors.
+
+        Off-diagonal cells count every co-author pair once; a paper with several
+        pairs between two institutions counts several times. The diagonal holds
+        the pairs inside an institution.
+        """
+        import numpy as np
+        import pandas as pd
+        from scipy import sparse
+        labels = sorted({inst for inst in self.institutions if inst})
+        column = {inst: k for k, inst in enumerate(labels)}
+        rows = [i for i, inst in enumerate(self.institutions) if inst]
+        membership = sparse.csr_matrix((np.ones(len(rows)), (rows, [column[self.institutions[i]] for i in rows])),
+                                       shape=(len(self), len(labels)))
+        counts = (membership.T @ self._matrix(by) @ membership).toarray()
+        counts[np.diag_indices_from(counts)] /= 2  # the symmetric matrix has both (i, j) and (j, i)
+        return pd.DataFrame(counts, index=labels, columns=labels)
+
+    def components(self) -> Tuple[int, "numpy.ndarray"]:
+        """(number of connected components, component label of every node)."""
+        from scipy.sparse.csgraph import connected_components
+        return connected_components(self.papers, directed=False)
+
+    def component_sizes(self, n: int = 10) -> List[Dict]:
+        """The n largest components with their size and number of sheet authors."""
+        import numpy as np
+        count, labels = self.components()
+        sizes = np.bincount(labels, minlength=count)
+        sheet = np.bincount(labels, weights=np.array([1.0 if s else 0.0 for s in self.sheet_names]), minlength=count)
+        order = np.argsort(-sizes, kind="stable")[:n]
+        return [{"component": int(c), "authors": int(sizes[c]), "sheet_authors": int(sheet[c])} for c in order]
+
+    def component_of(self, who: str) -> List[str]:
+        i = self.node(who)
+        if i is None:
+            raise KeyError(who)
+        _, labels = self.components()
+        return [self.label(j) for j in (labels == labels[i]).nonzero()[0].tolist()]
+
+    def hungarian_abroad_edges(self, n: int = 20) -> Dict:
+        """Totals and the n strongest pairs of an author in Hungary and a co-author abroad (by joint papers)."""
+        import numpy as np
+        ha = self.hungarian_abroad.tocoo()
+        order = np.argsort(-ha.data, kind="stable")[:n]
+        per_author = np.asarray((self.hungarian_abroad > 0).sum(axis=1)).ravel()
+        top_authors = np.argsort(-per_author, kind="stable")[:n]
+        return {"pairs": int(ha.nnz), "joint_papers": int(ha.data.sum()),
+                "hungarian_authors": int((per_author > 0).sum()),
+                "top_pairs": [{"hungarian": self.label(i), "abroad": self.label(j), "papers": int(p)}
+                              for i, j, p in zip(ha.row[order].tolist(), ha.col[order].tolist(), ha.data[order].tolist())],
+                "top_authors": [{"name": self.label(i), "abroad_coauthors": int(per_author[i])}
+                                for i in top_authors.tolist() if per_author[i]]}
+
+
+def build_graph(papers_by_file: Optional[Dict[str, Dict[str, Dict]]] = None,
+                authors_data: Optional[Dict[str, Dict]] = None,
+                results_dir: str = RESULTS_DIR) -> CoauthorGraph:
+    """Build the graph from {file: {rank: {key: paper}}} (default: the result files) and the author sheet
+    (default: results/full_authors_data.json)."""
+    import numpy as np
+    from scipy import sparse
+    from google_author_sheet import is_year_range
+
+    if papers_by_file is None:
+        papers_by_file = load_papers(results_dir)
+    if authors_data is None:
+        path = json_file(os.path.join(results_dir, "full_authors_data.json"))
+        authors_data = read_json(path) if path else {}
+    directory = AuthorDirectory(authors_data)
+
+    index: Dict[str, int] = {}
+    pids: List[str] = []
+    names: List[str] = []
+    pid_keys: Dict[str, str] = {}
+    locations: Dict[int, List[str]] = {}  # Hungarian affiliations of the sheet authors
+
+    def node(name: str, raw_pid: str) -> int:
+        pid = pid_keys.get(raw_pid)
+        if pid is None:
+            pid = pid_keys[raw_pid] = pid_key(raw_pid)
+        i = index.get(pid)
+        if i is None:
+            i = index[pid] = len(pids)
+            pids.append(pid)
+            names.append(name)
+            sheet_name = directory.name_for_pid(pid)
+            if sheet_name:
+                locations[i] = [loc for loc in authors_data[sheet_name].get("location", []) if "Hungary" in loc]
+        return i
+
+    in_hungary: Dict[Tuple[int, int], bool] = {}
+
+    def hungarian(i: int, year: int) -> bool:
+        """The author worked in Hungary in that year (as classify_author decides it)."""
+        if not locations.get(i):
+            return False
+        key = (i, year)
+        if key not in in_hungary:
+            in_hungary[key] = any(is_year_range(loc, year) for loc in locations[i])
+        return in_hungary[key]
+
+    # papers grouped by the number of authors, so the author pairs are generated with numpy
+    groups: Dict[int, Tuple[List[List[int]], List[List[bool]], List[float]]] = {}
+    for by_rank in papers_by_file.values():
+        for rank, papers in by_rank.items():
+            w = RANK_WEIGHTS[rank.replace("star", "*")]
+            for paper in (papers or {}).values():
+                ids = sorted({node(author, pid) for author, pid in paper.get("authors", []) if pid})
+                if len(ids) < 2:
+                    continue
+                try:
+                    year = int(paper.get("year"))
+                except (TypeError, ValueError):
+                    year = 0
+                ids_k, status_k, weights_k = groups.setdefault(len(ids), ([], [], []))
+                ids_k.append(ids)
+                status_k.append([hungarian(i, year) for i in ids])
+                weights_k.append(w)
+    all_authors = json_file(os.path.join(results_dir, "all_authors.json"))
+    for author, pid in (read_json(all_authors) if all_authors else []):
+        if pid:
+            node(author, pid)
+
+    rows, cols, weights, ha_rows, ha_cols = [], [], [], [], []
+    for k, (ids_k, status_k, weights_k) in groups.items():
+        first, second = np.triu_indices(k, 1)
+        ids = np.array(ids_k, dtype=np.int32)
+        status = np.array(status_k, dtype=bool)
+        r, c = ids[:, first].ravel(), ids[:, second].ravel()
+        rows.append(r)
+        cols.append(c)
+        weights.append(np.repeat(np.array(weights_k), len(first)))
+        in_r, in_c = status[:, first].ravel(), status[:, second].ravel()
+        mixed = in_r != in_c
+        ha_rows.append(np.where(in_r, r, c)[mixed])
+        ha_cols.append(np.where(in_r, c, r)[mixed])
+
+    def _concat(parts, dtype):
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    n = len(pids)
+    r, c = _concat(rows, np.int32), _concat(cols, np.int32)
+    upper_papers = sparse.coo_matrix((np.ones(len(r), dtype=np.int32), (r, c)), shape=(n, n)).tocsr()  # duplicates are summed
+    upper_weight = sparse.coo_matrix((_concat(weights, np.float64), (r, c)), shape=(n, n)).tocsr()
+    ha_r = _concat(ha_rows, np.int32)
+    hungarian_abroad = sparse.coo_matrix((np.ones(len(ha_r), dtype=np.int32), (ha_r, _concat(ha_cols, np.int32))),
+                                         shape=(n, n)).tocsr()
+    return CoauthorGraph(pids, names, (upper_papers + upper_papers.T).tocsr(), (upper_weight + upper_weight.T).tocsr(),
+                         hungarian_abroad, directory)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    top = sub.add_parser("top", help="strongest co-authors of an author")
+    top.add_argument("author", help="DBLP PID, sheet name or DBLP name")
+    top.add_argument("-n", type=int, default=10)
+    top.add_argument("--by", choices=["weight", "papers"], default="weight")
+    inst = sub.add_parser("institutions", help="institution x institution collaboration matrix")
+    inst.add_argument("--by", choices=["weight", "papers"], default="papers")
+    comp = sub.add_parser("components", help="largest connected components")
+    comp.add_argument("-n", type=int, default=10)
+    abroad = sub.add_parser("abroad", help="collaborations between authors in Hungary and abroad")
+    abroad.add_argument("-n", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    graph = build_graph()
+    s = graph.summary()
+    print(f"Co-authorship graph: {s['authors']} authors ({s['sheet_authors']} in the sheet), {s['edges']} edges, "
+          f"built in {time.perf_counter() - started:.1f}s")
+
+    if args.command == "top":
+        try:
+            rows = graph.top_collaborators(args.author, args.n, args.by)
+        except KeyError:
+            print(f"❌ Unknown author: {args.author}")
+            return 1
+        for r in rows:
+            print(f"{r['papers']:>4} papers {r['weight']:>7.2f}  {r['name']} ({r['pid']}) {r['institution']}")
+    elif args.command == "institutions":
+        import pandas as pd
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(graph.institution_matrix(args.by).round(1))
+    elif args.command == "components":
+        count, _ = graph.components()
+        print(f"{count} connected components")
+        for c in graph.component_sizes(args.n):
+            print(f"{c['authors']:>7} authors, {c['sheet_authors']:>5} in the sheet")
+    else:
+        ha = graph.hungarian_abroad_edges(args.n)
+        print(f"{ha['pairs']} pairs, {ha['joint_papers']} joint papers, {ha['hungarian_authors']} authors in Hungary with co-authors abroad")
+        for p in ha["top_pairs"]:
+            print(f"{p['papers']:>4}  {p['hungarian']} - {p['abroad']}")
+        print("Most co-authors abroad:")
+        for a in ha["top_authors"]:
+            print(f"{a['abroad_coauthors']:>4}  {a['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -9,8 +9,16 @@ This module handles:
 Terminology:
 - "Core Rank" = the CORE conference ranking (A*, A, B, C)
 - "Author Order" = the position/order of authors in the generated sheet
+
+Rows are typed: metrics stay int/float and the computed orders/ranks are ints;
+they are converted to text only when the sheet is exported.
 """
-from typing import List, Dict, Callable, Tuple, Optional
+from typing import Any, List, Dict, Callable, Tuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+Row = Dict[str, Any]
 
 # Keys expected in rows produced by generate_author_google_sheet (after enrichment):
 PRIMARY_SORT_KEYS = ["Core A* equivalent", 
@@ -32,30 +40,54 @@ def _safe_int(val) -> int:
         return 0
 
 
+def _int_column(rows: List[Row], key: str) -> np.ndarray:
+    """Vectorized _safe_int over one column: missing/invalid -> 0, floats truncated."""
+    values = pd.to_numeric(pd.Series([r.get(key) for r in rows], dtype=object), errors="coerce").to_numpy(dtype=float, copy=True)
+    values[~np.isfinite(values)] = 0
+    return np.trunc(values).astype(np.int64)
+
+
+def _min_rank(values: np.ndarray, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """1-based standard ranks (descending), optionally within groups."""
+    series = pd.Series(values)
+    if groups is None:
+        ranked = series.rank(method="min", ascending=False)
+    else:
+        ranked = series.groupby(groups, sort=False).rank(method="min", ascending=False)
+    return ranked.to_numpy(dtype=np.int64)
+
+
 def compute_author_order_positions(values: List[int]) -> List[int]:
     """Given a list of numeric values, return 1-based standard rank author order positions.
     Example: [10, 8, 8, 8, 5] -> [1, 2, 2, 2, 5]
     Equal values get the same rank, but the next rank accounts for the number of tied items.
     This determines the display order in the Google Sheet.
     """
-    # Create list of (value, original_index) pairs
-    indexed_values = [(v, i) for i, v in enumerate(values)]
-    # Sort by value descending
-    indexed_values.sort(key=lambda x: x[0], reverse=True)
-    
-    # Assign ranks using standard ranking (1,2,2,2,5)
-    ranks = [0] * len(values)
-    current_rank = 1
-    for i, (val, orig_idx) in enumerate(indexed_values):
-        if i > 0 and indexed_values[i-1][0] != val:
-            # Different value from previous, update rank to current position + 1
-            current_rank = i + 1
-        ranks[orig_idx] = current_rank
-    
-    return ranks
+    if len(values) == 0:
+        return []
+    return _min_rank(np.asarray(values)).tolist()
+
+
+def rank_columns(rows: List[Row], specs: Sequence[Tuple[str, Optional[str], str]]) -> List[Row]:
+    """Columnar ranking engine: compute many (score, group) ranks at once.
+
+    specs: (score_key, group_key or None, rank_col) triples. Every score and group
+    column is read into an array once, all ranks are computed with vectorized
+    groupby ranks and written back to the row dicts.
+    """
+    if not rows or not specs:
+        return rows
+    scores = {key: _int_column(rows, key) for key in {score_key for score_key, _, _ in specs}}
+    groups = {key: np.array([str(r.get(key, "")) for r in rows], dtype=object)
+              for key in {group_key for _, group_key, _ in specs if group_key is not None}}
+    for score_key, group_key, rank_col in specs:
+        positions = _min_rank(scores[score_key], groups[group_key] if group_key is not None else None)
+        for r, pos in zip(rows, positions.tolist()):
+            r[rank_col] = pos
+    return rows
 
 
-def add_author_order_columns(rows: List[Dict[str, str]], extra_orderers: Optional[Dict[str, Callable[[Dict[str, str]], int]]] = None) -> List[Dict[str, str]]:
+def add_author_order_columns(rows: List[Row], extra_orderers: Optional[Dict[str, Callable[[Row], int]]] = None) -> List[Row]:
     """Annotate each row dict with author order columns based on predefined Core metrics.
 
     extra_orderers: mapping from column name (e.g., 'Institution Order') to a lambda(row)->int score.
@@ -66,17 +98,8 @@ def add_author_order_columns(rows: List[Dict[str, str]], extra_orderers: Optiona
     if extra_orderers is None:
         extra_orderers = {}
 
-    # Collect columns for primary Core metrics
-    numeric_columns: Dict[str, List[int]] = {}
-    for key in PRIMARY_SORT_KEYS:
-        numeric_columns[key] = [_safe_int(r.get(key)) for r in rows]
-
-    # Compute author order positions and store (Note: "Rank" here means Core rank column annotation)
-    for key, values in numeric_columns.items():
-        positions = compute_author_order_positions(values)
-        pos_col = f"{key} Author Order"
-        for r, pos in zip(rows, positions):
-            r[pos_col] = str(pos)
+    # Compute author order positions of the primary Core metrics (Note: "Rank" here means Core rank column annotation)
+    rank_columns(rows, [(key, None, f"{key} Author Order") for key in PRIMARY_SORT_KEYS])
 
     # Apply optional extra orderers
     for col_name, func in extra_orderers.items():
@@ -90,13 +113,13 @@ def add_author_order_columns(rows: List[Dict[str, str]], extra_orderers: Optiona
         order_col = f"{col_name} Author Order"
         score_col = f"{col_name} Score"
         for r, score, pos in zip(rows, scores, positions):
-            r[score_col] = str(score)
-            r[order_col] = str(pos)
+            r[score_col] = score
+            r[order_col] = pos
 
     return rows
 
 
-def sort_by_core_metrics(rows: List[Dict[str, str]], priority: Optional[List[str]] = None) -> List[Dict[str, str]]:
+def sort_by_core_metrics(rows: List[Row], priority: Optional[List[str]] = None) -> List[Row]:
     """Sort rows by a priority list of Core metric columns (descending each).
     Falls back gracefully if a column is missing.
     priority defaults to PRIMARY_SORT_KEYS.
@@ -107,14 +130,14 @@ def sort_by_core_metrics(rows: List[Dict[str, str]], priority: Optional[List[str
     if priority is None:
         priority = PRIMARY_SORT_KEYS
 
-    def sort_key(row: Dict[str, str]) -> Tuple[int, ...]:
+    def sort_key(row: Row) -> Tuple[int, ...]:
         return tuple(_safe_int(row.get(k)) for k in priority)
 
     return sorted(rows, key=sort_key, reverse=True)
 
 
-def order_and_annotate(rows: List[Dict[str, str]], extra_orderers: Optional[Dict[str, Callable[[Dict[str, str]], int]]] = None,
-                       priority: Optional[List[str]] = None) -> List[Dict[str, str]]:
+def order_and_annotate(rows: List[Row], extra_orderers: Optional[Dict[str, Callable[[Row], int]]] = None,
+                       priority: Optional[List[str]] = None) -> List[Row]:
     """Convenience pipeline: add author order annotation columns then return sorted copy."""
     if extra_orderers is None:
         extra_orderers = {}
@@ -139,8 +162,8 @@ def _safe_year(val) -> Optional[int]:
         return None
 
 
-def add_group_core_ranks(rows: List[Dict[str, str]], group_key: str, score_key: str,
-                         rank_col: Optional[str] = None, score_transform: Optional[Callable[[Dict[str, str]], int]] = None) -> List[Dict[str, str]]:
+def add_group_core_ranks(rows: List[Row], group_key: str, score_key: str,
+                         rank_col: Optional[str] = None, score_transform: Optional[Callable[[Row], int]] = None) -> List[Row]:
     """Add Core ranks within each group defined by group_key using score_key (numeric).
     Dense rank (1,2,2,3). score_transform(row) -> int can override raw score.
     Note: "rank" here refers to position within the group based on Core metrics.
@@ -149,8 +172,10 @@ def add_group_core_ranks(rows: List[Dict[str, str]], group_key: str, score_key:
         return rows
     if rank_col is None:
         rank_col = f"{group_key} {score_key} Group Core Rank"
+    if score_transform is None:
+        return rank_columns(rows, [(score_key, group_key, rank_col)])
     # Build groups
-    groups: Dict[str, List[Tuple[Dict[str, str], int]]] = {}
+    groups: Dict[str, List[Tuple[Row, int]]] = {}
     for r in rows:
         g = str(r.get(group_key, ""))
         raw = score_transform(r) if score_transform else _safe_int(r.get(score_key))
@@ -160,68 +185,64 @@ def add_group_core_ranks(rows: List[Dict[str, str]], group_key: str, score_key:
         scores = [s for _, s in items]
         positions = compute_author_order_positions(scores)
         for (row, _score), pos in zip(items, positions):
-            row[rank_col] = str(pos)
+            row[rank_col] = pos
     return rows
 
-def add_category_core_rank(rows: List[Dict[str, str]], category_key: str = "Category",
+def add_category_core_rank(rows: List[Row], category_key: str = "Category",
                             score_key: str = "Core A* equivalent",
-                            rank_col: str = "Category Core Rank") -> List[Dict[str, str]]:
+                            rank_col: str = "Category Core Rank") -> List[Row]:
     """Convenience: rank authors within their category by Core A* equivalent score."""
     return add_group_core_ranks(rows, group_key=category_key, score_key=score_key, rank_col=rank_col)
 
+# Age groups by career length in years: (inclusive upper bound, label); above the last bound AGE_GROUP_OVER
+AGE_GROUPS = [(-1, "unknown"), (5, "0-5 év"), (10, "5-10 év"), (25, "10-25 év")]
+AGE_GROUP_OVER = "25+ év"
+
 def determine_age_group(years_since_phd: int) -> str:
-    """Determine age group based on years since PhD.
-    Categories: [0-5], [5-10], [10-20], [20+]
-    """
-    if years_since_phd < 0:
-        return "unknown"
-    elif years_since_phd <= 5:
-        return "0-5 év"
-    elif years_since_phd <= 10:
-        return "5-10 év"
-    elif years_since_phd <= 25:
-        return "10-25 év"
-    else:
-        return "25+ év"
+    """Determine age group based on years since PhD (see AGE_GROUPS)."""
+    for bound, label in AGE_GROUPS:
+        if years_since_phd <= bound:
+            return label
+    return AGE_GROUP_OVER
 
-def add_age_group_column(rows: List[Dict[str, str]],
-                         target_key: str = "Career Length") -> List[Dict[str, str]]:
-    """Add age group classification based on years since PhD."""
-    for r in rows:
-        from_year=_safe_int(r.get("Első cikk éve", 0))
-        to_year=_safe_int(r.get("Legutolsó cikk éve", 0))
-        r[target_key] = determine_age_group(to_year-from_year)
+def add_age_group_column(rows: List[Row],
+                         target_key: str = "Career Length") -> List[Row]:
+    """Add age group classification based on years since PhD (see determine_age_group)."""
+    if not rows:
+        return rows
+    years = _int_column(rows, "Legutolsó cikk éve") - _int_column(rows, "Első cikk éve")
+    labels = np.select([years <= bound for bound, _ in AGE_GROUPS],
+                       [label for _, label in AGE_GROUPS], default=AGE_GROUP_OVER)
+    for r, label in zip(rows, labels.tolist()):
+        r[target_key] = label
     return rows
 
-def add_all_category_ranks(rows: List[Dict[str, str]], category_key: str = "Category") -> List[Dict[str, str]]:
+CATEGORY_RANK_METRICS = [
+    ("Core A* equivalent", "Category Core A* Rank"),
+    ("Hungarian Core A* equivalent", "Category Hungarian Core A* Rank"),
+    ("First Author Core A* equivalent", "Category First Author Core A* Rank")
+]
+AGE_GROUP_RANK_METRICS = [
+    ("Core A* equivalent", "Career Length Core A* Rank"),
+    ("Hungarian Core A* equivalent", "Career Length Hungarian Core A* Rank"),
+    ("First Author Core A* equivalent", "Career Length First Author Core A* Rank")
+]
+
+def add_all_category_ranks(rows: List[Row], category_key: str = "Category") -> List[Row]:
     """Add rankings within category for all three main Core metrics."""
-    metrics = [
-        ("Core A* equivalent", "Category Core A* Rank"),
-        ("Hungarian Core A* equivalent", "Category Hungarian Core A* Rank"),
-        ("First Author Core A* equivalent", "Category First Author Core A* Rank")
-    ]
-    for score_key, rank_col in metrics:
-        add_group_core_ranks(rows, group_key=category_key, score_key=score_key, rank_col=rank_col)
-    return rows
+    return rank_columns(rows, [(score_key, category_key, rank_col) for score_key, rank_col in CATEGORY_RANK_METRICS])
 
-def add_all_age_group_ranks(rows: List[Dict[str, str]], age_group_key: str = "Career Length") -> List[Dict[str, str]]:
+def add_all_age_group_ranks(rows: List[Row], age_group_key: str = "Career Length") -> List[Row]:
     """Add rankings within age group for all three main Core metrics."""
-    metrics = [
-        ("Core A* equivalent", "Career Length Core A* Rank"),
-        ("Hungarian Core A* equivalent", "Career Length Hungarian Core A* Rank"),
-        ("First Author Core A* equivalent", "Career Length First Author Core A* Rank")
-    ]
-    for score_key, rank_col in metrics:
-        add_group_core_ranks(rows, group_key=age_group_key, score_key=score_key, rank_col=rank_col)
-    return rows
+    return rank_columns(rows, [(score_key, age_group_key, rank_col) for score_key, rank_col in AGE_GROUP_RANK_METRICS])
 
-def prepare_author_order_with_extensions(rows: List[Dict[str, str]],
+def prepare_author_order_with_extensions(rows: List[Row],
                                           include_time_since_phd: bool = True,
                                           include_category_ranks: bool = True,
                                           include_age_group_ranks: bool = True,
                                           include_first_paper_year: bool = True,
                                           author_data_dict: Optional[Dict[str, Dict]] = None,
-                                          current_year: Optional[int] = None) -> List[Dict[str, str]]:
+                                          current_year: Optional[int] = None) -> List[Row]:
     """Pipeline adding author order annotations + optional extended Core ranks.
     Returns mutated list for chaining.
     
@@ -234,20 +255,14 @@ def prepare_author_order_with_extensions(rows: List[Dict[str, str]],
         author_data_dict: Full author data dictionary (for first paper year lookup)
         current_year: Year for PhD calculation (defaults to current year)
     """
-    order_and_annotate(rows)  # base author order + sorting
-    
-    
-    if include_time_since_phd:
+    if include_time_since_phd or include_age_group_ranks:
         # Add age group classification (needed for age group ranks)
         add_age_group_column(rows)
-    
+
+    # base author order + all group ranks in one columnar pass
+    specs = [(key, None, f"{key} Author Order") for key in PRIMARY_SORT_KEYS]
     if include_category_ranks:
-        add_all_category_ranks(rows)
-    
+        specs += [(score_key, "Category", rank_col) for score_key, rank_col in CATEGORY_RANK_METRICS]
     if include_age_group_ranks:
-        if not include_time_since_phd:
-            # Need to compute years since PhD first
-            add_age_group_column(rows)
-        add_all_age_group_ranks(rows)
-    
-    return rows
+        specs += [(score_key, "Career Length", rank_col) for score_key, rank_col in AGE_GROUP_RANK_METRICS]
+    return rank_columns(rows, specs)
@@ -5,226 +5,218 @@ if _parent not in sys.path: sys.path.insert(0, _parent)
 if _src not in sys.path: sys.path.insert(0, _src)
 
 import json
-import pandas as pd
 import os
 import requests
 from urllib.parse import urlparse
 from pathlib import Path
+from collections import Counter
+from typing import Dict, List
 
-def main(data):
-    # Download favicons if not already present
-    logo_dir = Path("logos")
-    logo_dir.mkdir(exist_ok=True)
+from io_utils import write_json
 
-    logo_map = {
-        "mta_att": "https://mta.hu",
-        "mtmt": "https://m2.mtmt.hu",
-        "dblp": "https://dblp.org",
-        "core": "https://www.core.edu.au"
-    }
+# data mode: authors_table.html is a small shell that loads this columnar feed
+TABLE_DATA_FILE = "authors_table_data.json"
 
-    def download_favicon(name, url):
-        """Download favicon for a given URL if not already present"""
-        logo_path = logo_dir / f"{name}_logo.png"
-        if logo_path.exists():
-            print(f"✓ {name} logo already exists")
-            return str(logo_path)
-        
-        try:
-            # Try to get favicon from /favicon.ico
-            favicon_url = f"{url}/favicon.ico"
-            response = requests.get(favicon_url, timeout=10)
-            if response.status_code == 200:
-                with open(logo_path, 'wb') as f:
-                    f.write(response.content)
-                print(f"✓ Downloaded {name} logo from {favicon_url}")
-                return str(logo_path)
-        except Exception as e:
-            print(f"✗ Could not download {name} logo: {e}")
-        
-        return None
 
-    # Download all favicons
-    #print("Downloading favicons...")
-    #for name, url in logo_map.items():
-    #    download_favicon(name, url)
+def safe_get(rec, key, default=""):
+    """Safely get value from record"""
+    val = rec.get(key, default)
+    if val is None:
+        return default
+    if isinstance(val, list):
+        return ", ".join(str(v) for v in val)
+    # Format floats to 2 decimal places
+    if isinstance(val, float):
+        return f"{val:.2f}"
+    return str(val)
 
+def create_info_icon(tooltip_text):
+    """Create an info icon with tooltip"""
+    if not tooltip_text or tooltip_text == "":
+        return ""
+    escaped = tooltip_text.replace('"', '&quot;').replace("'", "&#39;").replace('\n', '<br>')
+    return f'<span class="tooltip-container">ℹ️<span class="tooltip-text">{escaped}</span></span>'
 
-    print(f"Total authors: {len(data)}")
+def create_logo_links(dblp_url, mtmt_url, mta_att_url):
+    """Create small logo links for DBLP, MTMT, MTA"""
+    links = []
+    if dblp_url:
+        links.append(f'<a href="{dblp_url}" target="_blank"><img src="logos/dblp_logo.png" class="small-logo" alt="DBLP"/></a>')
+    if mtmt_url:
+        links.append(f'<a href="{mtmt_url}" target="_blank"><img src="logos/mtmt_logo.png" class="small-logo" alt="MTMT"/></a>')
+    if mta_att_url:
+        links.append(f'<a href="{mta_att_url}" target="_blank"><img src="logos/mta_att_logo.png" class="small-logo" alt="MTA"/></a>')
+    return " ".join(links)
 
-    def safe_get(rec, key, default=""):
-        """Safely get value from record"""
-        val = rec.get(key, default)
-        if val is None:
-            return default
-        if isinstance(val, list):
-            return ", ".join(str(v) for v in val)
-        # Format floats to 2 decimal places
-        if isinstance(val, float):
-            return f"{val:.2f}"
-        return str(val)
-
-    def create_info_icon(tooltip_text):
-        """Create an info icon with tooltip"""
-        if not tooltip_text or tooltip_text == "":
-            return ""
-        escaped = tooltip_text.replace('"', '&quot;').replace("'", "&#39;").replace('\n', '<br>')
-        return f'<span class="tooltip-container">ℹ️<span class="tooltip-text">{escaped}</span></span>'
-
-    def create_logo_links(rec):
-        """Create small logo links for DBLP, MTMT, MTA"""
-        links = []
-        if rec.get("dblp_url_"):
-            links.append(f'<a href="{rec["dblp_url_"]}" target="_blank"><img src="logos/dblp_logo.png" class="small-logo" alt="DBLP"/></a>')
-        if rec.get("mtmt_id_"):
-            links.append(f'<a href="{rec["mtmt_id_"]}" target="_blank"><img src="logos/mtmt_logo.png" class="small-logo" alt="MTMT"/></a>')
-        if rec.get("mta_att_id_"):
-            links.append(f'<a href="{rec["mta_att_id_"]}" target="_blank"><img src="logos/mta_att_logo.png" class="small-logo" alt="MTA"/></a>')
-        return " ".join(links)
-
-    def create_image_cell(rec):
-        """Create image cell with click to enlarge"""
-        img_url = safe_get(rec, "mta_image_", "")
-        if img_url and img_url != "":
-            return f'<img src="{img_url}" class="author-thumb" onclick="window.open(\'{img_url}\', \'_blank\')" style="cursor:pointer;"/>'
-        return ""
+def create_image_cell(img_url):
+    """Create image cell with click to enlarge"""
+    if img_url and img_url != "":
+        return f'<img src="{img_url}" class="author-thumb" onclick="window.open(\'{img_url}\', \'_blank\')" style="cursor:pointer;"/>'
+    return ""
 
-    # Prepare rows for DataFrame
-    rows = []
-    for author_name, rec in data.items():
-        # Build affiliation info tooltip
-        affil_parts = []
-        if rec.get("affiliations_"):
-            affil_parts.append(safe_get(rec, "affiliations_"))
-        if rec.get("mtmt_affiliations_"):
-            affil_parts.append(f"MTMT: {safe_get(rec, 'mtmt_affiliations_')}")
-        if rec.get("mta_elerhetosegek"):
-            affil_parts.append(f"MTA: {safe_get(rec, 'mta_elerhetosegek')}")
-        affil_tooltip = "<br>".join(affil_parts)
-        
-        # Build topic info tooltip
-        topic_parts = []
-        for key in ["mta_topic", "mta_bizottság", "mta_szervezeti_tagsagok"]:
-            val = safe_get(rec, key)
-            if val:
-                topic_parts.append(val)
-        topic_tooltip = "<br>".join(topic_parts)
-        
-        # Build career info tooltip
-        career_parts = []
-        for key in ["Years Since PhD", "mta_tud_fokozat", "mta_foglalkozas"]:
-            val = safe_get(rec, key)
-            if val:
-                career_parts.append(val)
-        career_tooltip = "<br>".join(career_parts)
-        
-        row = {
-            # Columns 1-12: Author info
-            "Kép": create_image_cell(rec),
-            "Név": safe_get(rec, "dblp_author_name"),
-            "Linkek": create_info_icon(f"MTMT név: {safe_get(rec, 'mtmt_name')}") + " " + create_logo_links(rec),
-            "Magyar affil": safe_get(rec, "institution"),
-            "Munkahely": safe_get(rec, "works"),
-            "": create_info_icon(affil_tooltip),  # Empty header for info column
-            "Itthon": safe_get(rec, "status"),
-            " ": create_info_icon(safe_get(rec, "location")),  # Empty header for info column
-            "Téma": safe_get(rec, "category"),
-            "  ": create_info_icon(topic_tooltip),  # Empty header for info column
-            "Karrier": safe_get(rec, "Career Length"),
-            "   ": create_info_icon(career_tooltip),  # Empty header for info column
-            
-            # Columns 13-16: Aggregate metrics
-            "Core A* ekv.": safe_get(rec, "Core A* equivalent"),
-            "Journal D1 ekv.": safe_get(rec, "mtmt_journal D1 eqvivalents_"),
-            "Hung. Core A* ekv.": safe_get(rec, "Hungarian Core A* equivalent"),
-            "First Author Core A*": safe_get(rec, "First Author Core A* equivalent"),
-            
-            # Columns 17-26: Core papers
-            "Core A*": safe_get(rec, "paper_countA*"),
-            "    ": create_info_icon(safe_get(rec, "papersA*")),
-            "Core A": safe_get(rec, "paper_countA"),
-            "     ": create_info_icon(safe_get(rec, "papersA")),
-            "Core B": safe_get(rec, "paper_countB"),
-            "      ": create_info_icon(safe_get(rec, "papersB")),
-            "Core C": safe_get(rec, "paper_countC"),
-            "       ": create_info_icon(safe_get(rec, "papersC")),
-            "Core no": safe_get(rec, "paper_countno_rank"),
-            "        ": create_info_icon(safe_get(rec, "papersno_rank")),
-            
-            # Columns 27-36: Hungarian Core papers
-            "Hung. A*": safe_get(rec, "hungarian_paper_countA*"),
-            "         ": create_info_icon(safe_get(rec, "hungarian_papersA*")),
-            "Hung. A": safe_get(rec, "hungarian_paper_countA"),
-            "          ": create_info_icon(safe_get(rec, "hungarian_papersA")),
-            "Hung. B": safe_get(rec, "hungarian_paper_countB"),
-            "           ": create_info_icon(safe_get(rec, "hungarian_papersB")),
-            "Hung. C": safe_get(rec, "hungarian_paper_countC"),
-            "            ": create_info_icon(safe_get(rec, "hungarian_papersC")),
-            "Hung. no": safe_get(rec, "hungarian_paper_countno_rank"),
-            "             ": create_info_icon(safe_get(rec, "hungarian_papersno_rank")),
-            
-            # Columns 37-46: First author Core papers
-            "First A*": safe_get(rec, "first_author_paper_countA*"),
-            "              ": create_info_icon(safe_get(rec, "first_author_papersA*")),
-            "First A": safe_get(rec, "first_author_paper_countA"),
-            "               ": create_info_icon(safe_get(rec, "first_author_papersA")),
-            "First B": safe_get(rec, "first_author_paper_countB"),
-            "                ": create_info_icon(safe_get(rec, "first_author_papersB")),
-            "First C": safe_get(rec, "first_author_paper_countC"),
-            "                 ": create_info_icon(safe_get(rec, "first_author_papersC")),
-            "First no": safe_get(rec, "first_author_paper_countno_rank"),
-            "                  ": create_info_icon(safe_get(rec, "first_author_papersno_rank")),
-            
-            # Columns 47-54: MTMT metrics
-            "D1 journal": safe_get(rec, "mtmt_rank_D1_"),
-            "Q1 journal": safe_get(rec, "mtmt_rank_Q1_"),
-            "Q2 journal": safe_get(rec, "mtmt_rank_Q2_"),
-            "Q3 journal": safe_get(rec, "mtmt_rank_Q3_"),
-            "Q4 journal": safe_get(rec, "mtmt_rank_Q4_"),
-            "MTMT journal pubs": safe_get(rec, "mtmt_journal_publications"),
-            "MTMT conf pubs": safe_get(rec, "mtmt_conference_publications"),
-            "Hivatkozások": safe_get(rec, "mtmt_total_citations"),
-        }
-        rows.append(row)
 
-    # Create DataFrame
-    df = pd.DataFrame(rows)
+def _joined(parts):
+    return "<br>".join(p for p in parts if p)
 
-    print(f"Created DataFrame with {len(df)} rows and {len(df.columns)} columns")
+def _affil_tooltip(rec):
+    affil_parts = []
+    if rec.get("affiliations_"):
+        affil_parts.append(safe_get(rec, "affiliations_"))
+    if rec.get("mtmt_affiliations_"):
+        affil_parts.append(f"MTMT: {safe_get(rec, 'mtmt_affiliations_')}")
+    if rec.get("mta_elerhetosegek"):
+        affil_parts.append(f"MTA: {safe_get(rec, 'mta_elerhetosegek')}")
+    return "<br>".join(affil_parts)
+
+def _links(rec):
+    return (f"MTMT név: {safe_get(rec, 'mtmt_name')}", rec.get("dblp_url_") or "",
+            rec.get("mtmt_id_") or "", rec.get("mta_att_id_") or "")
+
+
+# Table columns: (header, kind, source). source is a record key or a function of
+# the record. Kinds: "text" (shown as is), "tip" (info icon with the text as
+# tooltip), "papers" (like "tip", for the "<venue><year> " paper lists),
+# "image" (thumbnail URL), "links" (tooltip text + DBLP/MTMT/MTA URLs).
+# The info columns have blank headers of different lengths to keep them unique.
+COLUMNS = [
+    # Columns 1-12: Author info
+    ("Kép", "image", "mta_image_"),
+    ("Név", "text", "dblp_author_name"),
+    ("Linkek", "links", _links),
+    ("Magyar affil", "text", "institution"),
+    ("Munkahely", "text", "works"),
+    ("", "tip", _affil_tooltip),
+    ("Itthon", "text", "status"),
+    (" ", "tip", "location"),
+    ("Téma", "text", "category"),
+    ("  ", "tip", lambda rec: _joined([safe_get(rec, k) for k in ["mta_topic", "mta_bizottság", "mta_szervezeti_tagsagok"]])),
+    ("Karrier", "text", "Career Length"),
+    ("   ", "tip", lambda rec: _joined([safe_get(rec, k) for k in ["Years Since PhD", "mta_tud_fokozat", "mta_foglalkozas"]])),
+
+    # Columns 13-16: Aggregate metrics
+    ("Core A* ekv.", "text", "Core A* equivalent"),
+    ("Journal D1 ekv.", "text", "mtmt_journal D1 eqvivalents_"),
+    ("Hung. Core A* ekv.", "text", "Hungarian Core A* equivalent"),
+    ("First Author Core A*", "text", "First Author Core A* equivalent"),
+]
+# Columns 17-46: paper counts with the paper list as tooltip (Core, Hungarian Core, first author Core)
+_blank = 4
+for _label, _prefix in [("Core", ""), ("Hung.", "hungarian_"), ("First", "first_author_")]:
+    for _rank, _rank_label in [("A*", "A*"), ("A", "A"), ("B", "B"), ("C", "C"), ("no_rank", "no")]:
+        COLUMNS.append((f"{_label} {_rank_label}", "text", f"{_prefix}paper_count{_rank}"))
+        COLUMNS.append((" " * _blank, "papers", f"{_prefix}papers{_rank}"))
+        _blank += 1
+COLUMNS += [
+    # Columns 47-54: MTMT metrics
+    ("D1 journal", "text", "mtmt_rank_D1_"),
+    ("Q1 journal", "text", "mtmt_rank_Q1_"),
+    ("Q2 journal", "text", "mtmt_rank_Q2_"),
+    ("Q3 journal", "text", "mtmt_rank_Q3_"),
+    ("Q4 journal", "text", "mtmt_rank_Q4_"),
+    ("MTMT journal pubs", "text", "mtmt_journal_publications"),
+    ("MTMT conf pubs", "text", "mtmt_conference_publications"),
+    ("Hivatkozások", "text", "mtmt_total_citations"),
+]
+
+
+def table_values(rec) -> List:
+    """Raw cell values of one author, in COLUMNS order."""
+    return [source(rec) if callable(source) else safe_get(rec, source) for _, _, source in COLUMNS]
+
+
+def render_cell(kind, value) -> str:
+    """HTML of one cell (html mode)."""
+    if kind in ("tip", "papers"):
+        return create_info_icon(value)
+    if kind == "image":
+        return create_image_cell(value)
+    if kind == "links":
+        return create_info_icon(value[0]) + " " + create_logo_links(*value[1:])
+    return value
+
+
+def build_feed(data: Dict[str, Dict]) -> Dict:
+    """Columnar table data for the data mode.
+
+    "data" holds one value list per column. Tooltip texts are stored once in
+    "strings" and the cells refer to them by index (0 is the empty string), so
+    the shared and empty tooltips cost a few bytes and the browser only builds
+    the tooltip HTML on hover.
+
+    The paper lists repeat the same "<venue><year>" tokens across the all,
+    Hungarian and first-author columns and across coauthors. They are split
+    into tokens kept once in "venues" (the most frequent first, so they get
+    the shortest ids), and a paper list cell is the list of its token ids;
+    " ".join of the tokens gives back the text.
+    """
+    strings = [""]
+    index = {"": 0}
+    token_count = Counter()
 
-    # Generate HTML with custom styling
-    html_template = """
+    def intern(text):
+        if text not in index:
+            index[text] = len(strings)
+            strings.append(text)
+        return index[text]
+
+    columns = [[] for _ in COLUMNS]
+    for rec in data.values():
+        for values, (_, kind, _), value in zip(columns, COLUMNS, table_values(rec)):
+            if kind == "tip":
+                value = intern(value)
+            elif kind == "links":
+                value = [intern(value[0])] + list(value[1:])
+            elif kind == "papers":
+                value = value.split(" ") if value else []
+                token_count.update(value)
+            values.append(value)
+
+    venues = [token for token, _ in token_count.most_common()]
+    token_ids = {token: i for i, token in enumerate(venues)}
+    for values, (_, kind, _) in zip(columns, COLUMNS):
+        if kind == "papers":
+            values[:] = [[token_ids[token] for token in tokens] for tokens in values]
+    return {
+        "columns": [header for header, _, _ in COLUMNS],
+        "kinds": [kind for _, kind, _ in COLUMNS],
+        "strings": strings,
+        "venues": venues,
+        "data": columns,
+    }
+
+
+_HTML_HEAD = """
     <!DOCTYPE html>
     <html>
     <head>
         <meta charset="utf-8">
         <title>Author Statistics</title>
         <style>
-            body {{
+            body {
                 font-family: Arial, sans-serif;
                 margin: 10px;
                 font-size: 12px;
-            }}
-            .author-thumb {{
+            }
+            .author-thumb {
                 max-width: 40px;
                 max-height: 40px;
                 border-radius: 3px;
-            }}
-            .small-logo {{
+            }
+            .small-logo {
                 width: 14px;
                 height: 14px;
                 margin: 0 1px;
                 vertical-align: middle;
-            }}
+            }
             /* Tooltip styles */
-            .tooltip-container {{
+            .tooltip-container {
                 position: relative;
                 display: inline-block;
                 cursor: help;
                 font-size: 13px;
                 color: #666;
-            }}
-            .tooltip-text {{
+            }
+            .tooltip-text {
                 visibility: hidden;
                 width: 400px;
                 max-width: 90vw;
@@ -243,22 +235,22 @@ def main(data):
                 word-wrap: break-word;
                 box-shadow: 0 4px 8px rgba(0,0,0,0.3);
                 pointer-events: none;
-            }}
-            .tooltip-container:hover .tooltip-text {{
+            }
+            .tooltip-container:hover .tooltip-text {
                 visibility: visible;
                 opacity: 0.95;
-            }}
+            }
             /* Ensure tooltip cell doesn't clip */
-            table.dataTable tbody td:has(.tooltip-container) {{
+            table.dataTable tbody td:has(.tooltip-container) {
                 overflow: visible !important;
                 position: relative;
-            }}
-            table.dataTable {{
+            }
+            table.dataTable {
                 font-size: 11px;
                 line-height: 1.3;
                 border-collapse: collapse;
-            }}
-            table.dataTable thead th {{
+            }
+            table.dataTable thead th {
                 background-color: #f0f0f0;
                 font-weight: bold;
                 padding: 4px 5px;
@@ -266,62 +258,59 @@ def main(data):
                 font-size: 11px;
                 /* Allow header tooltips to overflow */
                 overflow: visible;
-            }}
-            table.dataTable tbody td {{
+            }
+            table.dataTable tbody td {
                 padding: 3px 5px;
                 white-space: nowrap;
                 overflow: hidden;
                 text-overflow: ellipsis;
-            }}
-            table.dataTable tbody tr {{
+            }
+            table.dataTable tbody tr {
                 height: 30px;
-            }}
-            table.dataTable tfoot th {{
+            }
+            table.dataTable tfoot th {
                 background-color: #e8e8e8;
                 padding: 3px;
-            }}
+            }
             table.dataTable tfoot input,
-            table.dataTable tfoot select {{
+            table.dataTable tfoot select {
                 width: 100%;
                 box-sizing: border-box;
                 padding: 3px;
                 font-size: 10px;
-            }}
+            }
             /* Header tooltip adjustments */
-            table.dataTable thead th .tooltip-container {{
+            table.dataTable thead th .tooltip-container {
                 color: inherit;
                 font-size: inherit;
-            }}
+            }
             /* Narrow columns for info icons */
             table.dataTable thead th:empty,
-            table.dataTable thead th:not(:has(text)) {{
+            table.dataTable thead th:not(:has(text)) {
                 width: 25px;
                 min-width: 25px;
                 max-width: 25px;
                 padding: 2px;
-            }}
-            table.dataTable tbody td:has(.info-icon) {{
+            }
+            table.dataTable tbody td:has(.info-icon) {
                 text-align: center;
                 padding: 2px;
-            }}
+            }
         </style>
         <link rel="stylesheet" type="text/css" href="https://cdn.datatables.net/1.13.4/css/jquery.dataTables.min.css">
         <script type="text/javascript" src="https://code.jquery.com/jquery-3.6.0.min.js"></script>
         <script type="text/javascript" src="https://cdn.datatables.net/1.13.4/js/jquery.dataTables.min.js"></script>
     </head>
-    <body>
-        <h1>Author Statistics</h1>
-        {table}
-        <script>
-            $(document).ready(function() {{
-                var table = $('table').DataTable({{
-                    "pageLength": 100,
+"""
+
+# DataTables options shared by both modes (column filters in the footer)
+_TABLE_OPTIONS = """                    "pageLength": 100,
                     "order": [[12, "desc"]],  // Sort by Core A* ekv. descending
                     "scrollX": true,
                     "scrollY": "calc(100vh - 200px)",
                     "scrollCollapse": true,
                     "autoWidth": false,
-                    "initComplete": function() {{
+                    "initComplete": function() {
                         // Define which columns should have filters (by column name)
                         var filterableColumns = [
                             'Név',
@@ -333,59 +322,185 @@ def main(data):
                         ];
                         
                         // Add column filters in footer
-                        this.api().columns().every(function() {{
+                        this.api().columns().every(function() {
                             var column = this;
                             var title = $(column.header()).text().trim();
                             
                             // Skip columns not in filterable list
-                            if (!filterableColumns.includes(title)) {{
+                            if (!filterableColumns.includes(title)) {
                                 $(column.footer()).html('');
                                 return;
-                            }}
+                            }
                             
                             // Create select dropdown for text columns with limited unique values
                             var uniqueValues = column.data().unique().sort();
-                            if (uniqueValues.length <= 20 && uniqueValues.length > 1) {{
+                            if (uniqueValues.length <= 20 && uniqueValues.length > 1) {
                                 var select = $('<select><option value="">Összes</option></select>')
                                     .appendTo($(column.footer()).empty())
-                                    .on('change', function() {{
+                                    .on('change', function() {
                                         var val = $.fn.dataTable.util.escapeRegex($(this).val());
                                         column.search(val ? '^' + val + '$' : '', true, false).draw();
-                                    }});
+                                    });
                                 
-                                uniqueValues.each(function(d) {{
-                                    if (d) {{
+                                uniqueValues.each(function(d) {
+                                    if (d) {
                                         select.append('<option value="' + d + '">' + d + '</option>');
-                                    }}
-                                }});
-                            }} else {{
+                                    }
+                                });
+                            } else {
                                 // Create text input for other columns
                                 $('<input type="text" placeholder="Szűrés..." style="width:100%"/>')
                                     .appendTo($(column.footer()).empty())
-                                    .on('keyup change', function() {{
-                                        if (column.search() !== this.value) {{
+                                    .on('keyup change', function() {
+                                        if (column.search() !== this.value) {
                                             column.search(this.value).draw();
-                                        }}
-                                    }});
-                            }}
-                        }});
-                    }}
-                }});
+                                        }
+                                    });
+                            }
+                        });
+                    }
+"""
+
+_HTML_TEMPLATE = _HTML_HEAD + """    <body>
+        <h1>Author Statistics</h1>
+        {table}
+        <script>
+            $(document).ready(function() {
+                var table = $('table').DataTable({
+""" + _TABLE_OPTIONS + """                });
                 
                 // Position tooltips near mouse cursor
-                $(document).on('mousemove', '.tooltip-container', function(e) {{
+                $(document).on('mousemove', '.tooltip-container', function(e) {
                     var tooltip = $(this).find('.tooltip-text');
-                    tooltip.css({{
+                    tooltip.css({
                         'left': e.pageX + 15 + 'px',
                         'top': e.pageY - 10 + 'px'
-                    }});
-                }});
-            }});
+                    });
+                });
+            });
         </script>
     </body>
     </html>
     """
 
+# data mode: the rows are loaded from the feed and rendered by DataTables on demand
+_SHELL_TEMPLATE = _HTML_HEAD + """    <body>
+        <h1>Author Statistics</h1>
+        <p id="loading">Betöltés...</p>
+        <table id="authors" class="display" style="width:100%"></table>
+        <span id="tooltip" class="tooltip-text"></span>
+        <script>
+            var DATA_URL = "{data_url}";
+            var strings = [];
+            var venues = [];
+
+            // the feed may be gzipped; fetch does not decompress files served as application/gzip
+            function loadFeed(url) {
+                return fetch(url).then(function(response) {
+                    if (!response.ok) throw new Error(url + ": HTTP " + response.status);
+                    return response.arrayBuffer();
+                }).then(function(buf) {
+                    var bytes = new Uint8Array(buf);
+                    if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+                        var stream = new Blob([buf]).stream().pipeThrough(new DecompressionStream("gzip"));
+                        return new Response(stream).json();
+                    }
+                    return JSON.parse(new TextDecoder().decode(bytes));
+                });
+            }
+
+            function tipIcon(i) {
+                return i ? '<span class="tooltip-container" data-tip="' + i + '">ℹ️</span>' : '';
+            }
+
+            function papersText(ids) {
+                return ids.map(function(i) { return venues[i]; }).join(" ");
+            }
+
+            var renderers = {
+                "text": function(d) { return d; },
+                "tip": function(d, type) { return type === "display" ? tipIcon(d) : strings[d]; },
+                "papers": function(d, type) {
+                    if (type !== "display") return papersText(d);
+                    return d.length ? '<span class="tooltip-container" data-papers="' + d.join(",") + '">ℹ️</span>' : '';
+                },
+                "image": function(d, type) {
+                    if (type !== "display" || !d) return "";
+                    return '<img src="' + d + '" class="author-thumb" loading="lazy" onclick="window.open(this.src)" style="cursor:pointer;"/>';
+                },
+                "links": function(d, type) {
+                    if (type !== "display") return strings[d[0]];
+                    var links = [];
+                    if (d[1]) links.push('<a href="' + d[1] + '" target="_blank"><img src="logos/dblp_logo.png" class="small-logo" alt="DBLP"/></a>');
+                    if (d[2]) links.push('<a href="' + d[2] + '" target="_blank"><img src="logos/mtmt_logo.png" class="small-logo" alt="MTMT"/></a>');
+                    if (d[3]) links.push('<a href="' + d[3] + '" target="_blank"><img src="logos/mta_att_logo.png" class="small-logo" alt="MTA"/></a>');
+                    return tipIcon(d[0]) + " " + links.join(" ");
+                }
+            };
+
+            function initTable(feed) {
+                strings = feed.strings;
+                venues = feed.venues;
+                var n = feed.data.length ? feed.data[0].length : 0;
+                var rows = new Array(n);
+                for (var i = 0; i < n; i++) {
+                    var row = new Array(feed.data.length);
+                    for (var j = 0; j < feed.data.length; j++) row[j] = feed.data[j][i];
+                    rows[i] = row;
+                }
+                var columns = feed.columns.map(function(title, j) {
+                    return {"title": title, "render": renderers[feed.kinds[j]]};
+                });
+                $('#authors').append('<tfoot><tr>' + feed.columns.map(function() { return '<th></th>'; }).join('') + '</tr></tfoot>');
+                $('#loading').remove();
+                var table = $('#authors').DataTable({
+                    "data": rows,
+                    "columns": columns,
+                    "deferRender": true,
+""" + _TABLE_OPTIONS + """                });
+            }
+
+            $(document).ready(function() {
+                loadFeed(DATA_URL).then(initTable).catch(function(err) {
+                    $('#loading').text("Az adatok nem tölthetők be: " + err);
+                });
+
+                // Tooltips are filled from the shared strings / venue tokens on hover
+                var tooltip = $('#tooltip');
+                $(document).on('mouseenter', '#authors .tooltip-container', function() {
+                    var text = this.hasAttribute('data-tip') ? strings[+this.getAttribute('data-tip')]
+                                                             : papersText(this.getAttribute('data-papers').split(','));
+                    tooltip.html(text.replace(/\\n/g, '<br>'));
+                    tooltip.css({'visibility': 'visible', 'opacity': 0.95});
+                }).on('mouseleave', '#authors .tooltip-container', function() {
+                    tooltip.css({'visibility': 'hidden', 'opacity': 0});
+                }).on('mousemove', '#authors .tooltip-container', function(e) {
+                    tooltip.css({
+                        'left': e.pageX + 15 + 'px',
+                        'top': e.pageY - 10 + 'px'
+                    });
+                });
+            });
+        </script>
+    </body>
+    </html>
+"""
+
+
+def write_table_html(data, output_file='authors_table.html'):
+    """html mode: the whole table rendered into one HTML file."""
+    import pandas as pd
+
+    rows = []
+    for rec in data.values():
+        rows.append({header: render_cell(kind, value)
+                     for (header, kind, _), value in zip(COLUMNS, table_values(rec))})
+
+    # Create DataFrame
+    df = pd.DataFrame(rows)
+
+    print(f"Created DataFrame with {len(df)} rows and {len(df.columns)} columns")
+
     # Convert DataFrame to HTML table with footer
     table_html = df.to_html(index=False, escape=False, classes='display')
 
@@ -399,18 +514,81 @@ def main(data):
     table_html = table_html.replace('</table>', footer_html + '</table>')
 
     # Insert into template
-    full_html = html_template.format(table=table_html)
+    full_html = _HTML_TEMPLATE.replace("{table}", table_html)
 
     # Save to file
-    output_file = 'authors_table.html'
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(full_html)
+    return output_file
+
+
+def write_table_data(data, output_file='authors_table.html', data_file=TABLE_DATA_FILE, compress=False):
+    """data mode: a columnar JSON feed plus a small HTML shell that renders it."""
+    data_path = os.path.join(os.path.dirname(output_file), data_file)
+    data_path = write_json(data_path, build_feed(data), compress=compress)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(_SHELL_TEMPLATE.replace("{data_url}", os.path.basename(data_path)))
+    print(f"Table data saved to {data_path} ({os.path.getsize(data_path) / 1024:.0f} kB)")
+    return output_file
+
+
+def main(data, mode="html", compress=False):
+    """Write authors_table.html.
+
+    mode="html" renders every row into the page; mode="data" writes the rows to
+    authors_table_data.json (gzipped if compress) and a shell page that loads it
+    (it has to be served over http, browsers do not fetch file:// URLs).
+    """
+    # Download favicons if not already present
+    logo_dir = Path("logos")
+    logo_dir.mkdir(exist_ok=True)
+
+    logo_map = {
+        "mta_att": "https://mta.hu",
+        "mtmt": "https://m2.mtmt.hu",
+        "dblp": "https://dblp.org",
+        "core": "https://www.core.edu.au"
+    }
+
+    def download_favicon(name, url):
+        """Download favicon for a given URL if not already present"""
+        logo_path = logo_dir / f"{name}_logo.png"
+        if logo_path.exists():
+            print(f"✓ {name} logo already exists")
+            return str(logo_path)
+
+        try:
+            # Try to get favicon from /favicon.ico
+            favicon_url = f"{url}/favicon.ico"
+            response = requests.get(favicon_url, timeout=10)
+            if response.status_code == 200:
+                with open(logo_path, 'wb') as f:
+                    f.write(response.content)
+                print(f"✓ Downloaded {name} logo from {favicon_url}")
+                return str(logo_path)
+        except Exception as e:
+            print(f"✗ Could not download {name} logo: {e}")
+
+        return None
+
+    # Download all favicons
+    #print("Downloading favicons...")
+    #for name, url in logo_map.items():
+    #    download_favicon(name, url)
+
+
+    print(f"Total authors: {len(data)}")
+
+    if mode == "data":
+        output_file = write_table_data(data, compress=compress)
+    else:
+        output_file = write_table_html(data)
 
     print(f"\n✓ Interactive table saved to {output_file}")
     print(f"  Open it in a browser to view the table.")
 
 if __name__ == "__main__":
     print("\nLoading author data...")
-    with open('results/full_authors_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    main(data)
\ No newline at end of file
+    from io_utils import read_json
+    data = read_json('results/full_authors_data.json')
+    main(data, mode="data" if "--data" in sys.argv else "html", compress="--gzip" in sys.argv)
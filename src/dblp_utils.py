@@ -10,20 +10,30 @@ _src = os.path.dirname(__file__)
 if _parent not in sys.path: sys.path.insert(0, _parent)
 if _src not in sys.path: sys.path.insert(0, _src)
 
-import json
 import os
 import requests
-import xmltodict
-from typing import Optional, Callable, Tuple, Any
+from typing import Optional, Callable, Tuple, Any, Dict, FrozenSet, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import unicodedata
 import time
-import google_author_sheet
+from affiliation_matcher import location_of
+from io_utils import json_file, read_json, write_json
 from urllib.parse import quote
 
+# base URL of the DBLP API; set DBLP_BASE_URL to a local replay server (src/http_replay.py) for offline runs
+DBLP_BASE_URL = os.environ.get("DBLP_BASE_URL", "https://dblp.org").rstrip("/")
+
 def remove_accents(text: str) -> str:
     """Remove Hungarian (and other) accents from text for file naming."""
     from unidecode import unidecode
     return unidecode(text)
 
+def dblp_cache_path(author: str) -> str:
+    """Path of the cached DBLP person record of an author (dblp/{author}.json)."""
+    author_safe = remove_accents(author).replace(" ", "_")
+    return os.path.join("dblp", f"{author_safe}.json")
+
 def get_DBLP_record(dblp_url: str, author: str, force: bool = False) -> Optional[dict]:
     """Query DBLP for author/person data and cache results under dblp/{author}.json.
 
@@ -35,93 +45,189 @@ def get_DBLP_record(dblp_url: str, author: str, force: bool = False) -> Optional
         Parsed XML dict or None on failure.
     """
     os.makedirs("dblp", exist_ok=True)
-    author_safe = remove_accents(author).replace(" ", "_")
-    file_path = os.path.join("dblp", f"{author_safe}.json")
+    file_path = dblp_cache_path(author)
 
-    if not force and os.path.exists(file_path):
+    if not force and json_file(file_path):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
 
     # Normalize URL (allow passing '/pid/xx/yy')
-    if not dblp_url.startswith("http"):
-        dblp_url_full = f"https://dblp.org{dblp_url}"
-    else:
-        dblp_url_full = dblp_url
+    path = _pid_path(dblp_url)
+    dblp_url_full = path if path.startswith("http") else f"{DBLP_BASE_URL}{path}"
 
     try:
         print(f"Fetching: {author} {dblp_url_full}.xml")
         response = requests.get(f"{dblp_url_full}.xml")
         if response.status_code != 200:
             raise Exception(f"HTTP error {response.status_code}")
+        import xmltodict  # only needed when a record is downloaded
         data = xmltodict.parse(response.content)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(file_path, data)
         return data
     except Exception as e:
         print(f"Error fetching {dblp_url_full}: {e}")
         return None
 
-def search_dblp_by_name(name_for_search: str,
-                        mtmt_record: dict, pub_rec: list) :
-    """Search DBLP author API by name (with '+' separators) and verify candidate hits.
+# Name search results and candidate person records, shared by all lookups of the process
+_search_hits: Dict[str, List[Tuple[str, str]]] = {}
+_candidate_records: Dict[str, Optional[dict]] = {}
+_candidate_lock = threading.Lock()
+CANDIDATE_CACHE_DIR = os.path.join("dblp", "candidates")
+DBLP_MAX_WORKERS = 4
+
 
-    Returns first matching DBLP record dict or None.
+def _pid_path(dblp_url: str) -> str:
+    """Normalize 'https://dblp.org/pid/xx/yy' and '/pid/xx/yy' to '/pid/xx/yy'."""
+    return dblp_url.replace("https://dblp.org", "").replace("http://dblp.org", "")
+
+
+def search_dblp_candidates(name_for_search: str) -> List[Tuple[str, str]]:
+    """Query the DBLP author search API and return the (url, author) pairs of the hits.
+
+    Results are memoized per query string, so name variants that repeat a query
+    are answered without another request.
     """
-    url = f"https://dblp.org/search/author/api?q={name_for_search}&format=json"
+    if name_for_search in _search_hits:
+        return _search_hits[name_for_search]
+    url = f"{DBLP_BASE_URL}/search/author/api?q={name_for_search}&format=json"
+    candidates: List[Tuple[str, str]] = []
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
             result = response.json()
             hits = result.get("result", {}).get("hits", {}).get("hit", [])
+            if isinstance(hits, dict):
+                hits = [hits]
             for hit in hits:
                 info = hit.get("info", {})
-                dblp_record = get_DBLP_record(info.get("url", ""), info.get("author", "author"), force=True)
-                if dblp_record:
-                    similarity = is_same_dblp_and_mtmt_records(dblp_record, mtmt_record, pub_rec)
-                    if similarity>=0.5:
-                        return dblp_record, similarity
+                if info.get("url"):
+                    candidates.append((info["url"], info.get("author", "author")))
         else:
             print(f"HTTP hiba DBLP keresésnél {name_for_search}: {response.status_code}")
+            return candidates
     except Exception as e:
         print(f"Hiba DBLP keresésnél {name_for_search}: {e}")
+        return candidates
+    _search_hits[name_for_search] = candidates
+    return candidates
+
+
+def get_candidate_record(dblp_url: str, force: bool = False) -> Optional[dict]:
+    """Fetch the person record of a search candidate, cached by PID.
+
+    Candidates are cached in memory and under dblp/candidates/, separately from
+    the per-author dblp/{author}.json files, so a namesake found by a search
+    never overwrites the record of an author from the sheet.
+    """
+    pid = _pid_path(dblp_url)
+    with _candidate_lock:
+        if not force and pid in _candidate_records:
+            return _candidate_records[pid]
+    file_path = os.path.join(CANDIDATE_CACHE_DIR, pid.replace("/pid/", "").replace("/", "_") + ".json")
+    data = None
+    if not force and json_file(file_path):
+        try:
+            data = read_json(file_path)
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
+    if data is None:
+        try:
+            print(f"Fetching candidate: {DBLP_BASE_URL}{pid}.xml")
+            response = requests.get(f"{DBLP_BASE_URL}{pid}.xml", timeout=30)
+            if response.status_code != 200:
+                raise Exception(f"HTTP error {response.status_code}")
+            import xmltodict  # only needed when a record is downloaded
+            data = xmltodict.parse(response.content)
+            os.makedirs(CANDIDATE_CACHE_DIR, exist_ok=True)
+            write_json(file_path, data)
+        except Exception as e:
+            print(f"Error fetching candidate {pid}: {e}")
+            return None
+    with _candidate_lock:
+        _candidate_records[pid] = data
+    return data
+
+
+def score_dblp_candidates(urls: List[str], mtmt_record: dict, pub_rec: list,
+                          signature: Optional[FrozenSet[int]] = None,
+                          max_workers: int = DBLP_MAX_WORKERS) -> List[Tuple[float, str, dict]]:
+    """Fetch the candidate records concurrently and score them against the MTMT author in one batch.
+
+    Returns (similarity, url, record) tuples sorted by decreasing similarity;
+    ties keep the order of the input urls.
+    """
+    if signature is None:
+        signature = mtmt_title_signature(mtmt_record, pub_rec)
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        records = list(pool.map(get_candidate_record, urls))
+    scored = []
+    for url, record in zip(urls, records):
+        if record:
+            scored.append((is_same_dblp_and_mtmt_records(record, mtmt_record, pub_rec, signature), url, record))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
+
+
+def search_dblp_by_name(name_for_search: str,
+                        mtmt_record: dict, pub_rec: list,
+                        signature: Optional[FrozenSet[int]] = None) :
+    """Search DBLP author API by name (with '+' separators) and verify candidate hits.
+
+    Returns (best matching DBLP record, similarity) if the similarity is at least 0.5,
+    otherwise (None, 0.0).
+    """
+    urls = list(dict.fromkeys(url for url, _ in search_dblp_candidates(name_for_search)))
+    scored = score_dblp_candidates(urls, mtmt_record, pub_rec, signature)
+    if scored and scored[0][0] >= 0.5:
+        return scored[0][2], scored[0][0]
     return None, 0.0
 
 def find_dblp_by_name(mtmt_record: dict, pub_rec: list):
-    """Try the full MTMT given + family name, then component combinations if needed."""
+    """Try the full MTMT given + family name, then component combinations if needed.
+
+    Each stage runs its name searches, deduplicates the candidate PIDs against
+    everything already scored, fetches the new candidates once (concurrently,
+    cached) and scores them in one batch. The best candidate is returned as
+    soon as a stage yields a similarity above 0.5; candidates below 0.5 are
+    never returned (None if no candidate reaches it).
+    """
     family = mtmt_record.get("familyName", "")
     given = mtmt_record.get("givenName", "")
     full = f"{given} {family}".strip()
-    query = full.replace(" ", "+")
-    ret, similarity = search_dblp_by_name(query, mtmt_record, pub_rec)
-    if ret and similarity> 0.5:
-        return ret
-    print(f"Trying alternative name combinations for {full} DBLP search for mtmt {mtmt_record.get('mtid', '')} ")
-    best_dbl=None
-    best_similarity=0.0
-    if not ret and (len(given.split()) > 2 or len(family.split()) > 2):
-        for g_part in given.split():
-            for f_part in family.split():
-                alt = f"{g_part}+{f_part}"
-                ret, similarity = search_dblp_by_name(alt, mtmt_record, pub_rec)
-                if similarity> best_similarity:
-                    best_dbl = ret
-                    best_similarity = similarity
-                    if similarity>0.5:
-                        return best_dbl
-    if best_similarity>0.5:
-        return best_dbl
-    if not ret and len(family.split()) >= 1:
-        for f_part in family.split():
-            alt = f"{f_part}"
-            ret, similarity = search_dblp_by_name(alt, mtmt_record, pub_rec)
-            if similarity> best_similarity:
-                best_dbl = ret
-                best_similarity = similarity
-                if similarity>0.5:
-                    return best_dbl
+    signature = mtmt_title_signature(mtmt_record, pub_rec)
+
+    stages = [[full.replace(" ", "+")]]
+    if len(given.split()) > 2 or len(family.split()) > 2:
+        stages.append([f"{g_part}+{f_part}" for g_part in given.split() for f_part in family.split()])
+    if len(family.split()) >= 1:
+        stages.append(family.split())
+
+    best_dbl = None
+    best_similarity = 0.0
+    seen = set()
+    for stage_no, queries in enumerate(stages):
+        if stage_no == 1:
+            print(f"Trying alternative name combinations for {full} DBLP search for mtmt {mtmt_record.get('mtid', '')} ")
+        queries = list(dict.fromkeys(queries))
+        with ThreadPoolExecutor(max_workers=DBLP_MAX_WORKERS) as pool:
+            hit_lists = list(pool.map(search_dblp_candidates, queries))
+        urls = []
+        for hits in hit_lists:
+            for url, _ in hits:
+                pid = _pid_path(url)
+                if pid not in seen:
+                    seen.add(pid)
+                    urls.append(url)
+        scored = score_dblp_candidates(urls, mtmt_record, pub_rec, signature)
+        # as in search_dblp_by_name, a candidate below 0.5 is not a match at all
+        if scored and scored[0][0] >= 0.5 and scored[0][0] > best_similarity:
+            best_similarity, _, best_dbl = scored[0]
+        if best_similarity > 0.5:
+            return best_dbl
     return best_dbl
 
 
@@ -141,9 +247,7 @@ def extract_affiliation_info(dblp_record: dict) -> Tuple[str, str]:
             affil = note["affiliation"].lower()
             label = note.get("@label", "").lower()
             entry = affil if not label else f"{affil} ({label})"
-            if any(x in affil for x in ["budapest", "hungary", "magyarország", "szeged", "egyetem", "renyi"]):
-                return entry, "hungary"
-            return entry, "abroad"
+            return entry, location_of(affil)
     return "", ""
 
 def compare_dblp_paper_to_mtmt(paper: dict,
@@ -170,48 +274,79 @@ def compare_dblp_paper_to_mtmt(paper: dict,
             return False
     return False
 
+# Title signatures of MTMT authors, computed once per author and reused for every candidate
+_title_signatures: Dict[Tuple[str, int], FrozenSet[int]] = {}
+
+
+def normalize_title(title: Any) -> str:
+    """Canonical form of a paper title used for DBLP/MTMT matching.
+
+    Handles DBLP's {'#text': ...} titles, applies NFKC normalization, collapses
+    whitespace, drops the trailing period and casefolds.
+    """
+    if isinstance(title, dict):
+        title = title.get('#text', '')
+    if not isinstance(title, str):
+        return ""
+    title = unicodedata.normalize("NFKC", title)
+    return " ".join(title.split()).rstrip('.').casefold()
+
+
+def mtmt_title_signature(mtmt_record: dict, pub_rec: list) -> FrozenSet[int]:
+    """Return the set of normalized title hashes of an MTMT author's publications.
+
+    The signature is memoized per MTMT id, so verifying many DBLP candidates
+    against the same author only normalizes the MTMT titles once.
+    """
+    mtid = str(mtmt_record.get("mtid", "")) if isinstance(mtmt_record, dict) else ""
+    cache_key = (mtid, len(pub_rec or []))
+    if mtid and cache_key in _title_signatures:
+        return _title_signatures[cache_key]
+    titles = (normalize_title(paper.get('title', '')) for paper in pub_rec or [] if isinstance(paper, dict))
+    signature = frozenset(hash(title) for title in titles if title)
+    if mtid:
+        _title_signatures[cache_key] = signature
+    return signature
+
+
+def dblp_title_hashes(dblp_record: dict) -> set:
+    """Return the normalized title hashes of the inproceedings/article entries of a DBLP person record."""
+    root = dblp_record.get("dblpperson", dblp_record)
+    papers = root.get("r", [])
+    if isinstance(papers, dict):
+        papers = [papers]
+    entries = (paper_dict.get('inproceedings') or paper_dict.get('article')
+               for paper_dict in papers if isinstance(paper_dict, dict))
+    titles = (normalize_title(entry.get('title', '')) for entry in entries if isinstance(entry, dict))
+    return {hash(title) for title in titles if title}
+
+
 def is_same_dblp_and_mtmt_records(dblp_record: dict,
-                                  mtmt_record: dict, pub_rec: list) -> float:
-    """Iterate papers in DBLP record until a confirming match is found in MTMT."""
+                                  mtmt_record: dict, pub_rec: list,
+                                  signature: Optional[FrozenSet[int]] = None) -> float:
+    """Score how likely a DBLP person record and an MTMT author are the same person.
+
+    The score is derived from the number of MTMT titles that also appear in the
+    DBLP record (a set intersection of normalized title hashes). Pass a
+    precomputed ``signature`` (see mtmt_title_signature) when scoring many
+    DBLP candidates against the same MTMT author.
+    """
     if not dblp_record or not mtmt_record or not pub_rec:
         return 0.0
-    root = dblp_record.get("dblpperson", dblp_record)
-    papers = root.get("r", [])
-    titles=[]
-    mtmt_papers = mtmt_record if isinstance(mtmt_record, list) else [mtmt_record]
-    for paper in pub_rec:
-        title=paper.get('title','')
-        if title and title not in titles:
-            titles.append(title)
-
-    found=0
-    if isinstance(papers, list):
-        for  paper_dict in papers:
-            if 'inporceedings' in paper_dict:
-                paper=paper_dict['inproceedings']
-            elif 'article' in paper_dict:
-                paper=paper_dict['article']
-            if paper is not None:
-                if 'title' in paper:
-                    if isinstance(paper['title'], dict):
-                        title=paper['title'].get('#text','')
-                    else:
-                        title=paper.get('title', '')
-                    if title.endswith('.'):
-                        title=title[:-1]
-                    if title in titles:
-                        found+=1
-        if found<len(titles) // 2 and found>0:
-            print(f"Potenciális DBLP és MTMT rekord (talált: {found} / {len(titles)}) {root['@name']}")
-            if found >=5:
-                return  0.4 + 0.6 * found / len(titles)
-        if found>0:
-            return 0.3 + 0.7 * found / len(titles)
-    else:
-        title=papers.get('title', '') if 'title' in papers else ''
-        if title in titles:
-            return 1.0
-    return 0.0
+    if signature is None:
+        signature = mtmt_title_signature(mtmt_record, pub_rec)
+    if not signature:
+        return 0.0
+    found = len(dblp_title_hashes(dblp_record) & signature)
+    if found == 0:
+        return 0.0
+    total = len(signature)
+    if found < total // 2:
+        root = dblp_record.get("dblpperson", dblp_record)
+        print(f"Potenciális DBLP és MTMT rekord (talált: {found} / {total}) {root.get('@name', '')}")
+        if found >= 5:
+            return 0.4 + 0.6 * found / total
+    return 0.3 + 0.7 * found / total
 
 def check_if_dblp_id_corresponds_to_mtmt(mtmt_id: str,
                                          author_name: str,
@@ -263,20 +398,20 @@ def cache_DBLP_query(authors_data,force):
         #    continue
 
         # we save the reuslts as dblp/author_name.json
-        author_safe = google_author_sheet.remove_accents(author).replace(" ", "_")
+        author_safe = remove_accents(author).replace(" ", "_")
         output_path = os.path.join("dblp", "{}.json".format(author_safe))
 
-        if not force and os.path.exists(output_path):
+        if not force and json_file(output_path):
             #print(f"Skip {author} (already exists)")
             continue
 
-        author_query = google_author_sheet.remove_accents(author)
+        author_query = remove_accents(author)
         if "dblp_url" in author_cls and author_cls.get("dblp_url", "").strip() != "":
             pid = author_cls.get("dblp_url", "").strip()
-            url = "https://dblp.org/pid{}.xml".format(pid)
+            url = "{}/pid{}.xml".format(DBLP_BASE_URL, pid)
         else:
             print("No pid for {}, using name search".format(author))
-            url = "https://dblp.org/search/publ/api?q=author:{}&h=1000&format=xml".format(quote(author_query))
+            url = "{}/search/publ/api?q=author:{}&h=1000&format=xml".format(DBLP_BASE_URL, quote(author_query))
         
         try:
             print("Fetching: {}".format(author))
@@ -294,10 +429,10 @@ def cache_DBLP_query(authors_data,force):
             if response.status_code != 200:
                 raise Exception("HTTP error {}".format(response.status_code))
 
+            import xmltodict  # only needed when a record is downloaded
             data = xmltodict.parse(response.content)
             #data = response.json()
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json(output_path, data)
 
         except Exception as e:
             print("Error with {}: {}".format(author,e))
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Render scheduler with a content-addressed figure cache.
+
+Every figure (or group of figures written by one plot function) is described
+by a FigureJob: the plot function, its arguments, the input files it reads and
+the output files it writes. The hash of the function's code (its module and the
+repository modules it imports, see code_sources), the arguments,
+the input files and the matplotlib style is stored per job in
+results/figure_manifest.json; if the hash did not change and all outputs exist,
+the job is skipped. The remaining jobs are rendered in a process pool with the
+Agg backend; the pool uses spawned (not forked) processes, since the daily run
+calls this while other pipeline stages run in threads.
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import hashlib
+import inspect
+import json
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from io_utils import RESULTS_DIR, file_digest, read_json, write_json
+
+FIGURE_MANIFEST = os.path.join(RESULTS_DIR, "figure_manifest.json")
+# matplotlib rcParams applied in every render process (part of the hash)
+FIGURE_STYLE = {"font.size": 14}
+# number of render processes; 1 renders in this process (useful for debugging)
+FIGURE_WORKERS = int(os.environ.get("FIGURE_WORKERS", "0")) or None
+
+# render_figures may run in concurrent pipeline stages; the manifest is merged under this lock
+_manifest_lock = threading.Lock()
+
+FigureJob = namedtuple("FigureJob", ["name", "func", "args", "kwargs", "outputs", "inputs"])
+
+
+def figure_job(func, *args, outputs: List[str], inputs: Optional[List[str]] = None, name: Optional[str] = None, **kwargs) -> FigureJob:
+    """Describe one call of a plot function: func(*args, **kwargs) writes `outputs` and reads `inputs`."""
+    return FigureJob(name or f"{func.__module__}.{func.__qualname__}", func, args, kwargs, list(outputs), list(inputs or []))
+
+
+def _update_hash(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _update_hash(h, v)
+        h.update(b"]")
+    else:
+        h.update(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _code_names(code) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def code_sources(func) -> List[str]:
+    """Source files of this repository the plot function depends on: its own module, the
+    modules that module imports (module-level names) and the modules imported inside func."""
+    modules = [sys.modules.get(name) for name in _code_names(func.__code__)]
+    for value in getattr(func, "__globals__", {}).values():
+        modules.append(value if inspect.ismodule(value) else sys.modules.get(getattr(value, "__module__", None) or ""))
+    root = os.path.abspath(_parent) + os.sep
+    paths = {os.path.abspath(inspect.getsourcefile(func))}
+    for module in modules:
+        path = getattr(module, "__file__", None) if inspect.ismodule(module) else None
+        if path and path.endswith(".py") and os.path.abspath(path).startswith(root):
+            paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def job_hash(job: FigureJob, style: Dict) -> str:
+    h = hashlib.sha256()
+    h.update(job.name.encode("utf-8"))
+    _update_hash(h, [(os.path.relpath(p, _parent), file_digest(p)) for p in code_sources(job.func)])
+    _update_hash(h, style)
+    _update_hash(h, list(job.args))
+    _update_hash(h, job.kwargs)
+    _update_hash(h, [(p, file_digest(p)) for p in job.inputs])
+    return h.hexdigest()
+
+
+def _init_worker(style):
+    import matplotlib
+    matplotlib.use("Agg")
+    matplotlib.rcParams.update(style)
+
+
+def _run_job(func, args, kwargs):
+    import matplotlib.pyplot as plt
+    try:
+        func(*args, **kwargs)
+    finally:
+        plt.close("all")
+
+
+def load_manifest() -> Dict[str, str]:
+    try:
+        return read_json(FIGURE_MANIFEST)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_figures(jobs: List[FigureJob], max_workers: Optional[int] = FIGURE_WORKERS, force: bool = False,
+                   style: Optional[Dict] = None) -> Dict[str, str]:
+    """Render the jobs whose inputs changed; returns {job name: 'cached' | 'rendered' | 'failed'}."""
+    style = FIGURE_STYLE if style is None else style
+    manifest = load_manifest()
+    status = {}
+    todo = []
+    for job in jobs:
+        key = job_hash(job, style)
+        if not force and manifest.get(job.name) == key and all(os.path.exists(p) for p in job.outputs):
+            status[job.name] = "cached"
+            continue
+        todo.append((job, key))
+    if todo:
+        print(f"Rendering {len(todo)} figure job(s), {len(jobs) - len(todo)} unchanged")
+    for job, _ in todo:
+        for p in job.outputs:
+            if os.path.dirname(p):
+                os.makedirs(os.path.dirname(p), exist_ok=True)
+
+    def _done(job, key, error):
+        if error is None:
+            manifest[job.name] = key
+            status[job.name] = "rendered"
+        else:
+            manifest.pop(job.name, None)
+            status[job.name] = "failed"
+            print(f"❌ Figure job {job.name} failed: {error}")
+
+    if max_workers == 1 or len(todo) <= 1:
+        _init_worker(style)
+        for job, key in todo:
+            try:
+                _run_job(job.func, job.args, job.kwargs)
+                _done(job, key, None)
+            except Exception as e:
+                _done(job, key, e)
+    else:
+        workers = min(len(todo), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(style,)) as pool:
+            futures = {pool.submit(_run_job, job.func, job.args, job.kwargs): (job, key) for job, key in todo}
+            for fut in as_completed(futures):
+                job, key = futures[fut]
+                _done(job, key, fut.exception())
+
+    with _manifest_lock:
+        stored = load_manifest()
+        for name in status:
+            if name in manifest:
+                stored[name] = manifest[name]
+            else:
+                stored.pop(name, None)
+        os.makedirs(os.path.dirname(FIGURE_MANIFEST), exist_ok=True)
+        write_json(FIGURE_MANIFEST, stored)
+    return status
@@ -36,6 +36,9 @@ import google_author_sheet
 import tudometer
 import dblp_utils
 import classify_paper
+import paper_cube
+import figure_cache
+import io_utils
 # import download_author_google_sheet,remove_accents, count_papers_by_author, generate_author_google_sheet, fix_encoding, get_year_range, parse_affiliation, is_year_range
 import numpy as np
 
@@ -50,6 +53,9 @@ COLOR_GYAKORLATI_NO = BASE_COLORS[3]
 
 fs = 24  # font size for plots
 
+# authors_data fields read by plot_excellence_theory_applied_pies
+EXCELLENCE_FIELDS = ["First Author Core A* equivalent", "paper_countA*", "Core A* equivalent", "category", "status", "works"]
+
 FIG_DIR = "figures"
 os.makedirs(FIG_DIR, exist_ok=True)
 
@@ -88,26 +94,21 @@ def load_json(path):
     return _load_json(path)
 
 
-def plot_conference_pies(core_table):
+def plot_conference_pies(core_table, cube=None):
     """Plot two pie charts side-by-side for Core A* and Core A conferences.
     Each pie shows: [Elméleti — van cikk, Elméleti — nincs cikk, Gyakorlati — van cikk, Gyakorlati — nincs cikk]
     Colors are fixed as requested in BASE_COLORS.
     """
+    if cube is None:
+        cube = paper_cube.load_cube()
     labels = ["Elméleti — van cikk", "Elméleti — nincs cikk", "Gyakorlati — van cikk", "Gyakorlati — nincs cikk"]
     colors = BASE_COLORS[:]  # user-requested 4 colors in order
 
     fig, axes = plt.subplots(1, 2, figsize=(16, 8))
     sizes_by_rank = {}
     for ax, rank in zip(axes, ["Astar", "A"]):
-        # load conference classification and papers
-        papers = load_json(f"hungarian_papers_core{rank}.json") or {}
-
-        venues_with_papers = set()
-        for p in papers.values():
-            venue = (p.get("venue") or "").upper()
-            venue = classify_paper.remove_numbers_and_parentheses(venue).upper()
-            if venue:
-                venues_with_papers.add(venue)
+        # venues with Hungarian papers (slice of the paper cube)
+        venues_with_papers = set(paper_cube.slice_counts(cube, "venue", file="hungarian", rank=rank).index) - {""}
 
         # counters
         th_with = th_without = pr_with = pr_without = 0
@@ -157,41 +158,25 @@ def plot_conference_pies(core_table):
         print(f"⚠️ Failed to write conference pies LaTeX table: {e}")
 
 
-def plot_mta_class_pies(authors_data, core_table):
+def plot_mta_class_pies(authors_data, core_table, cube=None):
     """Plot distribution of papers per MTA class for Core A* and Core A (pie charts).
     Uses reserved colors for III and VI classes to keep consistent appearance.
     """
+    if cube is None:
+        cube = paper_cube.load_cube()
     reserved = {INFORMATIKA[3]: COLOR_III, INFORMATIKA[6]: COLOR_VI}
     ranks=["Astar", "A"] #,"B","C","no_rank"
     for file in ["hungarian", "already_abroad"]:
         counter={}
         fig, axes = plt.subplots(1, 2, figsize=(16, 8))
         for ax, rank in zip(axes, ranks):
-            papers = load_json(f"{file}_papers_core{rank}.json") or {}
-            
             cnt = Counter()
-            for p in papers.values():
-                venue = (p.get("venue") or "")
-                venue = classify_paper.remove_numbers_and_parentheses(venue).upper()
-                acronym_row, short_paper = classify_paper.identify_conference(venue, p.get("crossref"), p.get("url"))
-                m = acronym_row.get("mta_class",None) if acronym_row is not None else None
-                # Handle case where loc returns a Series (multiple rows)
-                if isinstance(m, pd.Series):
-                    m = m.iloc[0] if len(m) > 0 else None
-                # Convert to int if m is a valid number
-                if m is not None and not pd.isna(m):
-                    try:
-                        m = int(m)
-                    except (ValueError, TypeError):
-                        pass
-                # Treat missing/NaN as Unknown to avoid 'nan' label
-                if m is None or pd.isna(m):
-                    key = "Unknown"
-                else:
-                    key = INFORMATIKA.get(m, f"{m}")
+            for m, n in paper_cube.slice_counts(cube, "mta_class", file=file, rank=rank).items():
+                key = INFORMATIKA.get(int(m), m) if m.isdigit() else m
                 if key not in ["Elméleti informatika", "Alkalmazott informatika"]:
-                    print(f"⚠️ Unknown MTA class for venue: {venue} (mta_class={m}) in paper ID {p.get('id')}")
-                cnt[key] += 1
+                    venues = paper_cube.slice_counts(cube, "venue", file=file, rank=rank, mta_class=m)
+                    print(f"⚠️ Unknown MTA class (mta_class={m}) for {int(n)} papers at venues: {', '.join(venues.index)}")
+                cnt[key] += int(n)
 
             items = cnt.most_common()
             # keep top 4 and aggregate rest as Other
@@ -371,37 +356,21 @@ def next_color_for_label(label, reserved_vals=None):
     return col
 
 
-def plot_stacked_by_year(authors_data,core_table):
+def plot_stacked_by_year(authors_data,core_table, cube=None):
     """Create stacked bar chart of papers per year and MTA class for Core A* and Core A.
     Colors are aligned across ranks: III uses COLOR_III, VI uses COLOR_VI, others sampled.
     """
+    if cube is None:
+        cube = paper_cube.load_cube()
     ranks = ["Astar", "A"]
     for rank in ranks:
         for file in ["hungarian", "already_abroad"]:
-            papers = load_json(f"{file}_papers_core{rank}.json") or {}
-
-
             by_year = defaultdict(Counter)
-            for p in papers.values():
-                year = p.get("year")
-                if year is None:
+            counts = paper_cube.slice_counts(cube, ["year", "acronym_mta_class"], file=file, rank=rank)
+            for (y, lab), n in counts.items():
+                if y == -1:
                     continue
-                try:
-                    y = int(year)
-                except Exception:
-                    continue
-                venue = (p.get("venue") or "")
-                venue = classify_paper.remove_numbers_and_parentheses(venue).upper()
-                m = core_table.loc[venue, "mta_class"] if venue in core_table.index else None
-                # Handle case where loc returns a Series (multiple rows)
-                if isinstance(m, pd.Series):
-                    m = m.iloc[0] if len(m) > 0 else None
-                # Treat missing/NaN mta_class as Unknown to avoid 'nan' column
-                if m is None or pd.isna(m):
-                    lab = "Unknown"
-                else:
-                    lab = str(m)
-                by_year[y][lab] += 1
+                by_year[int(y)][lab] += int(n)
 
             if not by_year:
                 print(f"No year data for CORE {rank}")
@@ -852,12 +821,26 @@ def main():
         core_table = pd.DataFrame(expanded_rows)
     
     core_table = core_table.set_index("Acronym", drop=False)
-    plot_mta_class_pies(authors_data, core_table)
-    plot_stacked_by_year(authors_data, core_table)
-    plot_conference_pies(core_table)
-    #plot_author_pyramid()
-    plot_excellence_theory_applied_pies(authors_data)
-    plot_mtmt_ratings_comparison()
+    cube = paper_cube.load_cube()
+    # only the fields used by the excellence pies, so that unrelated changes do not re-render them
+    excellence_data = {name: {k: data[k] for k in EXCELLENCE_FIELDS if k in data} for name, data in authors_data.items()}
+    files = ["hungarian", "already_abroad"]
+    jobs = [
+        # authors_data is not used by the MTA class and by-year charts
+        figure_cache.figure_job(plot_mta_class_pies, None, core_table, cube,
+            outputs=[f"figures/{f}_core_Astar_A_class_pies.png" for f in files] + [f"doc/figures/{f}_summary_table.tex" for f in files]),
+        figure_cache.figure_job(plot_stacked_by_year, None, core_table, cube,
+            outputs=[f"figures/core_{f}_{r}_by_year.png" for f in files for r in ["Astar", "A"]]),
+        figure_cache.figure_job(plot_conference_pies, core_table, cube,
+            outputs=[os.path.join(FIG_DIR, "conference_core_Astar_A_pie.png"), "doc/figures/conference_pies_summary.tex"]),
+        #plot_author_pyramid()
+        figure_cache.figure_job(plot_excellence_theory_applied_pies, excellence_data,
+            outputs=[f"figures/{key}_theory_applied_pies.png" for key in ["Established", "Expert", "Rising", "Entry"]] + ["doc/figures/excellence_summary_table.tex"]),
+        figure_cache.figure_job(plot_mtmt_ratings_comparison,
+            inputs=[os.path.join(io_utils.RESULTS_DIR, f"papers_in_mtmt_{r}.json") for r in ["Astar", "A"]],
+            outputs=["figures/sjr_rating.png"]),
+    ]
+    figure_cache.render_figures(jobs)
 
 if __name__ == '__main__':
     main()
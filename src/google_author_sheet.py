@@ -5,6 +5,8 @@ import re
 #import xml.etree.ElementTree as ET
 import json
 import io
+import hashlib
+import pickle
 #from urllib.parse import quote
 from unidecode import unidecode
 #from collections import Counter
@@ -18,36 +20,18 @@ if _parent not in sys.path:
 if _src not in sys.path:
     sys.path.insert(0, _src)
 
-import pandas as pd
-import tudometer
-import run_every_day
 import mtmt_utils
 import dblp_utils
-import mta_att_utils
-import create_author_order
 import classify_author
+import score_cache
+from io_utils import read_json, write_json
+# tudometer (which imports this module), create_author_order and pandas are
+# imported in the functions that need them, to keep `import google_author_sheet` light
 
 url = "https://docs.google.com/spreadsheets/d/124qQX0h0CqPZZhBJiUT7myNqonp4dLJ4uyYZTtfauZI/export?format=csv"
 
-#the list of hungarian research institutions
-institutions = {
-    "BME": ["bme", "budapest university of technology", "műegyetem"],
-    "ELTE": ["elte", "loránd eötvös", "eötvös loránd university"],
-    "SZTE": ["szte", "szegedi tudományegyetem", "university of szeged"],
-    "ÓE": ["óbudai egyetem", "obuda university"],
-    "SZTAKI": ["sztaki", "institute for computer science and control"],
-    "PPKE": ["ppke", "pázmány", "peter pazmany", "pazmany peter"],
-    "Corvinus": ["corvinus"],
-    "Rényi": ["rényi", "renyi", "alfréd rényi", "renyi alfréd", "rényi alfréd institute", "renyi institute","ranki"],
-    "Ericsson": ["ericsson", "ericsson research"],
-    "Hungary": ["mta", "hungarian", "hungary","budapest","debrecen"],
-}
-# for BME we have 3 departments
-departments = {
-    "BME-TMIT": ["bme-tmit", "department of telecommunications and media informatics","telecommunications and artificial intelligence"],
-    "BME-HIT": ["bme-hit", "department of networked systems and services"],
-    "BME-MIT": ["bme-mit", "department of measurement and information systems"]
-}
+# keyword tables of the hungarian research institutions and BME departments
+from affiliation_matcher import institutions, departments, match_affiliation
 
 
 # remove hungarian accents
@@ -147,6 +131,17 @@ def load_table(reader):
     print(f"Loaded {len(authors_data)} researcher records.")
     return authors_data
 
+def export_rows(rows):
+    """Text version of the typed sheet rows, used only when writing the CSV."""
+    return [{key: str(val) for key, val in row.items()} for row in rows]
+
+
+def _score_author(name, data):
+    import tudometer
+    dblp_record=dblp_utils.get_DBLP_record(data['dblp_url'], name, force=False)
+    tudometer.count_CORE_papers_by_author(name, data, dblp_record, print_log=False)
+
+
 def generate_author_google_sheet(authors_data, print_only=False, no_processing=False):
     """
     authors_data: dict, amit a load_table készített
@@ -162,12 +157,17 @@ def generate_author_google_sheet(authors_data, print_only=False, no_processing=F
 
     output_rows = []
     classify_author.create_pid_to_name_map(authors_data)
+    if not no_processing:
+        # only rescore the authors whose inputs changed since the last run
+        cache = score_cache.load_score_cache()
+        shared_digest = score_cache.global_digest()
+        classification = score_cache.classification_map(authors_data)
+        reused = 0
     for name, data in authors_data.items():
         if not no_processing:
             #print("Note: no_processing=False, performing value conversions.")
             if 'dblp_url' in data:
-                dblp_record=dblp_utils.get_DBLP_record(data['dblp_url'], name, force=False)
-                tudometer.count_CORE_papers_by_author(name, data, dblp_record, print_log=False)
+                reused += score_cache.score_author(name, data, _score_author, cache, shared_digest, classification)
             else:
                 print(f"Skipping row {name} as htere is no dblp url in the he google sheet")
 
@@ -198,7 +198,8 @@ def generate_author_google_sheet(authors_data, print_only=False, no_processing=F
             # ---- listák visszaalakítása
             if isinstance(val, list):
                 val = "; ".join(val)
-            row[src_field] = str(val)
+            # numbers stay numbers for the ranking, they are converted to text at export time
+            row[src_field] = val
             if str(val)!=data[dst_field]:
                 data[dst_field+'_'] = val  # frissítés visszafelé is
         
@@ -206,6 +207,13 @@ def generate_author_google_sheet(authors_data, print_only=False, no_processing=F
         #if len(missing):
         #    print(f"There are missing fileds {missing} in {data}")
 
+    if not no_processing:
+        score_cache.save_score_cache({n: e for n, e in cache.items() if n in authors_data})
+        print(f"Scores reused for {reused}/{len(authors_data)} authors.")
+
+    import create_author_order
+    import pandas as pd
+
     # Use create_author_order to add author order annotation and sort by Core metrics
     # Also adds category-based and age-group-based rankings
     output_rows = create_author_order.prepare_author_order_with_extensions(
@@ -233,10 +241,9 @@ def generate_author_google_sheet(authors_data, print_only=False, no_processing=F
                         authors_data[author_name][key] = val
 
     # Save full_authors_data.json AFTER copying back ranking fields
-    with open("results/full_authors_data.json", "w", encoding="utf-8") as f:
-        json.dump(authors_data, f, indent=2, ensure_ascii=False)
+    write_json("results/full_authors_data.json", authors_data, pretty=True)
 
-    df = pd.DataFrame(output_rows)
+    df = pd.DataFrame(export_rows(output_rows))
     # Remove internal tracking column before CSV export
     if "_author_name" in df.columns:
         df = df.drop(columns=["_author_name"])
@@ -257,48 +264,159 @@ def generate_author_google_sheet(authors_data, print_only=False, no_processing=F
     return output_rows
 
 
+# Cache of the sheet: raw CSV bytes + ETag on disk, parsed authors_data as a pickle snapshot
+SHEET_CACHE_CSV = os.path.join("results", "author_sheet.csv")
+SHEET_CACHE_META = os.path.join("results", "author_sheet_meta.json")
+SHEET_CACHE_SNAPSHOT = os.path.join("results", "author_sheet_snapshot.pickle")
+_sheet_cache = {}  # per process: sha256, rows, snapshot
+
+
+def _parse_sheet_bytes(raw_bytes):
+    """Parse the CSV export into a list of dicts, repairing mojibake in the header names."""
+    # Force UTF-8 decoding; Google's CSV sometimes lacks explicit charset header
+    text = raw_bytes.decode('utf-8-sig', errors='replace')
+    rows = list(csv.DictReader(io.StringIO(text)))
+    # Repair mojibake in column names (keys) caused by prior latin1 decoding
+    repaired_rows = []
+    for r in rows:
+        new_r = {}
+        for k, v in r.items():
+            new_r[fix_encoding(k)] = v
+        repaired_rows.append(new_r)
+    # Optional: warn if we had to repair something
+    if rows and any('Ã' in k for k in rows[0].keys()):
+        print("[info] Repaired mojibake in header names.")
+    return repaired_rows
+
+
+def _read_cached_sheet():
+    try:
+        with open(SHEET_CACHE_CSV, "rb") as f:
+            raw_bytes = f.read()
+        meta = read_json(SHEET_CACHE_META)
+        return raw_bytes, meta
+    except (OSError, ValueError):
+        return None, {}
+
+
+def fetch_author_google_sheet(force=False):
+    """Returns (raw_bytes, sha256) of the sheet, fetched at most once per process.
+
+    Uses a conditional request (ETag / Last-Modified) against the copy cached in
+    results/; on 304 or on a network error the cached copy is used.
+    Returns (None, None) if neither the sheet nor a cached copy is available.
+    """
+    if _sheet_cache.get("sha256") and not force:
+        return _sheet_cache["raw_bytes"], _sheet_cache["sha256"]
+    import requests
+    cached_bytes, meta = _read_cached_sheet()
+    raw_bytes = None
+    headers = {}
+    if cached_bytes is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        response = requests.get(url, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        response = None
+        print(f"⚠️ Failed to download the google sheet with hungarian researchers: {e}")
+    if response is not None and response.status_code == 304 and cached_bytes is not None:
+        raw_bytes = cached_bytes
+    elif response is not None and response.status_code == 200:
+        raw_bytes = response.content
+        meta = {
+            "sha256": hashlib.sha256(raw_bytes).hexdigest(),
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+        }
+        try:
+            if cached_bytes != raw_bytes:
+                os.makedirs(os.path.dirname(SHEET_CACHE_CSV), exist_ok=True)
+                with open(SHEET_CACHE_CSV, "wb") as f:
+                    f.write(raw_bytes)
+            write_json(SHEET_CACHE_META, meta, compress=False)
+        except OSError as e:
+            print(f"⚠️ Failed to cache the google sheet in {SHEET_CACHE_CSV}: {e}")
+    else:
+        if response is not None:
+            print("Failed to load the google sheet with hungarian researchers ({}): {}".format(response.status_code, response.text))
+        print("Using the cached copy of the google sheet" if cached_bytes is not None else "No cached copy of the google sheet")
+        raw_bytes = cached_bytes
+    if raw_bytes is None:
+        return None, None
+    sha256 = hashlib.sha256(raw_bytes).hexdigest()
+    _sheet_cache.clear()
+    _sheet_cache.update({"raw_bytes": raw_bytes, "sha256": sha256})
+    return raw_bytes, sha256
+
+
 def download_raw_author_google_sheet():
     """Downloads the raw Google Sheet and returns it as a list of dicts (rows)."""
+    raw_bytes, sha256 = fetch_author_google_sheet()
+    if raw_bytes is not None:
+        if "rows" not in _sheet_cache:
+            _sheet_cache["rows"] = _parse_sheet_bytes(raw_bytes)
+        return [dict(r) for r in _sheet_cache["rows"]]
+    #print("Try loading the local csv with hungarian researchers")
     try:
-        import requests
-        response = requests.get(url)
-        if response.status_code == 200:
-            # Force UTF-8 decoding; Google's CSV sometimes lacks explicit charset header
-            raw_bytes = response.content
-            text = raw_bytes.decode('utf-8', errors='replace')
-            content = io.StringIO(text)
-            reader = csv.DictReader(content)
-            rows = list(reader)
-            # Repair mojibake in column names (keys) caused by prior latin1 decoding
-            repaired_rows = []
-            for r in rows:
-                new_r = {}
-                for k, v in r.items():
-                    repaired_key = fix_encoding(k)
-                    new_r[repaired_key] = v
-                repaired_rows.append(new_r)
-            # Optional: warn if we had to repair something
-            if any('Ã' in k for k in rows[0].keys()):
-                print("[info] Repaired mojibake in header names.")
-            return repaired_rows  # list of dicts
-        else:
-            print("Failed to load the google sheet with hungarian researchers ({}): {}".format(response.status_code, response.text))
-            return []
-    except Exception as e:
-        #print("Try loading the local csv with hungarian researchers:(connection error {})".format(e))
-        with open("authors_data.csv", "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            repaired_rows = []
-            for r in rows:
-                new_r = {}
-                for k, v in r.items():
-                    new_r[fix_encoding(k)] = v
-                repaired_rows.append(new_r)
-            print("Hungarian researchers are loaded from authors_data.csv")
-            return repaired_rows  # Convert to list to avoid iterator exhaustion
+        with open("authors_data.csv", "rb") as f:
+            rows = _parse_sheet_bytes(f.read())
+    except FileNotFoundError:
+        print("Failed to load the google sheet with hungarian researchers and authors_data.csv is missing")
+        return []
+    print("Hungarian researchers are loaded from authors_data.csv")
+    return rows
+
+
+def _snapshot_key(sha256):
+    """The parsed snapshot is only valid for the same sheet and the same parsing tables."""
+    tables = json.dumps([field_map, institutions, departments], sort_keys=True, ensure_ascii=False)
+    return sha256 + ":" + hashlib.sha256(tables.encode("utf-8")).hexdigest()
+
+
+def _load_snapshot(key):
+    if _sheet_cache.get("snapshot_key") == key:
+        return pickle.loads(_sheet_cache["snapshot"])
+    try:
+        with open(SHEET_CACHE_SNAPSHOT, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if not isinstance(stored, dict) or stored.get("key") != key:
+        return None
+    _sheet_cache["snapshot_key"] = key
+    _sheet_cache["snapshot"] = stored["authors_data"]
+    return pickle.loads(stored["authors_data"])
+
+
+def _save_snapshot(key, authors_data):
+    blob = pickle.dumps(authors_data, protocol=pickle.HIGHEST_PROTOCOL)
+    _sheet_cache["snapshot_key"] = key
+    _sheet_cache["snapshot"] = blob
+    tmp_path = SHEET_CACHE_SNAPSHOT + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"key": key, "authors_data": blob}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, SHEET_CACHE_SNAPSHOT)
+    except OSError as e:
+        print(f"⚠️ Could not save the author sheet snapshot: {e}")
+
 
 def download_author_google_sheet():
+    """Returns authors_data extended with location, institution and department.
+
+    If the sheet content has not changed since the last run, a copy of the
+    parsed snapshot is returned instead of parsing it again.
+    """
+    _, sha256 = fetch_author_google_sheet()
+    key = _snapshot_key(sha256) if sha256 else None
+    if key:
+        authors_data = _load_snapshot(key)
+        if authors_data is not None:
+            print(f"Loaded {len(authors_data)} researcher records (unchanged sheet).")
+            return authors_data
     reader = download_raw_author_google_sheet()
     authors_data = load_table(reader)
 
@@ -310,31 +428,23 @@ def download_author_google_sheet():
         department = None
         for aff_text in aff_texts:
             inst_name, years = parse_affiliation(aff_text)
-            for inst_key, keywords in institutions.items():
-                found = False
-                for kw in keywords:
-                    if kw in inst_name.lower():
-                        loc_label = "Hungary {}".format(years) if years else "Hungary"
-                        if loc_label not in location_entries:
-                            location_entries.append(loc_label)
-                        if institution is None:
-                            institution = inst_key
-                            if inst_key == "BME":
-                                for dep, keys in departments.items():
-                                    for kw in keys:
-                                        if kw in inst_key:
-                                            department = dep
-                                            break
-                        found = True
-                        break
-                if found:
-                    break
+            match = match_affiliation(inst_name)
+            if match.institution:
+                loc_label = "Hungary {}".format(years) if years else "Hungary"
+                if loc_label not in location_entries:
+                    location_entries.append(loc_label)
+                if institution is None:
+                    institution = match.institution
+                    if institution == "BME":
+                        department = match.department
         data["location"] = location_entries
         if institution:
             data["institution"] = institution
         if department:
             data["department"] = department        
     # now authors_data is extended with location, institution and department
+    if key:
+        _save_snapshot(key, authors_data)
     return authors_data
  
 
@@ -384,6 +494,7 @@ def extend_table_with_tudometer():
     generate_author_google_sheet(authors_data, print_only=False, no_processing=False)
                 
 def add_row_mtmt_id(data, authors_data, name, comment=''):
+    import tudometer
     data_new, dblp_person=tudometer.create_record(data['mtmt_id'])
     if data_new:
         print(f"Processing {comment}. {data_new['dblp_author_name']} mtmt_id={data['mtmt_id']}")
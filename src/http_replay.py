@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Record/replay of the DBLP and MTMT HTTP traffic.
+
+record: runs a script with every `requests` response saved as a fixture
+(one JSON file per method + path + query) in a fixtures directory.
+
+serve: a local stand-in for dblp.org and m2.mtmt.hu that answers from the
+fixtures, with configurable latency, error rate and 429 throttling (token
+bucket), so the fetch layers can be load-tested without network. The fetch
+code is pointed to it with the DBLP_BASE_URL / MTMT_BASE_URL environment
+variables. GET /__stats returns the request counts by status.
+
+Usage:
+    python src/http_replay.py record --fixtures fixtures/ run_every_day.py --force
+    python src/http_replay.py serve --fixtures fixtures/ --port 8765 --latency 0.05 --rate-limit 10
+    DBLP_BASE_URL=http://127.0.0.1:8765 MTMT_BASE_URL=http://127.0.0.1:8765 python run_every_day.py --force
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from io_utils import json_file, read_json, write_json
+
+# response headers kept in the fixtures
+FIXTURE_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+def fixture_key(method: str, url: str) -> str:
+    """Fixture name of a request: the host is ignored, so a recording replays under any base URL."""
+    parts = urlsplit(url)
+    path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+    return hashlib.sha256(f"{method.upper()} {path}".encode("utf-8")).hexdigest()[:24]
+
+
+def save_fixture(fixtures_dir: str, method: str, url: str, status: int, body: bytes,
+                 headers: Optional[Dict[str, str]] = None) -> str:
+    entry = {"method": method.upper(), "url": url, "status": status,
+             "headers": {k: v for k, v in (headers or {}).items() if k in FIXTURE_HEADERS}}
+    try:
+        entry["body"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        entry["body_b64"] = base64.b64encode(body).decode("ascii")
+    os.makedirs(fixtures_dir, exist_ok=True)
+    return write_json(os.path.join(fixtures_dir, fixture_key(method, url) + ".json"), entry)
+
+
+def load_fixture(fixtures_dir: str, method: str, url: str) -> Optional[Dict]:
+    path = json_file(os.path.join(fixtures_dir, fixture_key(method, url) + ".json"))
+    if not path:
+        return None
+    entry = read_json(path)
+    entry["body"] = base64.b64decode(entry["body_b64"]) if "body_b64" in entry else entry.get("body", "").encode("utf-8")
+    return entry
+
+
+# --- recording ---
+
+def install_recorder(fixtures_dir: str):
+    """Save every response received with `requests` (except 429 and 5xx) into fixtures_dir.
+
+    Returns a function that removes the recorder.
+    """
+    import requests
+    send = requests.Session.send
+    lock = threading.Lock()
+
+    def recording_send(session, request, **kwargs):
+        response = send(session, request, **kwargs)
+        if response.status_code != 429 and response.status_code < 500 and not kwargs.get("stream"):
+            with lock:
+                save_fixture(fixtures_dir, request.method, request.url, response.status_code,
+                             response.content, dict(response.headers))
+        return response
+
+    requests.Session.send = recording_send
+    return lambda: setattr(requests.Session, "send", send)
+
+
+# --- replay server ---
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures_dir: str, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0, burst: int = 1, seed: int = 1, verbose: bool = False):
+        super().__init__(address, ReplayHandler)
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = max(1, burst)
+        self.verbose = verbose
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._fixtures: Dict[str, Optional[Dict]] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self) -> Tuple[str, float]:
+        """Decide the fate of a request: ('throttled' | 'error' | 'ok', delay in seconds)."""
+        with self._lock:
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    return "throttled", 0.0
+                self._tokens -= 1
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        return ("error" if failed else "ok"), delay
+
+    def fixture(self, method: str, path: str) -> Optional[Dict]:
+        key = fixture_key(method, path)
+        with self._lock:
+            if key in self._fixtures:
+                return self._fixtures[key]
+        entry = load_fixture(self.fixtures_dir, method, path)
+        with self._lock:
+            self._fixtures[key] = entry
+        return entry
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.server.stats[status] += 1
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":  # HEAD: the same headers (and Content-Length), no body
+            self.wfile.write(body)
+
+    def _serve(self):
+        server = self.server
+        if self.path == "/__stats":
+            body = json.dumps({str(k): v for k, v in server.stats.items()}).encode("utf-8")
+            return self._send(200, body, {"Content-Type": "application/json"})
+        verdict, delay = server.admit()
+        if verdict == "throttled":
+            retry = max(1, math.ceil(1 / server.rate_limit))
+            return self._send(429, b"Too Many Requests", {"Retry-After": str(retry), "Content-Type": "text/plain"})
+        if delay:
+            time.sleep(delay)
+        if verdict == "error":
+            return self._send(503, b"Service Unavailable", {"Content-Type": "text/plain"})
+        entry = server.fixture(self.command, self.path)
+        if entry is None and self.command == "HEAD":
+            entry = server.fixture("GET", self.path)
+        if entry is None:
+            body = json.dumps({"error": "no fixture", "path": self.path}).encode("utf-8")
+            return self._send(404, body, {"Content-Type": "application/json"})
+        self._send(entry["status"], entry["body"], entry.get("headers"))
+
+    do_GET = _serve
+    do_HEAD = _serve
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_server(fixtures_dir: str, host: str = "127.0.0.1", port: int = 0, **options) -> ReplayServer:
+    """Start a replay server in a background thread (port 0: a free port); stop it with server.shutdown()."""
+    server = ReplayServer((host, port), fixtures_dir, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="run a script and save its HTTP responses")
+    rec.add_argument("--fixtures", required=True)
+    rec.add_argument("script")
+    rec.add_argument("args", nargs=argparse.REMAINDER)
+    srv = sub.add_parser("serve", help="replay the saved responses")
+    srv.add_argument("--fixtures", required=True)
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    srv.add_argument("--jitter", type=float, default=0.0, help="random extra latency, up to this many seconds")
+    srv.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    srv.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429 (0: no limit)")
+    srv.add_argument("--burst", type=int, default=1, help="requests allowed at once by the rate limit")
+    srv.add_argument("--seed", type=int, default=1)
+    srv.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        import runpy
+        uninstall = install_recorder(args.fixtures)
+        sys.argv = [args.script] + args.args
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        finally:
+            uninstall()
+        return 0
+
+    server = ReplayServer((args.host, args.port), args.fixtures, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, rate_limit=args.rate_limit, burst=args.burst,
+                          seed=args.seed, verbose=args.verbose)
+    print(f"Replaying {args.fixtures} on {server.url}")
+    print(f"  DBLP_BASE_URL={server.url} MTMT_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Requests by status: " + json.dumps({str(k): v for k, v in server.stats.items()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,20 +1,101 @@
 import os
+import gzip
 import json
+import hashlib
 from functools import lru_cache
+from typing import Optional
+
+try:  # optional, about 5-10x faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
 
 RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'results')
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# JSON_PRETTY=1 writes every JSON file indented (e.g. to inspect the dblp/ and mtmt/ caches)
+JSON_PRETTY = os.environ.get("JSON_PRETTY", "") == "1"
+# JSON_GZIP=1 writes the compact (cache) files as <name>.json.gz; readers accept both
+JSON_GZIP = os.environ.get("JSON_GZIP", "") == "1"
+
 _json_cache = {}
 
 
+def dumps_json(data, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON: indented (pretty) or without whitespace (compact).
+
+    Uses orjson when it is installed; note that orjson writes NaN as null.
+    """
+    pretty = pretty or JSON_PRETTY
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0))
+        except TypeError:
+            pass  # types orjson does not know, fall back to the json module
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads_json(raw: bytes):
+    """Parse JSON bytes (gzip compressed or not)."""
+    if raw[:2] == b'\x1f\x8b':
+        raw = gzip.decompress(raw)
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the json module
+    return json.loads(raw.decode('utf-8'))
+
+
+def json_file(path: str) -> Optional[str]:
+    """The existing file of a JSON output: path or path + '.gz' (the newer one), None if neither exists."""
+    found = [p for p in (path, path + '.gz') if os.path.exists(p)]
+    if not found:
+        return None
+    return max(found, key=os.path.getmtime)
+
+
+def read_json(path: str):
+    """Read a JSON file written by write_json (plain or .gz); raises FileNotFoundError if missing."""
+    actual = json_file(path)
+    if actual is None:
+        raise FileNotFoundError(path)
+    with open(actual, 'rb') as f:
+        return loads_json(f.read())
+
+
+def write_json(path: str, data, pretty: bool = False, compress: Optional[bool] = None) -> str:
+    """Atomically write a JSON file and return the path written.
+
+    pretty=False writes compact JSON; compact files are gzipped (path + '.gz')
+    if JSON_GZIP is set, unless compress says otherwise. The other variant of
+    the file is removed, so readers never see a stale copy.
+    """
+    if compress is None:
+        compress = JSON_GZIP and not pretty
+    raw = dumps_json(data, pretty)
+    out_path = path + '.gz' if compress and not path.endswith('.gz') else path
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(gzip.compress(raw, compresslevel=6) if compress else raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    stale = path if out_path != path else path + '.gz'
+    if os.path.exists(stale):
+        os.remove(stale)
+    return out_path
+
+
 def _resolve_path(path: str) -> str:
     # If path is absolute, return as is
     if os.path.isabs(path):
         return path
     # Try results/ first
     candidate = os.path.join(RESULTS_DIR, path)
-    if os.path.exists(candidate):
+    if json_file(candidate):
         return candidate
     # else try relative to repo root
     candidate = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
@@ -29,20 +110,18 @@ def load_json(path: str):
     if resolved in _json_cache:
         return _json_cache[resolved]
     try:
-        with open(resolved, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            _json_cache[resolved] = data
-            return data
+        data = read_json(resolved)
+        _json_cache[resolved] = data
+        return data
     except FileNotFoundError:
         return None
 
 
-def save_json(path: str, data):
+def save_json(path: str, data, pretty: bool = True):
     """Save JSON file into results/ directory and update cache."""
     # Always write into RESULTS_DIR to centralize outputs
     out_path = os.path.join(RESULTS_DIR, os.path.basename(path))
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    write_json(out_path, data, pretty=pretty)
     _json_cache[out_path] = data
     return out_path
 
@@ -61,3 +140,58 @@ def save_text(path: str, text: str):
     with open(out_path, 'w', encoding='utf-8') as f:
         f.write(text)
     return out_path
+
+
+def append_jsonl(f, entry):
+    """Append one JSON entry as a line to an open journal file and flush it to disk.
+
+    Used for crash-resumable outputs: every completed unit of work is persisted
+    immediately, so an interrupted run loses at most the entry being written.
+    """
+    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def read_jsonl(path: str):
+    """Read a JSON-lines journal, skipping a truncated trailing line (e.g. after a crash)."""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"⚠️ Skipping corrupt journal line in {path}")
+    return entries
+
+
+def replace_json(path: str, data, indent=2):
+    """Atomically (re)write a JSON file: write a temp file, then rename it over the target."""
+    write_json(path, data, pretty=bool(indent), compress=False)
+    return path
+
+
+_file_digests = {}  # path -> ((mtime, size), sha256)
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file ('' if missing), recomputed only when mtime/size changes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _file_digests.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    _file_digests[path] = (stamp, h.hexdigest())
+    return h.hexdigest()
@@ -6,9 +6,14 @@ import requests
 import re
 import json
 from collections import Counter
-import matplotlib.pyplot as plt
-import numpy as np
 import os,sys
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+from io_utils import append_jsonl, read_json, read_jsonl, replace_json, write_json
+from mtmt_utils import MTMT_BASE_URL
 
 show_plots = True
 rank_names = ["Astar", "A"]
@@ -31,8 +36,50 @@ def remove_accents(text):
     return ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
 
 
+def collect_mtmt_authors(papers, mtmt_author_data):
+    """Register the authors of the given MTMT publication records in mtmt_author_data."""
+    for paper in papers:
+        if "authorships" in paper:
+            for author in paper["authorships"]:
+                if "author" in author:
+                    mtmt_authors=author["author"]
+                    if "label" in mtmt_authors:
+                        if mtmt_authors["label"] not in mtmt_author_data:
+                            mtmt_author_data[mtmt_authors["label"]]=mtmt_authors
+                    else:
+                        if mtmt_authors["mtid"] not in mtmt_author_data:
+                            mtmt_author_data[mtmt_authors["mtid"]]=mtmt_authors
+
+
+def replay_mtmt_journal(journal_path, rank_results, mtmt_author_data):
+    """Merge the lookups of an interrupted run from the append-only journal.
+
+    Each journal line is {"key": <dblp key>, "papers": [<mtmt records>]}; later
+    lines win. Returns the set of keys that were resolved by the journal.
+    """
+    journaled = set()
+    for entry in read_jsonl(journal_path):
+        key = entry.get("key")
+        if not key:
+            continue
+        papers = entry.get("papers", [])
+        rank_results[key] = papers
+        collect_mtmt_authors(papers, mtmt_author_data)
+        journaled.add(key)
+    if journaled:
+        print(f"↩️ Resuming from {journal_path}: {len(journaled)} lookups already done")
+    return journaled
+
 
 def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_download=False):
+    """Look up the classified DBLP papers in MTMT by title.
+
+    Every resolved lookup is appended to results/papers_in_mtmt_<rank>.jsonl as
+    soon as it completes; the journal is compacted into papers_in_mtmt_<rank>.json
+    when the rank is finished. A rerun after a crash or interrupt replays the
+    journal and continues with the remaining papers without re-querying.
+    """
+    os.makedirs("results", exist_ok=True)
     mtmt_author_data = {}
     missing_paper = []
 
@@ -66,10 +113,15 @@ def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_downl
         filename=base_path+'core{}.json'.format(rank_name)
         if rank_name not in mtmt_results:
             mtmt_results[rank_name]={}
-        with open(filename, "r", encoding="utf-8") as f:
+        journal_path = f"results/papers_in_mtmt_{rank_name}.jsonl"
+        journaled = replay_mtmt_journal(journal_path, mtmt_results[rank_name], mtmt_author_data)
+        papers = read_json(filename)
+        with open(journal_path, "a", encoding="utf-8") as journal:
             skipped=0
-            papers = json.load(f)
             for key, paper in papers.items():
+                if key in journaled:
+                    skipped+=1
+                    continue
                 if not force_download and key in mtmt_results[rank_name] and len(mtmt_results[rank_name][key])>0: 
                     #print(f"⏭️ Skipping already downloaded: {key}")
                     skipped+=1
@@ -93,17 +145,18 @@ def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_downl
                     # Törli minden (...) részt, zárójelet is:
                     title_orig = re.sub(r"\([^)]*\)", "", title_orig)
                     title = title_orig.strip(' .')
-                    urls=[f"https://m2.mtmt.hu/api/publication?format=json&cond=title;eq;{title.replace(' ', '%20')}",
-                                 f"https://m2.mtmt.hu/api/publication?format=json&cond=title;eq;{title.replace(' ', '%20')}."]
+                    urls=[f"{MTMT_BASE_URL}/api/publication?format=json&cond=title;eq;{title.replace(' ', '%20')}",
+                                 f"{MTMT_BASE_URL}/api/publication?format=json&cond=title;eq;{title.replace(' ', '%20')}."]
                     title_corrected=title 
                     for wrong, correct in miss_spelled:
                         title_corrected = title_corrected.replace(wrong, correct)
                     title_corrected=remove_colon_after_lowercase(title_corrected)
                     if title != title_corrected:
                         print(f"⚠️ Corrected typos in the title for retry: {title} -> {title_corrected}")
-                        urls.append(f"https://m2.mtmt.hu/api/publication?format=json&cond=title;eq;{title_corrected.replace(' ', '%20')}")
-                        urls.append(f"https://m2.mtmt.hu/api/publication?format=json&cond=title;eq;{title_corrected.replace(' ', '%20')}.")
+                        urls.append(f"{MTMT_BASE_URL}/api/publication?format=json&cond=title;eq;{title_corrected.replace(' ', '%20')}")
+                        urls.append(f"{MTMT_BASE_URL}/api/publication?format=json&cond=title;eq;{title_corrected.replace(' ', '%20')}.")
                     print(f"🔍 Lekérdezés: {key})")
+                    resolved = None
                     for url  in urls: 
 #                        f"https://m2.mtmt.hu/api/publication?format=json&cond=labelOrMtid;eq;{title}"]: 
                         response_ = requests.get(url, timeout=10)
@@ -114,19 +167,10 @@ def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_downl
                             if "content" in response:
                                 papers=response["content"]
                                 mtmt_results[rank_name][key] = papers
+                                resolved = papers
                                 if len(papers) == 0:
                                     print(f"⚠️ Nincs találat az MTMT-ben: {key} {title.replace('%20',' ')} {url}")
-                                for paper in papers:                                    
-                                    if "authorships" in paper:
-                                        for author in paper["authorships"]:
-                                            if "author" in author:
-                                                mtmt_authors=author["author"]
-                                                if "label" in mtmt_authors:
-                                                    if mtmt_authors["label"] not in mtmt_author_data:
-                                                        mtmt_author_data[mtmt_authors["label"]]=mtmt_authors
-                                                else:
-                                                    if mtmt_authors["mtid"] not in mtmt_author_data:
-                                                        mtmt_author_data[mtmt_authors["mtid"]]=mtmt_authors
+                                collect_mtmt_authors(papers, mtmt_author_data)
                                 if len(papers):
                                     break
                         else:
@@ -134,20 +178,20 @@ def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_downl
                     else:
                         print(f"⚠️ HTTP {response_.status_code} hiba: {key} {title.replace('%20',' ')} {url}")
                         missing_paper.append(paper)
+                    # 📓 persist the finished lookup right away (failed lookups are retried next run)
+                    if resolved is not None:
+                        append_jsonl(journal, {"key": key, "papers": resolved})
                     #break
                 except Exception as e:
                     print(f"❌ Hiba: {key}: {e}")
                     missing_paper.append(paper)
                 #break            
-        # 💾 Eredmények mentése
-        with open(f"results/papers_in_mtmt_{rank_name}.json", "w", encoding="utf-8") as f:
-            json.dump(mtmt_results[rank_name], f, indent=2, ensure_ascii=False)
-
-    with open("results/authors_in_mtmt.json", "w", encoding="utf-8") as f:
-        json.dump(mtmt_author_data, f, indent=2, ensure_ascii=False)
+        # 💾 Eredmények mentése: compact the journal into the final JSON, then drop it
+        replace_json(f"results/papers_in_mtmt_{rank_name}.json", mtmt_results[rank_name])
+        os.remove(journal_path)
 
-    with open("results/failed_in_mtmt.json", "w", encoding="utf-8") as f:
-        json.dump(missing_paper, f, indent=2, ensure_ascii=False)
+    write_json("results/authors_in_mtmt.json", mtmt_author_data)
+    write_json("results/failed_in_mtmt.json", missing_paper, pretty=True)
 
     print(f"✅ Lekérések elmentve: papers_in_mtmt.json, missing_in_mtmt.json and authors_in_mtmt.json (skipped:{skipped})")
 
@@ -156,6 +200,7 @@ def download_mtmt_papers(mtmt_results, base_path='hungarian_papers_',force_downl
 
 
 def plot_missing_papers_histogram(papers_mtmt):
+    import matplotlib.pyplot as plt
     # Combine all papers from both dicts into a single list
     papers = []
     missing_paper_keys = []
@@ -171,21 +216,19 @@ def plot_missing_papers_histogram(papers_mtmt):
     missing_papers = []
     for rank_name in rank_names:
         filename='results/hungarian_papers_core{}.json'.format(rank_name)
-        with open(filename, "r", encoding="utf-8") as f:
-            papers = json.load(f)
-            for key, paper in papers.items():
-                if key in missing_paper_keys:
-                    missing_papers.append(paper)
-                    if "year" in paper:
-                        y = paper["year"]
-                        if isinstance(y, str) and y.isdigit():
-                            years.append(int(y))
-                        elif isinstance(y, int):
-                            years.append(y)
-                        print(f"Hiányzó cikk  {paper.get('title','N/A')} {paper.get('venue','')} {y} {paper.get('url','')}")
+        papers = read_json(filename)
+        for key, paper in papers.items():
+            if key in missing_paper_keys:
+                missing_papers.append(paper)
+                if "year" in paper:
+                    y = paper["year"]
+                    if isinstance(y, str) and y.isdigit():
+                        years.append(int(y))
+                    elif isinstance(y, int):
+                        years.append(y)
+                    print(f"Hiányzó cikk  {paper.get('title','N/A')} {paper.get('venue','')} {y} {paper.get('url','')}")
     
-    with open("results/missing_in_mtmt.json", "w", encoding="utf-8") as f:
-        json.dump(missing_papers, f, indent=2, ensure_ascii=False)
+    write_json("results/missing_in_mtmt.json", missing_papers, pretty=True)
 
     if not years:
         print("Nincs évszám a rekordokban.")
@@ -213,6 +256,8 @@ def plot_missing_papers_histogram(papers_mtmt):
 
 
 def plot_journal_versions(papers_mtmt):
+    import matplotlib.pyplot as plt
+    import numpy as np
     # Store ratings for all ranks dynamically
     ratings_by_rank = {rank: Counter() for rank in rank_names}
     rank_map={'D1':1,'Q1':2,'Q2':3,'Q3':4,'Q4':5,'nincs rank':6, 'nincs folyóirat változat':7,'nincs az MTMT-ben':8,'no_conference_version':9}
@@ -223,9 +268,8 @@ def plot_journal_versions(papers_mtmt):
         papers=papers_mtmt[rank_name]
         
         filename='results/hungarian_papers_core{}.json'.format(rank_name)
-        with open(filename, "r", encoding="utf-8") as f:
-            mtmt_results = {}
-            paper_dblp = json.load(f)
+        mtmt_results = {}
+        paper_dblp = read_json(filename)
 
         otypes = []
         subtypes = []
@@ -303,8 +347,7 @@ def plot_journal_versions(papers_mtmt):
 
     # Save mtmt_to_core mapping to JSON file
     output_file = 'mtmt_to_core_mapping.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(mtmt_to_core, f, ensure_ascii=False, indent=2)
+    write_json(output_file, mtmt_to_core, pretty=True)
     print(f"\n✓ MTMT to CORE mapping saved to {output_file} ({len(mtmt_to_core)} entries)")
     
     # Kategóriák és pozíciók: használjuk a rank_map sorrendjét az x tengelyen
@@ -372,7 +415,8 @@ def plot_journal_versions(papers_mtmt):
     plt.tight_layout()
     # include extension for saved figure
     os.makedirs('figures', exist_ok=True)
-    outpath = "figures/sjr_rating.png"
+    # figures/sjr_rating.png (A* and A only) is drawn by generate_chart.py
+    outpath = "figures/sjr_rating_by_rank.png"
     fig.savefig(outpath, dpi=150)
     print(f'✅ Saved figure to {outpath}')
     print_latex_table(categories, values_by_rank, labels)
@@ -434,8 +478,7 @@ if __name__ == "__main__":
         papers={}
         for rank_name in rank_names:
             if os.path.exists(f"results/papers_in_mtmt_{rank_name}.json"):
-                with open(f"results/papers_in_mtmt_{rank_name}.json", "r", encoding="utf-8") as f:
-                    papers[rank_name] = json.load(f)
+                papers[rank_name] = read_json(f"results/papers_in_mtmt_{rank_name}.json")
         #with open("missing_in_mtmt.json", "r", encoding="utf-8") as f:
         #    missing_paper = json.load(f)
 
@@ -449,5 +492,8 @@ if __name__ == "__main__":
     if len(missing_paper)>0:
         print("Minden MTMT keresés sikeresen lefutott.")
     #plot_missing_papers_histogram(papers)
-    plot_journal_versions(papers)
+    import figure_cache
+    figure_cache.render_figures([figure_cache.figure_job(plot_journal_versions, papers,
+        inputs=[f"results/hungarian_papers_core{rank_name}.json" for rank_name in rank_names],
+        outputs=["mtmt_to_core_mapping.json", "figures/sjr_rating_by_rank.png", "doc/figures/sjr_rating_table.tex"])])
     
\ No newline at end of file
@@ -34,13 +34,98 @@ def safe_get_value(row, key, default=''):
     return str(val).strip()
 
 
-from typing import Optional
+from typing import Optional, Dict, Tuple
+from unidecode import unidecode
+
+# MTA class member lists in lookup order (the first hit wins, as before)
+MTA_CLASS_FILES = ["vi_osztaly", "iii_osztaly"]
+PERSON_ID_PREFIX = "https://mta.hu/koztestuleti_tagok?PersonId="
+
+# In-memory member store: the class DataFrames keyed by class name (reloaded when
+# the CSV mtime changes) and the lookup indexes built over MTA_CLASS_FILES.
+_class_frames: Dict[str, Tuple[Optional[float], pd.DataFrame]] = {}
+_member_index: Optional[dict] = None
+
+
+def _class_file(class_name: str) -> str:
+    return f"inputs/{class_name}_tagok.csv"
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _load_class_frame(class_name: str) -> pd.DataFrame:
+    """Return the member DataFrame of an MTA class, re-reading the CSV only if it changed."""
+    file_path = _class_file(class_name)
+    mtime = _file_mtime(file_path)
+    cached = _class_frames.get(class_name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        df = pd.read_csv(file_path, encoding='utf-8-sig')
+    except Exception as e:
+        print(f"Error loading {file_path}: {e}")
+        df = pd.DataFrame()
+    _class_frames[class_name] = (mtime, df)
+    return df
+
+
+def _name_key(name) -> str:
+    if not isinstance(name, str):
+        return ""
+    return " ".join(unidecode(name).lower().split())
+
+
+def load_mta_member_index() -> dict:
+    """Build (once per CSV version) the MTA member lookup indexes.
+
+    Returns a dict with the per-class DataFrames and three hash indexes that map
+    the MTMT id, the accent-stripped name and the MTA PersonId to a
+    (class_name, row position) pair.
+    """
+    global _member_index
+    mtimes = tuple(_file_mtime(_class_file(c)) for c in MTA_CLASS_FILES)
+    if _member_index is not None and _member_index["mtimes"] == mtimes:
+        return _member_index
+    index = {"mtimes": mtimes, "frames": {}, "by_mtmt_id": {}, "by_name": {}, "by_person_id": {}}
+    for class_name in MTA_CLASS_FILES:
+        df = _load_class_frame(class_name)
+        index["frames"][class_name] = df
+        if 'Publikációk' in df.columns:
+            mtmt_ids = pd.to_numeric(df['Publikációk'], errors='coerce')
+            for pos, val in enumerate(mtmt_ids):
+                if not pd.isna(val):
+                    index["by_mtmt_id"].setdefault(int(val), (class_name, pos))
+        for column in ['Hivatalos név', 'Publikációs név']:
+            if column in df.columns:
+                for pos, name in enumerate(df[column]):
+                    key = _name_key(name)
+                    if key and key != '-':
+                        index["by_name"].setdefault(key, (class_name, pos))
+        if 'Hivatalos név_URL' in df.columns:
+            for pos, url in enumerate(df['Hivatalos név_URL']):
+                if isinstance(url, str) and url.strip():
+                    person_id = url.strip().replace(PERSON_ID_PREFIX, '')
+                    index["by_person_id"].setdefault(person_id, (class_name, pos))
+    _member_index = index
+    return index
+
+
+def _row_at(index: dict, location):
+    if location is None:
+        return None
+    class_name, pos = location
+    return index["frames"][class_name].iloc[pos]
+
 
 def get_mta_att_row(mtmt_id: str, author_name: Optional[str] = None):
     """Find MTA ATT member row by MTMT ID.
     
-    Optionally supply author_name (English or Hungarian) for logging; future
-    enhancement could cache results per author similarly to MTMT/DBLP.
+    Optionally supply author_name (English or Hungarian) for logging.
     
     Args:
         mtmt_id: MTMT identifier to search
@@ -50,21 +135,25 @@ def get_mta_att_row(mtmt_id: str, author_name: Optional[str] = None):
     """
     if author_name:
         print(f"Searching MTA ATT rows for {author_name} (MTMT {mtmt_id})")
-    for output_file in ["vi_osztaly_tagok.csv", "iii_osztaly_tagok.csv"]:
-        try:
-            osztaly = pd.read_csv(f"inputs/{output_file}", encoding='utf-8-sig')
-            for _, row in osztaly.iterrows():
-                if 'Publikációk' in row:
-                    publikaciok = safe_get_value(row, 'Publikációk')
-                    if publikaciok:
-                        try:
-                            if int(mtmt_id) == int(publikaciok):
-                                return row
-                        except (ValueError, TypeError):
-                            continue
-        except Exception as e:
-            print(f"Error reading {output_file}: {e}")
-    return None
+    try:
+        key = int(mtmt_id)
+    except (ValueError, TypeError):
+        return None
+    index = load_mta_member_index()
+    return _row_at(index, index["by_mtmt_id"].get(key))
+
+
+def get_mta_att_row_by_name(name: str):
+    """Find MTA ATT member row by official or publication name (accent and case insensitive)."""
+    index = load_mta_member_index()
+    return _row_at(index, index["by_name"].get(_name_key(name)))
+
+
+def get_mta_att_row_by_person_id(person_id: str):
+    """Find MTA ATT member row by MTA PersonId (plain id or the koztestuleti_tagok URL)."""
+    index = load_mta_member_index()
+    key = str(person_id).strip().replace(PERSON_ID_PREFIX, '')
+    return _row_at(index, index["by_person_id"].get(key))
 
 
 def add_mta_att_record(angol_nev, row, mtmt_id, magyar_nev, data, 
@@ -173,16 +262,13 @@ def add_mta_att_record(angol_nev, row, mtmt_id, magyar_nev, data,
 def load_mta_class_data(class_name="vi_osztaly"):
     """Load MTA class member data from CSV.
     
+    Backed by the same in-memory store as the member lookups, so the CSV is
+    only parsed again when it changes on disk.
+    
     Args:
         class_name: 'vi_osztaly' (Engineering) or 'iii_osztaly' (Mathematics)
         
     Returns:
-        pandas DataFrame: MTA member data
+        pandas DataFrame: MTA member data (a copy, safe to modify)
     """
-    file_path = f"inputs/{class_name}_tagok.csv"
-    try:
-        df = pd.read_csv(file_path, encoding='utf-8-sig')
-        return df
-    except Exception as e:
-        print(f"Error loading {file_path}: {e}")
-        return pd.DataFrame()
+    return _load_class_frame(class_name).copy()
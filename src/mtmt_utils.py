@@ -11,11 +11,14 @@ if _src not in sys.path: sys.path.insert(0, _src)
 
 import datetime
 import os
-import json
 import requests
 import time
 
 from typing import Optional, Tuple
+from io_utils import json_file, read_json, write_json
+
+# base URL of the MTMT API; set MTMT_BASE_URL to a local replay server (src/http_replay.py) for offline runs
+MTMT_BASE_URL = os.environ.get("MTMT_BASE_URL", "https://m2.mtmt.hu").rstrip("/")
 
 
 
@@ -38,10 +41,9 @@ def get_mtmt_record(mtmt_id: str, force: bool = False, author_name: Optional[str
     cache_path = os.path.join(cache_dir, f"{mtmt_id}.json")
 
     # Try cache first
-    if os.path.exists(cache_path) and not force:
+    if json_file(cache_path) and not force:
         try:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                cached = json.load(f)
+            cached = read_json(cache_path)
             author_cached = cached.get("author", {})
             pubs_cached = cached.get("publications", {})
             return author_cached, pubs_cached
@@ -49,8 +51,8 @@ def get_mtmt_record(mtmt_id: str, force: bool = False, author_name: Optional[str
             # Non-fatal: fall back to live fetch
             print(f"⚠️ Cache read error for MTMT {mtmt_id}: {e}")
 
-    mtmt_url = f"https://m2.mtmt.hu/api/author/{mtmt_id}?format=json"
-    mtmt_url_pub = f"https://m2.mtmt.hu/api/publication?cond=authors;eq;{mtmt_id}&format=json&labelLang=hun&size=500&sort=publishedYear,desc"
+    mtmt_url = f"{MTMT_BASE_URL}/api/author/{mtmt_id}?format=json"
+    mtmt_url_pub = f"{MTMT_BASE_URL}/api/publication?cond=authors;eq;{mtmt_id}&format=json&labelLang=hun&size=500&sort=publishedYear,desc"
     try:
         response = requests.get(mtmt_url, timeout=10)
         if response.status_code == 200:
@@ -66,8 +68,7 @@ def get_mtmt_record(mtmt_id: str, force: bool = False, author_name: Optional[str
             print(f"HTTP hiba MTMT URL2 lekérésnél {mtmt_id}: {response.status_code}")
         # Write/update cache
         try:
-            with open(cache_path, "w", encoding="utf-8") as f:
-                json.dump({"author": author_record, "publications": author_record_pub}, f, indent=2, ensure_ascii=False)
+            write_json(cache_path, {"author": author_record, "publications": author_record_pub})
         except Exception as e:
             print(f"⚠️ Cache write error for MTMT {mtmt_id}: {e}")
         return author_record, author_record_pub
@@ -93,7 +94,7 @@ def find_mtmt_papers_by_title(title_orig, mtmt_id, family_name=None, given_name=
     """
     title = title_orig.strip(' .')
     title = title.replace(' ', '%20')
-    url = f"https://m2.mtmt.hu/api/publication?format=json&cond=title;eq;{title}"
+    url = f"{MTMT_BASE_URL}/api/publication?format=json&cond=title;eq;{title}"
     
     try:
         response_ = requests.get(url, timeout=10)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Aggregated paper count cube for the charts and LaTeX tables.
+
+The classified papers are counted once by
+(file, rank, year, venue, mta_class, acronym_mta_class, institution, collaboration)
+and saved to results/paper_cube.csv. The charts in generate_chart.py take
+slices of this table instead of reloading the per-rank paper JSON files and
+looking up every venue in the CORE table again.
+
+Dimensions:
+    file: "hungarian" or "already_abroad" (papers without Hungarian affiliation)
+    rank: file suffix of the CORE rank ("Astar", "A", "B", "C", "no_rank")
+    year: publication year (-1 if unknown)
+    venue: normalized venue acronym (digits removed, upper case)
+    mta_class: MTA class of the identified conference (crossref aware), "Unknown" if none
+    acronym_mta_class: MTA class looked up by the venue acronym only, "Unknown" if none
+    institution: first Hungarian institution of the authors ("" if none)
+    collaboration: international / mostly_hungarian / all_hungarian ("" if unknown)
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+from collections import Counter
+from typing import Dict, Optional
+
+import pandas as pd
+
+import classify_paper
+from io_utils import RESULTS_DIR, load_json
+
+CUBE_PATH = os.path.join(RESULTS_DIR, "paper_cube.csv")
+DIMENSIONS = ["file", "rank", "year", "venue", "mta_class", "acronym_mta_class", "institution", "collaboration"]
+COLLABORATION_TYPES = ["international", "mostly_hungarian", "all_hungarian"]
+CUBE_FILES = ["hungarian", "already_abroad"]
+CUBE_RANKS = ["Astar", "A", "B", "C", "no_rank"]
+
+_mta_class_cache: Dict[tuple, str] = {}
+
+
+def _mta_label(m) -> str:
+    # Handle case where loc returns a Series (multiple rows)
+    if isinstance(m, pd.Series):
+        m = m.iloc[0] if len(m) > 0 else None
+    if m is None or pd.isna(m):
+        return "Unknown"
+    try:
+        return str(int(m))
+    except (ValueError, TypeError):
+        return str(m)
+
+
+def _mta_classes(venue: str, crossref, url) -> tuple:
+    """(mta_class, acronym_mta_class) of a venue, memoized per (venue, crossref)."""
+    key = (venue, crossref or "")
+    if key not in _mta_class_cache:
+        acronym_row, _short = classify_paper.identify_conference(venue, crossref, url)
+        mta_class = _mta_label(acronym_row.get("mta_class", None) if acronym_row is not None else None)
+        table = classify_paper.core_table_by_acronym
+        acronym_class = _mta_label(table.loc[venue, "mta_class"] if venue in table.index else None)
+        _mta_class_cache[key] = (mta_class, acronym_class)
+    return _mta_class_cache[key]
+
+
+def paper_cell(file: str, rank: str, paper: Dict) -> tuple:
+    """The cube coordinates of one classified paper record."""
+    venue = classify_paper.remove_numbers_and_parentheses(paper.get("venue") or "").upper()
+    try:
+        year = int(paper.get("year"))
+    except (TypeError, ValueError):
+        year = -1
+    mta_class, acronym_class = _mta_classes(venue, paper.get("crossref"), paper.get("url"))
+    classified = paper.get("classfiied") or []
+    institution = next((c for c in classified if c not in COLLABORATION_TYPES and c not in ("theory", "applied")), "")
+    collaboration = next((c for c in classified if c in COLLABORATION_TYPES), "")
+    return (file, rank, year, venue, mta_class, acronym_class, institution, collaboration)
+
+
+def build_cube(papers_by_file: Dict[str, Dict[str, Dict]]) -> pd.DataFrame:
+    """Count papers in one pass.
+
+    papers_by_file: {file: {rank: {key: paper record}}}, ranks either as in the
+    result file names ("Astar") or as CORE ranks ("A*").
+    """
+    counts = Counter()
+    for file, papers_by_rank in papers_by_file.items():
+        for rank, papers in papers_by_rank.items():
+            rank = rank.replace("*", "star")
+            for paper in (papers or {}).values():
+                counts[paper_cell(file, rank, paper)] += 1
+    cube = pd.DataFrame([cell + (n,) for cell, n in counts.items()], columns=DIMENSIONS + ["papers"])
+    return cube.sort_values(DIMENSIONS, kind="stable").reset_index(drop=True)
+
+
+def build_cube_from_results() -> pd.DataFrame:
+    """Build the cube from the results/{file}_papers_core{rank}.json files."""
+    papers_by_file = {file: {rank: load_json(f"{file}_papers_core{rank}.json") or {} for rank in CUBE_RANKS}
+                      for file in CUBE_FILES}
+    return build_cube(papers_by_file)
+
+
+def save_cube(cube: pd.DataFrame, path: Optional[str] = None) -> str:
+    path = path or CUBE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cube.to_csv(path, index=False, encoding="utf-8")
+    print(f"Saved paper cube ({len(cube)} cells, {int(cube['papers'].sum()) if len(cube) else 0} papers) to: {path}")
+    return path
+
+
+def load_cube(path: Optional[str] = None) -> pd.DataFrame:
+    """Load the saved cube, or build it from the results if it is missing or older than them."""
+    path = path or CUBE_PATH
+    sources = [os.path.join(RESULTS_DIR, f"{file}_papers_core{rank}.json") for file in CUBE_FILES for rank in CUBE_RANKS]
+    newest = max((os.path.getmtime(p) for p in sources if os.path.exists(p)), default=0)
+    if os.path.exists(path) and os.path.getmtime(path) >= newest:
+        return pd.read_csv(path, dtype={d: str for d in DIMENSIONS if d != "year"}, keep_default_na=False)
+    cube = build_cube_from_results()
+    save_cube(cube, path)
+    return cube
+
+
+def slice_counts(cube: pd.DataFrame, by, **filters) -> pd.Series:
+    """Sum of papers grouped by `by` after filtering dimensions, e.g. slice_counts(cube, "mta_class", file="hungarian", rank="A")."""
+    sel = cube
+    for dim, value in filters.items():
+        if value is None:
+            continue
+        sel = sel[sel[dim].isin(value)] if isinstance(value, (list, tuple, set)) else sel[sel[dim] == value]
+    if sel.empty:
+        return pd.Series(dtype="int64")
+    return sel.groupby(by, sort=True)["papers"].sum()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Small make-style pipeline engine for run_every_day.
+
+Every Stage declares the files and directories it reads (inputs, the stage's
+own source files included) and the ones it writes (outputs). The hash of the
+inputs and of the stage parameters is stored per stage in
+results/pipeline_state.json; a stage is skipped if its hash did not change and
+its outputs exist. As the stages pass their results through files, a stage
+rerun changes the input hash of the stages reading its outputs.
+
+Stages marked parallel run in a thread pool as soon as the stages in their
+`after` list are done (the heavy chart rendering already happens in the
+figure_cache process pool), the others run in the main thread.
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import contextlib
+import glob
+import hashlib
+import json
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+from io_utils import RESULTS_DIR, file_digest, read_json, write_json
+
+PIPELINE_STATE = os.path.join(RESULTS_DIR, "pipeline_state.json")
+# number of threads for the parallel stages; 1 runs every stage in the main thread
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "4"))
+
+Stage = namedtuple("Stage", ["name", "func", "inputs", "outputs", "after", "params", "parallel", "always"])
+
+
+def stage(name: str, func, inputs: Iterable[str] = (), outputs: Iterable[str] = (), after: Iterable[str] = (),
+          params: Optional[Dict] = None, parallel: bool = False, always: bool = False) -> Stage:
+    """Describe a stage: func(ctx) reads `inputs` and writes `outputs` after the `after` stages.
+
+    inputs/outputs may be files, directories or glob patterns. always=True
+    stages run on every invocation (e.g. network downloads).
+    """
+    return Stage(name, func, list(inputs), list(outputs), list(after), dict(params or {}), parallel, always)
+
+
+def _expand(pattern: str) -> List[str]:
+    if any(c in pattern for c in "*?["):
+        return sorted(glob.glob(pattern))
+    return [pattern]
+
+
+def _input_signature(path: str):
+    """Content digest of a file; for a directory the (name, size, mtime) list of its files."""
+    if os.path.isdir(path):
+        entries = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                p = os.path.join(root, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((os.path.relpath(p, path), st.st_size, st.st_mtime_ns))
+        return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+    return file_digest(path)
+
+
+def stage_hash(s: Stage) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([s.name, s.params], sort_keys=True, default=str).encode("utf-8"))
+    for pattern in s.inputs:
+        for path in _expand(pattern):
+            h.update(json.dumps([path, _input_signature(path)]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def outputs_exist(s: Stage) -> bool:
+    return all(_expand(p) and all(os.path.exists(x) for x in _expand(p)) for p in s.outputs)
+
+
+def load_state() -> Dict[str, Dict]:
+    try:
+        state = read_json(PIPELINE_STATE)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def check_stages(stages: List[Stage]) -> None:
+    """Raise ValueError for duplicate names, unknown `after` stages or stages listed before their dependencies."""
+    seen = set()
+    for s in stages:
+        if s.name in seen:
+            raise ValueError(f"Duplicate stage: {s.name}")
+        missing = [d for d in s.after if d not in seen]
+        if missing:
+            raise ValueError(f"Stage {s.name} runs after unknown or later stage(s): {', '.join(missing)}")
+        seen.add(s.name)
+
+
+def downstream(stages: List[Stage], names: Iterable[str]) -> List[str]:
+    """The given stages and every stage that (transitively) runs after them."""
+    selected = set(names)
+    for s in stages:
+        if any(d in selected for d in s.after):
+            selected.add(s.name)
+    return [s.name for s in stages if s.name in selected]
+
+
+def run_pipeline(stages: List[Stage], ctx: Dict, only: Optional[Iterable[str]] = None, start: Optional[str] = None,
+                 rerun: bool = False, max_workers: int = PIPELINE_WORKERS, profiler=None) -> Dict[str, str]:
+    """Run the stages in order; returns {stage: 'ran' | 'cached' | 'skipped' | 'failed'}.
+
+    only: run just these stages (the others are left alone, their outputs are used as they are).
+    start: run this stage and everything after it, leave the stages before it alone.
+    The selected stages run even if their inputs did not change; rerun=True reruns all stages.
+    profiler: a run_profile.RunProfiler measuring the stages that run.
+    """
+    check_stages(stages)
+    names = [s.name for s in stages]
+    for name in list(only or []) + ([start] if start else []):
+        if name not in names:
+            raise ValueError(f"Unknown stage: {name} (stages: {', '.join(names)})")
+    forced = set(names) if rerun else set(only or []) | set(downstream(stages, [start]) if start else [])
+    selected = set(only) if only else set(downstream(stages, [start])) if start else set(names)
+
+    state = load_state()
+    status = {}
+    lock = threading.Lock()
+
+    def _run(s: Stage, deps):
+        wait(deps)
+        if any(status.get(d) == "failed" for d in s.after):
+            status[s.name] = "failed"
+            print(f"⏭️  {s.name}: skipped, a previous stage failed")
+            return
+        if s.name not in selected:
+            status[s.name] = "skipped"
+            return
+        key = stage_hash(s)
+        if s.name not in forced and not s.always and state.get(s.name, {}).get("hash") == key and outputs_exist(s):
+            status[s.name] = "cached"
+            print(f"✓ {s.name}: unchanged inputs, skipped")
+            return
+        print(f"▶ {s.name}")
+        t = time.perf_counter()
+        try:
+            with profiler.stage(s.name) if profiler else contextlib.nullcontext():
+                s.func(ctx)
+        except Exception as e:
+            status[s.name] = "failed"
+            print(f"❌ {s.name} failed: {e}")
+            traceback.print_exc()
+            with lock:
+                state.pop(s.name, None)
+                write_json(PIPELINE_STATE, state, pretty=True, compress=False)
+            return
+        elapsed = time.perf_counter() - t
+        status[s.name] = "ran"
+        print(f"✅ {s.name} ({elapsed:.1f}s)")
+        with lock:
+            # the hash of the inputs as they were read; outputs rewritten into the inputs are seen next time
+            state[s.name] = {"hash": key, "seconds": round(elapsed, 2), "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            write_json(PIPELINE_STATE, state, pretty=True, compress=False)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for s in stages:
+            deps = [futures[d] for d in s.after]
+            if s.parallel and max_workers > 1:
+                # dependencies were submitted earlier, so a waiting stage never blocks them
+                futures[s.name] = pool.submit(_run, s, deps)
+            else:
+                _run(s, deps)
+                futures[s.name] = Future()
+                futures[s.name].set_result(None)
+        for fut in futures.values():
+            fut.result()
+    return {s.name: status[s.name] for s in stages}
@@ -5,13 +5,16 @@ Plot Journal vs Conference Publications
 Creates an x-y scatter plot comparing MTMT journal D1 equivalents vs Hungarian Core A* equivalent.
 """
 
-import json
 import os
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+import sys
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
 from statistics import mean
 import csv
+import figure_cache
+from io_utils import read_json
 
 
 
@@ -28,17 +31,6 @@ def is_in_CORE_field(row):
         return True
     return False
 
-# Try to import adjustText for automatic label positioning
-try:
-    from adjustText import adjust_text as _adjust_text
-    HAS_ADJUST_TEXT = True
-except ImportError as e:
-    HAS_ADJUST_TEXT = False
-    _adjust_text = None
-    print(f"Note: adjustText not available ({e}). Labels may overlap.")
-
-from plot_dgf_journal_cvs_conference import plot_dgf
-
 # Try to import tikzplotlib for TikZ export (optional)
 # try:
 #     import tikzplotlib
@@ -51,8 +43,7 @@ from plot_dgf_journal_cvs_conference import plot_dgf
 def load_authors_data():
     """Load full_authors_data.json with all author information."""
     try:
-        with open("results/full_authors_data.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json("results/full_authors_data.json")
     except FileNotFoundError:
         print("Error: results/full_authors_data.json not found. Please run google_author_sheet.py first.")
         return None
@@ -202,6 +193,7 @@ def create_plot(data_points, author_label=False):
     
     If author_label=True, also generates an interactive HTML plot with mpld3.
     """
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(10, 7))
     
     # Collect all text annotations for automatic adjustment
@@ -362,6 +354,12 @@ def create_plot(data_points, author_label=False):
     
     return fig
 
+def save_plot(data_points, output_file, author_label=False):
+    """Create the scatter plot (with names and interactive HTML if author_label) and save it as PNG."""
+    fig = create_plot(data_points, author_label=author_label)
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+    print(f"Plot saved to {output_file}")
+
 def main(authors_data):
 
     
@@ -383,14 +381,6 @@ def main(authors_data):
         print("Warning: No valid data points found. Make sure authors have both mtmt_journal D1 eqvivalents and Hungarian Core A* equivalent values.")
         return
     
-    print("Creating plot...")
-    fig = create_plot(data_points)
-    
-    # Save figure as PNG
-    output_file = "results/journal_vs_conference_plot.png"
-    fig.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"Plot saved to {output_file}")
-    
     # Save data points to CSV files
     print("\nSaving data to CSV files...")
     save_data_to_csv(data_points)
@@ -399,14 +389,14 @@ def main(authors_data):
     print("Generating TikZ plot code...")
     generate_tikz_plot()
     
-    # Create interactive HTML plot with labels (this also creates matplotlib figure)
-    print("\nCreating interactive Plotly HTML with names")
-    fig_interactive = create_plot(data_points, author_label=True)
-    
-    # Save the matplotlib version with labels too
-    output_file_labels = "results/journal_vs_conference_plot_with_labels.png"
-    fig_interactive.savefig(output_file_labels, dpi=300, bbox_inches='tight')
-    print(f"Plot with labels saved to {output_file_labels}")
+    # Render the PNGs (the labelled one also creates the interactive HTML), skipped if the data did not change
+    print("Creating plots...")
+    figure_cache.render_figures([
+        figure_cache.figure_job(save_plot, data_points, "results/journal_vs_conference_plot.png",
+                                name="journal_vs_conference_plot", outputs=["results/journal_vs_conference_plot.png"]),
+        figure_cache.figure_job(save_plot, data_points, "results/journal_vs_conference_plot_with_labels.png", author_label=True,
+                                name="journal_vs_conference_plot_with_labels", outputs=["results/journal_vs_conference_plot_with_labels.png"]),
+    ])
     
     # Show plot windows at the end
     #plt.show()
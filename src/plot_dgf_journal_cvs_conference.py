@@ -19,14 +19,14 @@ import matplotlib.pyplot as plt
 #     print(f"Note: tikzplotlib not available ({e}). TikZ export will be skipped.")
 
 
-# Optional label overlap avoidance
-try:
-    from adjustText import adjust_text
-    HAS_ADJUST_TEXT = True
-except Exception as e:
-    HAS_ADJUST_TEXT = False
-    _adjust_text = None
-    print(f"Note: adjustText not available ({e}). Labels may overlap.")
+# Optional label overlap avoidance, imported on first use
+def _load_adjust_text():
+    try:
+        from adjustText import adjust_text
+        return adjust_text
+    except Exception as e:
+        print(f"Note: adjustText not available ({e}). Labels may overlap.")
+        return None
 
 
 def plot_dgf(csv_path: str = "doc/figures/abra_DFG_publikacios_tipusok.csv"):
@@ -73,7 +73,8 @@ def plot_dgf(csv_path: str = "doc/figures/abra_DFG_publikacios_tipusok.csv"):
                                        connectionstyle='arc3,rad=0'))
         texts.append(txt)
 
-    if HAS_ADJUST_TEXT and adjust_text is not None and texts:
+    adjust_text = _load_adjust_text() if texts else None
+    if adjust_text is not None:
         # adjustText will reposition labels to avoid overlaps
         adjust_text(texts,
                     expand_points=(1.5, 1.5),
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""Long-running query service over the results of the daily run.
+
+Loads the classified Hungarian papers (results/hungarian_papers_core*.json),
+the scored author sheet (results/full_authors_data.json) and the CORE table
+once, builds hash indexes over them and answers HTTP/JSON queries from memory.
+The source files are polled; when the daily run replaces them (and they have
+not changed for one more poll), the indexes are rebuilt in the background and
+swapped in, the old ones keep answering until then.
+
+Endpoints (GET, JSON):
+    /papers   ?author= &pid= &institution= &rank= &year= &collaboration= &category= &limit= &offset=
+    /count    the same filters and by=rank|year|venue|institution|collaboration|category
+    /author   ?name= or ?pid=   the sheet record with the paper counts by rank and collaboration
+    /authors  ?institution= &category= &works= &collaboration= &min_share= &limit=
+    /venue    ?acronym= or ?dblp=   the CORE table entry
+    /health   the loaded files and index sizes
+year is a year or a range (2018-2022); collaboration is international,
+mostly_hungarian or all_hungarian; rank accepts A* and Astar.
+
+Usage:
+    python src/query_service.py [--host 127.0.0.1] [--port 8766] [--poll 5]
+    curl 'http://127.0.0.1:8766/count?institution=BME&year=2022&by=rank'
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import csv
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from author_directory import AuthorDirectory, name_key, pid_key
+from io_utils import RESULTS_DIR, json_file, read_json
+
+PAPER_RANKS = ["A*", "A", "B", "C", "no_rank"]
+# paper labels that are not institutions (as in paper_cube)
+COLLABORATION_TYPES = ["international", "mostly_hungarian", "all_hungarian"]
+CATEGORIES = ["theory", "applied"]
+CORE_TABLE_PATH = os.path.join(os.path.abspath(_parent), "inputs", "core_table.csv")
+DEFAULT_LIMIT = 100
+
+
+def _rank(value: str) -> str:
+    value = value.strip()
+    return "A*" if value.lower() == "astar" else value
+
+
+def _years(value: str) -> range:
+    """'2022' or '2018-2022' (inclusive); ValueError otherwise."""
+    first, _, last = value.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+class QueryIndex:
+    """Immutable in-memory indexes of one version of the results."""
+
+    def __init__(self, results_dir: str = RESULTS_DIR, core_table_path: str = CORE_TABLE_PATH):
+        self.loaded = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.papers: List[Dict] = []
+        self.by_rank: Dict[str, Set[int]] = defaultdict(set)
+        self.by_year: Dict[int, Set[int]] = defaultdict(set)
+        self.by_institution: Dict[str, Set[int]] = defaultdict(set)
+        self.by_collaboration: Dict[str, Set[int]] = defaultdict(set)
+        self.by_category: Dict[str, Set[int]] = defaultdict(set)
+        self.by_pid: Dict[str, Set[int]] = defaultdict(set)
+        self.author_stats: Dict[str, Dict] = {}
+        self.venues_by_acronym: Dict[str, Dict] = {}
+        self.venues_by_dblp: Dict[str, Dict] = {}
+
+        authors_path = json_file(os.path.join(results_dir, "full_authors_data.json"))
+        self.authors: Dict[str, Dict] = read_json(authors_path) if authors_path else {}
+        self.directory = AuthorDirectory(self.authors)
+        for rank in PAPER_RANKS:
+            path = json_file(os.path.join(results_dir, "hungarian_papers_core{}.json".format(rank.replace("*", "star"))))
+            for key, paper in (read_json(path) if path else {}).items():
+                self._add_paper(key, rank, paper)
+        for i, paper in enumerate(self.papers):
+            for name in {a["name"] for a in paper["authors"] if a["name"] in self.authors}:
+                stats = self.author_stats.setdefault(name, {"papers": 0, "by_rank": Counter(), "by_collaboration": Counter()})
+                stats["papers"] += 1
+                stats["by_rank"][paper["rank"]] += 1
+                if paper["collaboration"]:
+                    stats["by_collaboration"][paper["collaboration"]] += 1
+        if os.path.exists(core_table_path):
+            self._load_core_table(core_table_path)
+
+    def _add_paper(self, key: str, rank: str, paper: Dict) -> None:
+        i = len(self.papers)
+        labels = paper.get("classfiied") or []
+        try:
+            year = int(paper.get("year"))
+        except (TypeError, ValueError):
+            year = None
+        authors = []
+        for author, pid in paper.get("authors", []):
+            pid = pid_key(pid) if pid else ""
+            authors.append({"name": self.directory.name_for_pid(pid, author) if pid else author, "pid": pid})
+            if pid:
+                self.by_pid[pid].add(i)
+        record = {"key": key, "rank": rank, "title": paper.get("title", ""), "venue": paper.get("venue", ""),
+                  "year": year, "authors": authors, "ee": paper.get("ee", ""),
+                  "institutions": [c for c in labels if c not in COLLABORATION_TYPES and c not in CATEGORIES],
+                  "collaboration": next((c for c in labels if c in COLLABORATION_TYPES), ""),
+                  "category": next((c for c in labels if c in CATEGORIES), "")}
+        self.papers.append(record)
+        self.by_rank[rank].add(i)
+        if year is not None:
+            self.by_year[year].add(i)
+        for institution in record["institutions"]:
+            self.by_institution[name_key(institution)].add(i)
+        if record["collaboration"]:
+            self.by_collaboration[record["collaboration"]].add(i)
+        if record["category"]:
+            self.by_category[record["category"]].add(i)
+
+    def _load_core_table(self, path: str) -> None:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                history = [h.strip() for h in (row.get("YearsListed") or "").split(",") if h.strip()]
+                entry = {"name": row.get("Name", ""), "acronym": row.get("Acronym", ""),
+                         "rank": history[-1].split("_", 1)[-1] if history else "",
+                         "history": history, "dblp_venue": row.get("dblp_venue", ""), "mta_class": row.get("mta_class", "")}
+                for acronym in entry["acronym"].split(";"):
+                    if acronym.strip():
+                        self.venues_by_acronym.setdefault(acronym.strip().upper(), entry)
+                for venue in entry["dblp_venue"].split(";"):
+                    if venue.strip():
+                        self.venues_by_dblp.setdefault(venue.strip(), entry)
+
+    # --- queries ---
+    def author_name(self, name: Optional[str] = None, pid: Optional[str] = None) -> Optional[str]:
+        found, _ = self.directory.get_by_pid(pid) if pid else self.directory.get_by_name(name or "")
+        return found
+
+    def select(self, params: Dict[str, str]) -> List[int]:
+        """Indices of the papers matching every given filter, newest first."""
+        sets = []
+        if params.get("author") or params.get("pid"):
+            name = self.author_name(params.get("author"), params.get("pid"))
+            pid = pid_key(self.authors[name].get("dblp_url", "")) if name else pid_key(params.get("pid", ""))
+            sets.append(self.by_pid.get(pid, set()) if pid and pid != "/" else set())
+        if params.get("institution"):
+            sets.append(self.by_institution.get(name_key(params["institution"]), set()))
+        if params.get("rank"):
+            sets.append(self.by_rank.get(_rank(params["rank"]), set()))
+        if params.get("year"):
+            sets.append(set().union(*(self.by_year.get(y, set()) for y in _years(params["year"]))))
+        if params.get("collaboration"):
+            sets.append(self.by_collaboration.get(params["collaboration"], set()))
+        if params.get("category"):
+            sets.append(self.by_category.get(params["category"], set()))
+        if not sets:
+            selected = range(len(self.papers))
+        else:
+            sets.sort(key=len)
+            selected = sets[0].intersection(*sets[1:])
+        return sorted(selected, key=lambda i: (-(self.papers[i]["year"] or 0), i))
+
+    def query_papers(self, params: Dict[str, str]) -> Dict:
+        selected = self.select(params)
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", DEFAULT_LIMIT))
+        return {"count": len(selected), "papers": [self.papers[i] for i in selected[offset:offset + limit]]}
+
+    def query_count(self, params: Dict[str, str]) -> Dict:
+        by = params.get("by", "rank")
+        if by not in ("rank", "year", "venue", "institution", "collaboration", "category"):
+            raise ValueError(f"Unknown dimension: {by}")
+        selected = self.select(params)
+        counts = Counter()
+        for i in selected:
+            paper = self.papers[i]
+            for value in (paper["institutions"] if by == "institution" else [paper[by]]):
+                counts[str(value) if value is not None else ""] += 1
+        return {"count": len(selected), "by": by, "counts": dict(counts.most_common())}
+
+    def query_author(self, params: Dict[str, str]) -> Optional[Dict]:
+        name = self.author_name(params.get("name"), params.get("pid"))
+        if name is None:
+            return None
+        stats = self.author_stats.get(name, {"papers": 0, "by_rank": {}, "by_collaboration": {}})
+        return {"name": name, "record": self.authors[name], "papers": stats["papers"],
+                "by_rank": dict(stats["by_rank"]), "by_collaboration": dict(stats["by_collaboration"])}
+
+    def query_authors(self, params: Dict[str, str]) -> Dict:
+        collaboration = params.get("collaboration")
+        min_share = float(params.get("min_share", 0))
+        institution = name_key(params["institution"]) if params.get("institution") else None
+        rows = []
+        for name, data in self.authors.items():
+            if institution and name_key(data.get("institution", "")) != institution:
+                continue
+            if params.get("category") and data.get("category") != params["category"]:
+                continue
+            if params.get("works") and data.get("works") != params["works"]:
+                continue
+            stats = self.author_stats.get(name)
+            if stats is None:
+                continue
+            row = {"name": name, "institution": data.get("institution", ""), "papers": stats["papers"],
+                   "by_rank": dict(stats["by_rank"]), "by_collaboration": dict(stats["by_collaboration"])}
+            if collaboration:
+                row["share"] = round(stats["by_collaboration"][collaboration] / stats["papers"], 3)
+                if not row["share"] or row["share"] < min_share:
+                    continue
+            rows.append(row)
+        rows.sort(key=lambda r: (-r.get("share", 0), -r["papers"], r["name"]))
+        return {"count": len(rows), "authors": rows[:int(params.get("limit", DEFAULT_LIMIT))]}
+
+    def query_venue(self, params: Dict[str, str]) -> Optional[Dict]:
+        if params.get("dblp"):
+            return self.venues_by_dblp.get(params["dblp"].strip())
+        return self.venues_by_acronym.get(params.get("acronym", "").strip().upper())
+
+    def health(self) -> Dict:
+        return {"loaded": self.loaded, "papers": len(self.papers), "authors": len(self.authors),
+                "venues": len(self.venues_by_acronym), "by_rank": {r: len(s) for r, s in self.by_rank.items()}}
+
+
+class QueryService:
+    """Holds the current QueryIndex and rebuilds it when the source files change."""
+
+    def __init__(self, results_dir: str = RESULTS_DIR, core_table_path: str = CORE_TABLE_PATH):
+        self.results_dir = results_dir
+        self.core_table_path = core_table_path
+        self.signature = self._signature()
+        self.index = QueryIndex(results_dir, core_table_path)
+        self._stop = threading.Event()
+
+    def _sources(self) -> List[str]:
+        paths = [os.path.join(self.results_dir, "hungarian_papers_core{}.json".format(r.replace("*", "star"))) for r in PAPER_RANKS]
+        paths.append(os.path.join(self.results_dir, "full_authors_data.json"))
+        return [json_file(p) or p for p in paths] + [self.core_table_path]
+
+    def _signature(self):
+        sig = []
+        for path in self._sources():
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((path, None, None))
+        return tuple(sig)
+
+    def reload_if_changed(self, pending=None):
+        """One poll: reload if the sources changed and are the same as at the previous poll.
+
+        Returns the signature to pass to the next poll.
+        """
+        sig = self._signature()
+        if sig == self.signature or sig != pending:
+            return sig
+        started = time.perf_counter()
+        try:
+            index = QueryIndex(self.results_dir, self.core_table_path)
+        except Exception as e:  # a half-written run: keep serving the old indexes
+            print(f"⚠️ Reload failed, keeping the previous results: {e}")
+            return None
+        self.index, self.signature = index, sig
+        print(f"🔄 Reloaded {len(index.papers)} papers, {len(index.authors)} authors in {time.perf_counter() - started:.1f}s")
+        return sig
+
+    def watch(self, poll: float):
+        def loop():
+            pending = None
+            while not self._stop.wait(poll):
+                pending = self.reload_if_changed(pending)
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+
+ROUTES = {
+    "/papers": QueryIndex.query_papers,
+    "/count": QueryIndex.query_count,
+    "/author": QueryIndex.query_author,
+    "/authors": QueryIndex.query_authors,
+    "/venue": QueryIndex.query_venue,
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, data) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        started = time.perf_counter()
+        parts = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        index = self.server.service.index  # one version for the whole request
+        if parts.path == "/health":
+            return self._send(200, index.health())
+        route = ROUTES.get(parts.path)
+        if route is None:
+            return self._send(404, {"error": f"unknown endpoint {parts.path}", "endpoints": sorted(ROUTES) + ["/health"]})
+        try:
+            result = route(index, params)
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        if result is None:
+            return self._send(404, {"error": "not found", "query": params})
+        self._send(200, {**result, "ms": round((time.perf_counter() - started) * 1000, 2)})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = 0, verbose: bool = False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def start_server(service: QueryService, host: str = "127.0.0.1", port: int = 0, verbose: bool = False) -> ThreadingHTTPServer:
+    """Serve `service` from a background thread (port 0: a free port); stop it with server.shutdown()."""
+    server = make_server(service, host, port, verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between the checks for new results")
+    parser.add_argument("--results", default=RESULTS_DIR, help="results directory")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    service = QueryService(args.results)
+    print(f"Loaded {len(service.index.papers)} papers, {len(service.index.authors)} authors, "
+          f"{len(service.index.venues_by_acronym)} venues in {time.perf_counter() - started:.1f}s")
+    service.watch(args.poll)
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
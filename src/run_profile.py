@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Per-stage instrumentation of the daily run.
+
+RunProfiler.stage(name) measures one pipeline stage: wall time, CPU time of the
+stage's thread and of the child processes (figure rendering), the process RSS
+at the end of the stage and its change during the stage (Linux /proc/self/statm;
+process-wide, so concurrent stages are included), the process peak RSS so far,
+the tracemalloc peak (if enabled), the HTTP requests sent with
+`requests` and their response bytes, and the bytes read/written by the
+stage's thread (Linux /proc/self/task/<tid>/io; it includes sockets).
+The report is written to results/run_profile.json and appended to
+results/run_profile_history.jsonl so the stages can be compared day by day.
+
+One stage can be profiled with cProfile (results/profile_<stage>.prof) or, if
+installed, pyinstrument (results/profile_<stage>.html).
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import contextlib
+import datetime
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from io_utils import RESULTS_DIR, append_jsonl, write_json
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RUN_PROFILE_PATH = os.path.join(RESULTS_DIR, "run_profile.json")
+RUN_PROFILE_HISTORY = os.path.join(RESULTS_DIR, "run_profile_history.jsonl")
+PROFILERS = ["cprofile", "pyinstrument"]
+
+
+def _thread_io() -> Optional[Dict[str, int]]:
+    """rchar/wchar of the calling thread, None where /proc is not available."""
+    try:
+        with open(f"/proc/self/task/{threading.get_native_id()}/io", "rb") as f:
+            fields = dict(line.split(b":", 1) for line in f.read().splitlines() if b":" in line)
+        return {"read": int(fields[b"rchar"]), "written": int(fields[b"wchar"])}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size of the process, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class RunProfiler:
+    """Collects the per-stage measurements of one run."""
+
+    def __init__(self, profile_stage: Optional[str] = None, profiler: str = "cprofile", trace_memory: bool = False):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler} (choose from {', '.join(PROFILERS)})")
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict] = {}
+        self._local = threading.local()
+        self._active: List[str] = []
+        self._lock = threading.Lock()
+        self._http_patched = False
+        self.started = time.perf_counter()
+
+    # --- HTTP accounting ---
+    def _current_stage(self) -> Optional[str]:
+        name = getattr(self._local, "stage", None)
+        if name:
+            return name
+        # worker threads started by a stage: attribute to it if it is the only one running
+        with self._lock:
+            return self._active[0] if len(self._active) == 1 else None
+
+    def _count_http(self, response, stream: bool):
+        name = self._current_stage()
+        if name is None or name not in self.stages:
+            return
+        size = response.headers.get("Content-Length")
+        if not stream:
+            size = len(response.content)
+        with self._lock:
+            entry = self.stages[name]
+            entry["http_requests"] += 1
+            entry["http_bytes"] += int(size or 0)
+
+    def _patch_requests(self):
+        if self._http_patched:
+            return
+        try:
+            import requests
+        except ImportError:
+            return
+        send = requests.Session.send
+        profiler = self
+
+        def counting_send(session, request, **kwargs):
+            response = send(session, request, **kwargs)
+            profiler._count_http(response, kwargs.get("stream", False))
+            return response
+
+        requests.Session.send = counting_send
+        self._unpatch = lambda: setattr(requests.Session, "send", send)
+        self._http_patched = True
+
+    def close(self):
+        if self._http_patched:
+            self._unpatch()
+            self._http_patched = False
+
+    # --- stages ---
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Measure the stage running in the calling thread."""
+        self._patch_requests()
+        entry = {"http_requests": 0, "http_bytes": 0}
+        with self._lock:
+            self.stages[name] = entry
+            self._active.append(name)
+        self._local.stage = name
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        io_start = _thread_io()
+        rss_start = _rss_mb()
+        children_start = _children_cpu()
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        profile = self._start_profile() if name == self.profile_stage else None
+        try:
+            yield entry
+        finally:
+            if profile is not None:
+                entry["profile"] = self._stop_profile(profile, name)
+            entry["wall_s"] = round(time.perf_counter() - wall_start, 3)
+            entry["cpu_s"] = round(time.thread_time() - cpu_start, 3)
+            entry["children_cpu_s"] = round(_children_cpu() - children_start, 3)
+            rss_end = _rss_mb()
+            entry["rss_mb"] = rss_end
+            entry["rss_delta_mb"] = round(rss_end - rss_start, 1) if rss_start is not None and rss_end is not None else None
+            # ru_maxrss: the high-water mark of the whole run so far, not of this stage
+            entry["process_peak_rss_mb"] = _max_rss_mb()
+            if self.trace_memory:
+                # process-wide: includes the stages running concurrently
+                entry["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            io_end = _thread_io()
+            if io_start and io_end:
+                entry["bytes_read"] = io_end["read"] - io_start["read"]
+                entry["bytes_written"] = io_end["written"] - io_start["written"]
+            self._local.stage = None
+            with self._lock:
+                self._active.remove(name)
+
+    def _start_profile(self):
+        if self.profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("⚠️ pyinstrument is not installed, using cProfile")
+            else:
+                profile = Profiler()
+                profile.start()
+                return profile
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def _stop_profile(self, profile, name: str) -> str:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        if hasattr(profile, "output_html"):  # pyinstrument
+            profile.stop()
+            path = os.path.join(RESULTS_DIR, f"profile_{name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profile.output_html())
+        else:
+            import pstats
+            profile.disable()
+            path = os.path.join(RESULTS_DIR, f"profile_{name}.prof")
+            profile.dump_stats(path)
+            print(f"Top functions of {name} (cumulative time):")
+            pstats.Stats(profile).sort_stats("cumulative").print_stats(20)
+        print(f"Profile of {name} saved to {path}")
+        return path
+
+    # --- report ---
+    def report(self, status: Optional[Dict[str, str]] = None) -> Dict:
+        return {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "total_wall_s": round(time.perf_counter() - self.started, 3),
+            "max_rss_mb": _max_rss_mb(),
+            "status": status or {},
+            "stages": self.stages,
+        }
+
+    def save(self, status: Optional[Dict[str, str]] = None) -> Dict:
+        """Write results/run_profile.json, append to the history and print the summary table."""
+        report = self.report(status)
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        write_json(RUN_PROFILE_PATH, report, pretty=True, compress=False)
+        with open(RUN_PROFILE_HISTORY, "a", encoding="utf-8") as f:
+            append_jsonl(f, report)
+        print_summary(report)
+        return report
+
+
+def _mb(n) -> str:
+    return f"{n / (1024 * 1024):.1f}" if n is not None else "-"
+
+
+def _num(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def print_summary(report: Dict) -> None:
+    print(f"{'stage':<24} {'wall s':>8} {'cpu s':>8} {'child s':>8} {'RSS MB':>8} {'ΔRSS MB':>8} {'peak MB':>8} "
+          f"{'HTTP':>6} {'HTTP MB':>8} {'read MB':>8} {'write MB':>8}")
+    for name, e in report["stages"].items():
+        print(f"{name:<24} {e['wall_s']:>8.2f} {e['cpu_s']:>8.2f} {e['children_cpu_s']:>8.2f} "
+              f"{_num(e.get('rss_mb')):>8} {_num(e.get('rss_delta_mb')):>8} {_num(e.get('process_peak_rss_mb')):>8} "
+              f"{e['http_requests']:>6} {_mb(e['http_bytes']):>8} {_mb(e.get('bytes_read')):>8} {_mb(e.get('bytes_written')):>8}")
+    print(f"Total {report['total_wall_s']:.1f}s, peak RSS {report['max_rss_mb']} MB")
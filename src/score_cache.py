@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Memoization of the per-author CORE scores.
+
+count_CORE_papers_by_author only depends on the author's DBLP/MTMT ids, the
+cached DBLP and MTMT records, the CORE table and paper lists in inputs/, the
+sheet rows of the co-authors in the DBLP record (co-author classification) and
+the scoring code (SCORE_SOURCE_FILES). These are hashed into a fingerprint; if it matches the one stored in results/author_score_cache.json,
+the stored computed fields are reused instead of rescoring the author.
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import hashlib
+import json
+from typing import Dict, Optional
+
+from io_utils import file_digest, json_file, read_json, write_json
+from author_directory import pid_key
+import dblp_utils
+
+# bump when the scoring code changes in a way that invalidates the stored scores
+SCORE_CACHE_VERSION = 1
+SCORE_CACHE_PATH = os.path.join("results", "author_score_cache.json")
+SCORE_INPUT_FILES = [
+    os.path.join("inputs", "core_table.csv"),
+    os.path.join("inputs", "regular_paper_list.txt"),
+    os.path.join("inputs", "short_paper_list.txt"),
+    os.path.join("inputs", "no_hungarian_affil_list.txt"),
+    os.path.join("inputs", "doi_short_paper_list.txt"),
+]
+# the scoring code: a change in these files invalidates every stored score
+SCORE_SOURCE_FILES = [os.path.join(_parent, p) for p in [
+    "tudometer.py",
+    os.path.join("src", "classify_paper.py"),
+    os.path.join("src", "classify_author.py"),
+    os.path.join("src", "affiliation_matcher.py"),
+    os.path.join("src", "mtmt_utils.py"),
+    os.path.join("src", "dblp_utils.py"),
+]]
+# sheet fields read by the scoring of the author itself
+SCORE_INPUT_FIELDS = ["dblp_url", "mtmt_id"]
+# sheet fields of a co-author used when classifying the papers (classify_author)
+CLASSIFICATION_FIELDS = ["location", "institution", "department", "category"]
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def global_digest() -> str:
+    """Hash of everything shared by all authors: the scoring code and the inputs/ tables."""
+    return _digest([SCORE_CACHE_VERSION, [file_digest(p) for p in SCORE_SOURCE_FILES],
+                    [file_digest(p) for p in SCORE_INPUT_FILES]])
+
+
+def classification_map(authors_data: Dict[str, Dict]) -> Dict[str, list]:
+    """PID → the sheet fields used to classify that author as a co-author."""
+    return {
+        pid_key(data["dblp_url"]): [data.get(field, "") for field in CLASSIFICATION_FIELDS]
+        for data in authors_data.values() if pid_key(data.get("dblp_url", ""))
+    }
+
+
+def _record_pids(obj, pids: set) -> set:
+    """All "@pid" values in a DBLP person record (the author and the co-authors)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key == "@pid" and isinstance(value, str):
+                pids.add(pid_key(value))
+            else:
+                _record_pids(value, pids)
+    elif isinstance(obj, list):
+        for value in obj:
+            _record_pids(value, pids)
+    return pids
+
+
+# co-author PIDs by DBLP record digest
+_coauthor_pids: Dict[str, frozenset] = {}
+
+
+def coauthor_pids(dblp_path: str, dblp_digest: str) -> frozenset:
+    if dblp_digest not in _coauthor_pids:
+        _coauthor_pids[dblp_digest] = frozenset(_record_pids(read_json(dblp_path), set()))
+    return _coauthor_pids[dblp_digest]
+
+
+def author_fingerprint(name: str, data: Dict, shared_digest: str, classification: Dict[str, list]) -> Optional[str]:
+    """Fingerprint of one author's scoring inputs, None if the DBLP record is not cached yet.
+
+    Only the classification of the PIDs in the author's DBLP record is hashed,
+    so editing the sheet row of an unrelated author keeps the stored score.
+    """
+    dblp_path = json_file(dblp_utils.dblp_cache_path(name))
+    dblp_digest = file_digest(dblp_path or "")
+    if not dblp_digest:
+        return None
+    mtmt_id = str(data.get("mtmt_id", "")).strip()
+    mtmt_digest = file_digest(json_file(os.path.join("mtmt", f"{mtmt_id}.json")) or "") if mtmt_id else ""
+    row = [name] + [data.get(field, "") for field in SCORE_INPUT_FIELDS]
+    coauthors = {pid: classification[pid] for pid in coauthor_pids(dblp_path, dblp_digest) if pid in classification}
+    return _digest([shared_digest, row, dblp_digest, mtmt_digest, coauthors])
+
+
+def load_score_cache() -> Dict[str, Dict]:
+    try:
+        cache = read_json(SCORE_CACHE_PATH)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_score_cache(cache: Dict[str, Dict]) -> None:
+    write_json(SCORE_CACHE_PATH, cache)
+
+
+class _RecordingDict(dict):
+    """dict that remembers which keys were assigned."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = set()
+
+    def __setitem__(self, key, value):
+        self.written.add(key)
+        super().__setitem__(key, value)
+
+
+def score_author(name: str, data: Dict, score_func, cache: Dict[str, Dict], shared_digest: str,
+                 classification: Dict[str, list]) -> bool:
+    """Apply score_func(name, data) or restore its stored result.
+
+    The fields assigned by score_func are stored in cache[name] together with
+    the fingerprint. Returns True if the stored result was reused.
+    """
+    fingerprint = author_fingerprint(name, data, shared_digest, classification)
+    entry = cache.get(name)
+    if fingerprint and entry and entry.get("fingerprint") == fingerprint:
+        data.update(entry["fields"])
+        return True
+    recording = _RecordingDict(data)
+    score_func(name, recording)
+    data.update(recording)
+    fingerprint = author_fingerprint(name, data, shared_digest, classification)  # the DBLP record may have been fetched now
+    if fingerprint:
+        cache[name] = {"fingerprint": fingerprint, "fields": {k: recording[k] for k in recording.written}}
+    return False
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the affiliation matcher."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pytest
+
+import affiliation_matcher
+from affiliation_matcher import AffiliationMatch, location_of, match_affiliation
+
+EXPECTED = [
+    ("Budapest University of Technology and Economics, Department of Telecommunications and Media Informatics, Budapest, Hungary",
+     AffiliationMatch("BME", "BME-TMIT", True)),
+    ("BME-HIT", AffiliationMatch("BME", "BME-HIT", False)),
+    ("Eötvös Loránd University, Budapest", AffiliationMatch("ELTE", None, True)),
+    ("University of Szeged, Hungary", AffiliationMatch("SZTE", None, True)),
+    ("Ericsson Research, Budapest", AffiliationMatch("Ericsson", None, True)),
+    ("Alfréd Rényi Institute of Mathematics", AffiliationMatch("Rényi", None, False)),
+    ("Hungarian Academy of Sciences", AffiliationMatch("Hungary", None, False)),
+    ("ETH Zurich, Switzerland", AffiliationMatch(None, None, False)),
+    ("", AffiliationMatch(None, None, False)),
+]
+
+
+def _keyword_loops(text):
+    """The original matching: the first table entry with a keyword that occurs in the text."""
+    text = text.lower()
+    inst = next((i for i, kws in affiliation_matcher.institutions.items() if any(kw in text for kw in kws)), None)
+    dep = next((d for d, kws in affiliation_matcher.departments.items() if any(kw in text for kw in kws)), None)
+    return AffiliationMatch(inst, dep, any(kw in text for kw in affiliation_matcher.hungary_keywords))
+
+
+@pytest.mark.parametrize("text, expected", EXPECTED)
+def test_match_affiliation(text, expected):
+    assert match_affiliation(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", EXPECTED)
+def test_same_as_keyword_loops(text, expected):
+    assert match_affiliation(text) == _keyword_loops(text)
+
+
+def test_institution_priority():
+    # BME comes before Hungary in the table, whichever keyword occurs first
+    assert match_affiliation("MTA-BME Lendület").institution == "BME"
+    assert match_affiliation("Műegyetem rakpart, Budapest").institution == "BME"
+
+
+def test_location_of():
+    assert location_of("Department of Computer Science, University of Szeged") == "hungary"
+    assert location_of("Stanford University") == "abroad"
+
+
+def test_reset_matcher(monkeypatch):
+    monkeypatch.setitem(affiliation_matcher.institutions, "NYE", ["nyíregyházi egyetem"])
+    affiliation_matcher.reset_matcher()
+    try:
+        assert match_affiliation("Nyíregyházi Egyetem").institution == "NYE"
+    finally:
+        monkeypatch.undo()
+        affiliation_matcher.reset_matcher()
+    assert match_affiliation("Nyíregyházi Egyetem").institution is None
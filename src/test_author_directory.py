@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the author directory indexes."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import threading
+
+import author_directory
+from author_directory import AuthorDirectory, mtmt_key, name_key, pid_key
+
+
+def _authors():
+    return {
+        "Tapolcai János": {"mtmt_id": "10001234", "dblp_url": "https://dblp.org/pid/12/3456.html",
+                           "dblp_aliases": ["J. Tapolcai", {"#text": "János Tapolcai 0001"}]},
+        "Rónyai Lajos": {"mtmt_id": 10005678, "dblp_url": "https://dblp.org/pid/11/22"},
+        "Kiss Anna": {"mtmt_id": "", "dblp_url": ""},
+    }
+
+
+def test_keys():
+    assert name_key("  Rónyai   LAJOS ") == "ronyai lajos"
+    assert pid_key("https://dblp.org/pid/12/3456.html") == pid_key("12/3456") == pid_key("/12/3456.xml") == "/12/3456"
+    assert pid_key("") == ""
+    assert mtmt_key("https://m2.mtmt.hu/api/author/10001234") == mtmt_key(10001234) == "10001234"
+    assert mtmt_key("n/a") == ""
+
+
+def test_lookups():
+    authors = _authors()
+    directory = AuthorDirectory(authors)
+    assert len(directory) == 3 and "Kiss Anna" in directory
+    assert directory.get_by_mtmt_id(10005678) == ("Rónyai Lajos", authors["Rónyai Lajos"])
+    assert directory.get_by_pid("12/3456")[0] == "Tapolcai János"
+    assert directory.get_by_name("ronyai lajos")[0] == "Rónyai Lajos"
+    assert directory.get_by_name("J. Tapolcai")[0] == "Tapolcai János"
+    assert directory.get_by_name("janos tapolcai 0001")[0] == "Tapolcai János"
+    assert directory.get_by_name("J. Tapolcai", aliases=False) == (None, None)
+    assert directory.get_by_mtmt_id("") == (None, None)
+    assert directory.name_for_pid("/99/1", "?") == "?"
+    assert directory.pid_to_name() == {"/12/3456": "Tapolcai János", "/11/22": "Rónyai Lajos"}
+    # the stored records are returned, not copies
+    assert directory.get_by_pid("/11/22")[1] is authors["Rónyai Lajos"]
+
+
+def test_add_and_duplicates():
+    directory = AuthorDirectory(_authors())
+    directory.add("Nagy Béla", {"mtmt_id": "42", "dblp_url": "https://dblp.org/pid/2/2"})
+    assert directory.get_by_mtmt_id("42")[0] == "Nagy Béla"
+    assert directory.get_by_pid("2/2")[0] == "Nagy Béla"
+    directory.add("Nagy Bela", {})
+    assert directory.duplicate_names() == [["Nagy Béla", "Nagy Bela"]]
+
+
+def test_build_replaces_the_indexes():
+    directory = AuthorDirectory(_authors())
+    directory.build({"Nagy Béla": {"mtmt_id": "42"}})
+    assert directory.get_by_mtmt_id("10001234") == (None, None)
+    assert directory.get_by_name("J. Tapolcai") == (None, None)
+    assert directory.get_by_mtmt_id("42")[0] == "Nagy Béla"
+    directory.clear()
+    assert len(directory) == 0 and directory.get_by_mtmt_id("42") == (None, None)
+
+
+def test_get_directory_rebuilds_only_for_another_object(monkeypatch):
+    monkeypatch.setattr(author_directory, "directory", AuthorDirectory())
+    authors = _authors()
+    directory = author_directory.get_directory(authors)
+    assert directory.authors_data is authors
+    directory.add("Nagy Béla", {"mtmt_id": "42"})
+    assert author_directory.get_directory(authors).get_by_mtmt_id("42")[0] == "Nagy Béla"
+    assert author_directory.get_directory().get_by_mtmt_id("42")[0] == "Nagy Béla"
+    # an equal copy is a different object: the directory is rebuilt from it
+    copy = _authors()
+    assert author_directory.get_directory(copy).authors_data is copy
+    assert author_directory.get_directory(copy).get_by_mtmt_id("42") == (None, None)
+
+
+def test_lookups_during_a_rebuild_see_a_complete_index():
+    authors = {f"Author {i}": {"mtmt_id": str(i)} for i in range(2000)}
+    directory = AuthorDirectory(authors)
+    misses = []
+    stop = threading.Event()
+
+    def lookup():
+        while not stop.is_set():
+            if directory.get_by_mtmt_id("1999")[0] != "Author 1999":
+                misses.append(1)
+
+    readers = [threading.Thread(target=lookup) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for _ in range(20):
+        directory.build(dict(authors))
+    stop.set()
+    for t in readers:
+        t.join()
+    assert misses == []
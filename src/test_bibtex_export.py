@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the BibTeX export."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pytest
+
+import bibtex_export
+from author_directory import AuthorDirectory
+
+DIRECTORY = AuthorDirectory({"Tapolcai János": {"dblp_url": "https://dblp.org/pid/12/3456"}})
+PAPER = {"title": "Fast Failure Localization", "venue": "INFOCOM", "year": "2021", "ee": "https://doi.org/10.1/x",
+         "authors": [["János Tapolcai", "12/3456"], ["Lajos Rónyai 0001", ""]], "classfiied": ["BME", "all_hungarian"]}
+ENTRY = "\n".join([
+    "@inproceedings{infocomTapolcaiR21,",
+    "  author    = {Tapolcai J\\'anos and Lajos R\\'onyai},",
+    "  title     = {Fast Failure Localization},",
+    "  booktitle = {INFOCOM},",
+    "  year      = 2021,",
+    "  doi      = {https://doi.org/10.1/x},",
+    "  keywords  = {BME and all_hungarian}",
+    "}",
+])
+
+
+@pytest.fixture
+def results(tmp_path, monkeypatch):
+    monkeypatch.setattr(bibtex_export, "RESULTS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_author_names_use_the_sheet_name():
+    assert bibtex_export.author_names(PAPER, DIRECTORY) == ["Tapolcai János", "Lajos Rónyai 0001"]
+    assert bibtex_export.author_names(PAPER, AuthorDirectory()) == ["János Tapolcai", "Lajos Rónyai 0001"]
+
+
+def test_bibtex_entry():
+    names = bibtex_export.author_names(PAPER, DIRECTORY)
+    assert bibtex_export.bibtex_entry("conf/infocom/TapolcaiR21", PAPER, names) == ENTRY
+
+
+def test_bibtex_entry_optional_fields():
+    entry = bibtex_export.bibtex_entry("conf/soda/X20", {"title": "T"}, ["Anna Kiss"])
+    assert entry == "@inproceedings{sodaX20,\n  author    = {Anna Kiss},\n  title     = {T},\n}"
+
+
+def test_write_bibtex(results, capsys):
+    papers = {"A*": {"conf/infocom/TapolcaiR21": PAPER}, "A": {}}
+    assert bibtex_export.write_bibtex(papers, ranks=["A*", "A"], directory=DIRECTORY) == {"A*": 1, "A": 0}
+    assert (results / "coreAstar.bib").read_text(encoding="utf-8") == ENTRY
+    assert (results / "coreA.bib").read_text(encoding="utf-8") == ""
+    assert not list(results.glob("*.tmp"))
+    assert "BibTeX: 1 entries" in capsys.readouterr().out
+
+
+def test_write_bibtex_two_entries(results):
+    second = dict(PAPER, title="Another Title")
+    papers = {"A*": {"conf/infocom/TapolcaiR21": PAPER, "conf/infocom/TapolcaiR21b": second}}
+    bibtex_export.write_bibtex(papers, ranks=["A*"], directory=DIRECTORY)
+    text = (results / "coreAstar.bib").read_text(encoding="utf-8")
+    assert text == ENTRY + "\n\n" + ENTRY.replace("TapolcaiR21,", "TapolcaiR21b,").replace("Fast Failure Localization", "Another Title")
+
+    # the file is replaced: a dropped paper disappears
+    bibtex_export.write_bibtex({"A*": {"conf/infocom/TapolcaiR21": PAPER}}, ranks=["A*"], directory=DIRECTORY)
+    assert (results / "coreAstar.bib").read_text(encoding="utf-8") == ENTRY
+
+
+def test_failed_write_keeps_the_old_file(results):
+    bibtex_export.write_bibtex({"A*": {"conf/infocom/TapolcaiR21": PAPER}}, ranks=["A*"], directory=DIRECTORY)
+    with pytest.raises(TypeError):
+        bibtex_export.write_bibtex({"A*": {"conf/x/1": {"authors": None}}}, ranks=["A*"], directory=DIRECTORY)
+    assert (results / "coreAstar.bib").read_text(encoding="utf-8") == ENTRY
+    assert not list(results.glob("*.tmp"))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the co-authorship graph."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import json
+
+import pytest
+
+import coauthor_graph
+
+AUTHORS_DATA = {
+    "Kiss Anna": {"dblp_url": "https://dblp.org/pid/1/1", "institution": "BME", "location": ["Hungary 2000-2010"]},
+    "Nagy Béla": {"dblp_url": "https://dblp.org/pid/2/2", "institution": "ELTE", "location": ["Hungary 2015-"]},
+}
+PAPERS = {
+    "hungarian": {
+        # 2005: Kiss Anna is in Hungary, Nagy Béla is not yet
+        "A*": {"conf/a/1": {"year": "2005", "authors": [["Anna Kiss", "1/1"], ["Béla Nagy", "2/2"], ["Carl Smith", "3/3"]]},
+               "conf/a/2": {"year": "2006", "authors": [["Anna Kiss", "1/1"], ["No Pid", ""]]}},
+        # 2016: Nagy Béla is in Hungary, Kiss Anna is not any more
+        "A": {"conf/b/1": {"year": "2016", "authors": [["Béla Nagy", "2/2"], ["Anna Kiss", "1/1"]]}},
+    },
+    "already_abroad": {
+        "B": {"conf/c/1": {"year": "2020", "authors": [["Béla Nagy", "2/2"], ["Dan Brown", "4/4"]]}},
+    },
+}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    with open(tmp_path / "all_authors.json", "w", encoding="utf-8") as f:
+        json.dump([["Lone Author", "9/9"], ["Anna Kiss", "1/1"]], f)
+    return coauthor_graph.build_graph(PAPERS, AUTHORS_DATA, results_dir=str(tmp_path))
+
+
+def test_nodes(graph):
+    assert graph.pids == ["/1/1", "/2/2", "/3/3", "/4/4", "/9/9"]
+    assert graph.sheet_names == ["Kiss Anna", "Nagy Béla", None, None, None]
+    assert graph.institutions == ["BME", "ELTE", "", "", ""]
+    assert graph.summary() == {"authors": 5, "edges": 4, "sheet_authors": 2, "hungarian_abroad_edges": 4}
+    # a PID, a sheet name or a DBLP name
+    assert graph.node("https://dblp.org/pid/2/2") == 1
+    assert graph.node("nagy bela") == 1
+    assert graph.node("Dan Brown") == 3
+    assert graph.node("Nobody") is None
+
+
+def test_matrices(graph):
+    assert graph.papers.toarray().tolist() == [
+        [0, 2, 1, 0, 0],
+        [2, 0, 1, 1, 0],
+        [1, 1, 0, 0, 0],
+        [0, 1, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+    ]
+    weight = graph.weight.toarray()
+    assert (weight == weight.T).all()
+    assert weight[0, 1] == pytest.approx(1 + 1 / 2.9)
+    assert weight[0, 2] == pytest.approx(1.0)
+    assert weight[1, 3] == pytest.approx(1 / 4.9)
+    # row: in Hungary in the year of the paper, column: the co-author who was not
+    assert graph.hungarian_abroad.toarray().tolist() == [
+        [0, 1, 1, 0, 0],
+        [1, 0, 0, 1, 0],
+        [0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+    ]
+
+
+def test_top_collaborators(graph):
+    assert graph.top_collaborators("Kiss Anna") == [
+        {"pid": "/2/2", "name": "Nagy Béla", "institution": "ELTE", "papers": 2, "weight": 1.345},
+        {"pid": "/3/3", "name": "Carl Smith", "institution": "", "papers": 1, "weight": 1.0},
+    ]
+    assert [c["pid"] for c in graph.top_collaborators("2/2", n=2, by="papers")] == ["/1/1", "/3/3"]
+    with pytest.raises(KeyError):
+        graph.top_collaborators("Nobody")
+    with pytest.raises(ValueError):
+        graph.top_collaborators("Kiss Anna", by="citations")
+
+
+def test_institution_matrix(graph):
+    papers = graph.institution_matrix(by="papers")
+    assert list(papers.index) == list(papers.columns) == ["BME", "ELTE"]
+    assert papers.values.tolist() == [[0, 2], [2, 0]]
+    assert graph.institution_matrix().loc["BME", "ELTE"] == pytest.approx(1 + 1 / 2.9)
+
+
+def test_components(graph):
+    count, labels = graph.components()
+    assert count == 2
+    assert graph.component_sizes() == [{"component": int(labels[0]), "authors": 4, "sheet_authors": 2},
+                                       {"component": int(labels[4]), "authors": 1, "sheet_authors": 0}]
+    assert sorted(graph.component_of("Dan Brown")) == ["Carl Smith", "Dan Brown", "Kiss Anna", "Nagy Béla"]
+    assert graph.component_of("9/9") == ["Lone Author"]
+
+
+def test_hungarian_abroad_edges(graph):
+    result = graph.hungarian_abroad_edges()
+    assert (result["pairs"], result["joint_papers"], result["hungarian_authors"]) == (4, 4, 2)
+    assert sorted((p["hungarian"], p["abroad"]) for p in result["top_pairs"]) == [
+        ("Kiss Anna", "Carl Smith"), ("Kiss Anna", "Nagy Béla"), ("Nagy Béla", "Dan Brown"), ("Nagy Béla", "Kiss Anna")]
+    assert result["top_authors"] == [{"name": "Kiss Anna", "abroad_coauthors": 2}, {"name": "Nagy Béla", "abroad_coauthors": 2}]
+
+
+def test_empty_graph(tmp_path):
+    graph = coauthor_graph.build_graph({}, {}, results_dir=str(tmp_path))
+    assert len(graph) == 0
+    assert graph.summary() == {"authors": 0, "edges": 0, "sheet_authors": 0, "hungarian_abroad_edges": 0}
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the author order ranks and age groups."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pytest
+
+from create_author_order import (add_age_group_column, add_author_order_columns, compute_author_order_positions,
+                                 determine_age_group, rank_columns)
+
+
+def _rows():
+    return [
+        {"Név": "A", "Category": "applied", "Core A* equivalent": 10, "Hungarian Core A* equivalent": "3"},
+        {"Név": "B", "Category": "theory", "Core A* equivalent": 8.7, "Hungarian Core A* equivalent": 5},
+        {"Név": "C", "Category": "applied", "Core A* equivalent": "8", "Hungarian Core A* equivalent": ""},
+        {"Név": "D", "Category": "theory", "Core A* equivalent": None, "Hungarian Core A* equivalent": 5},
+        {"Név": "E", "Category": "applied", "Core A* equivalent": "n/a", "Hungarian Core A* equivalent": 1},
+    ]
+
+
+def test_compute_author_order_positions():
+    assert compute_author_order_positions([10, 8, 8, 8, 5]) == [1, 2, 2, 2, 5]
+    assert compute_author_order_positions([]) == []
+
+
+def test_rank_columns_overall_and_by_group():
+    rows = rank_columns(_rows(), [
+        ("Core A* equivalent", None, "Order"),
+        ("Core A* equivalent", "Category", "Category Rank"),
+        ("Hungarian Core A* equivalent", "Category", "Category Hungarian Rank"),
+    ])
+    # 8.7 is truncated to 8 like the sheet values; missing and invalid scores count as 0
+    assert [r["Order"] for r in rows] == [1, 2, 2, 4, 4]
+    assert [r["Category Rank"] for r in rows] == [1, 1, 2, 2, 3]
+    assert [r["Category Hungarian Rank"] for r in rows] == [1, 1, 3, 1, 2]
+    assert all(isinstance(r["Order"], int) for r in rows)
+
+
+def test_rank_columns_empty():
+    assert rank_columns([], [("Core A* equivalent", None, "Order")]) == []
+    rows = _rows()
+    assert rank_columns(rows, []) == rows
+
+
+def test_add_author_order_columns():
+    rows = add_author_order_columns(_rows(), extra_orderers={"Name": lambda r: -ord(r["Név"])})
+    assert [r["Core A* equivalent Author Order"] for r in rows] == [1, 2, 2, 4, 4]
+    assert [r["Hungarian Core A* equivalent Author Order"] for r in rows] == [3, 1, 5, 1, 4]
+    assert [r["First Author Core A* equivalent Author Order"] for r in rows] == [1, 1, 1, 1, 1]
+    assert [r["Name Author Order"] for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["Name Score"] == -65
+
+
+@pytest.mark.parametrize("years, group", [
+    (-3, "unknown"), (-1, "unknown"), (0, "0-5 év"), (5, "0-5 év"), (6, "5-10 év"),
+    (10, "5-10 év"), (11, "10-25 év"), (25, "10-25 év"), (26, "25+ év"),
+])
+def test_age_groups(years, group):
+    assert determine_age_group(years) == group
+    row = {"Első cikk éve": 2000, "Legutolsó cikk éve": 2000 + years}
+    assert add_age_group_column([row])[0]["Career Length"] == group
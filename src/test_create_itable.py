@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the author table data mode."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import create_itable
+from io_utils import read_json
+
+DATA = {
+    "Kiss Anna": {"dblp_author_name": "Anna Kiss", "institution": "BME", "location": "Hungary 2000-",
+                  "Core A* equivalent": 2.5, "paper_countA*": 2, "papersA*": "INFOCOM21 SIGCOMM20",
+                  "hungarian_papersA*": "INFOCOM21", "dblp_url_": "https://dblp.org/pid/1/1", "mtmt_name": "Kiss A."},
+    "Nagy Béla": {"dblp_author_name": "Béla Nagy", "institution": None, "location": "Hungary 2000-",
+                  "paper_countA*": 1, "papersA*": "INFOCOM21"},
+}
+
+
+def _column(feed, header):
+    return feed["data"][feed["columns"].index(header)]
+
+
+def test_feed_layout():
+    feed = create_itable.build_feed(DATA)
+    assert feed["columns"] == [header for header, _, _ in create_itable.COLUMNS]
+    assert len(set(feed["columns"])) == len(feed["columns"])
+    assert feed["kinds"] == [kind for _, kind, _ in create_itable.COLUMNS]
+    assert len(feed["data"]) == len(create_itable.COLUMNS)
+    assert all(len(values) == len(DATA) for values in feed["data"])
+
+
+def test_feed_values():
+    feed = create_itable.build_feed(DATA)
+    assert _column(feed, "Név") == ["Anna Kiss", "Béla Nagy"]
+    assert _column(feed, "Magyar affil") == ["BME", ""]
+    assert _column(feed, "Core A* ekv.") == ["2.50", ""]
+    assert _column(feed, "Core A*") == ["2", "1"]
+
+
+def test_tooltips_are_stored_once():
+    feed = create_itable.build_feed(DATA)
+    strings = feed["strings"]
+    assert strings[0] == ""
+    assert len(strings) == len(set(strings))
+    location = _column(feed, " ")
+    assert location[0] == location[1] and strings[location[0]] == "Hungary 2000-"
+    # a links cell is [tooltip id, DBLP, MTMT and MTA URLs]
+    links = _column(feed, "Linkek")
+    assert links[0] == [strings.index("MTMT név: Kiss A."), "https://dblp.org/pid/1/1", "", ""]
+    assert strings[links[1][0]] == "MTMT név: "
+
+
+def test_write_table_data(tmp_path, capsys):
+    output = str(tmp_path / "authors_table.html")
+    assert create_itable.write_table_data(DATA, output) == output
+    feed = read_json(str(tmp_path / create_itable.TABLE_DATA_FILE))
+    assert feed == create_itable.build_feed(DATA)
+    assert create_itable.TABLE_DATA_FILE in (tmp_path / "authors_table.html").read_text(encoding="utf-8")
+    assert "Table data saved" in capsys.readouterr().out
+
+
+def test_write_table_data_compressed(tmp_path):
+    output = str(tmp_path / "authors_table.html")
+    create_itable.write_table_data(DATA, output, compress=True)
+    assert os.path.exists(tmp_path / (create_itable.TABLE_DATA_FILE + ".gz"))
+    assert create_itable.TABLE_DATA_FILE + ".gz" in (tmp_path / "authors_table.html").read_text(encoding="utf-8")
+
+
+def test_paper_lists_use_venue_tokens():
+    feed = create_itable.build_feed(DATA)
+    venues = feed["venues"]
+    # the most frequent token gets id 0
+    assert venues == ["INFOCOM21", "SIGCOMM20"]
+    sources = [source for _, _, source in create_itable.COLUMNS]
+    papers = feed["data"][sources.index("papersA*")]
+    assert papers == [[0, 1], [0]]
+    assert [" ".join(venues[i] for i in ids) for ids in papers] == ["INFOCOM21 SIGCOMM20", "INFOCOM21"]
+    assert feed["data"][sources.index("hungarian_papersA*")] == [[0], []]
+    # the paper lists are not in the tooltip strings
+    assert "INFOCOM21" not in feed["strings"]
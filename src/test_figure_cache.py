@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the figure job hashing and the render cache."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pandas as pd
+import pytest
+
+import figure_cache
+import io_utils
+
+calls = []
+
+
+def plot_text(path, text="x"):
+    calls.append(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def plot_fails(path):
+    raise RuntimeError("no data")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.setattr(figure_cache, "FIGURE_MANIFEST", str(tmp_path / "figure_manifest.json"))
+    calls.clear()
+    (tmp_path / "input.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    return tmp_path
+
+
+def _job(tmp_path, *args, **kwargs):
+    return figure_cache.figure_job(plot_text, str(tmp_path / "out.txt"), *args, outputs=[str(tmp_path / "out.txt")],
+                                   inputs=[str(tmp_path / "input.csv")], **kwargs)
+
+
+def test_code_sources():
+    sources = figure_cache.code_sources(plot_text)
+    assert os.path.abspath(__file__) in sources
+    # imported repository modules count, installed packages do not
+    assert os.path.abspath(figure_cache.__file__) in sources and os.path.abspath(io_utils.__file__) in sources
+    assert not any("site-packages" in p for p in sources)
+
+
+def test_job_hash(workdir):
+    job = _job(workdir)
+    key = figure_cache.job_hash(job, {"font.size": 14})
+    assert key == figure_cache.job_hash(_job(workdir), {"font.size": 14})
+    assert job.name == f"{plot_text.__module__}.plot_text"
+    assert key != figure_cache.job_hash(job, {"font.size": 12})
+    assert key != figure_cache.job_hash(_job(workdir, "y"), {"font.size": 14})
+    assert key != figure_cache.job_hash(_job(workdir, text="y"), {"font.size": 14})
+    assert key != figure_cache.job_hash(job._replace(name="other"), {"font.size": 14})
+    (workdir / "input.csv").write_text("a,b\n1,3\n", encoding="utf-8")
+    assert key != figure_cache.job_hash(job, {"font.size": 14})
+
+
+def test_job_hash_of_dataframes(workdir):
+    df = pd.DataFrame({"year": [2020, 2021], "papers": [3, 4]})
+    key = figure_cache.job_hash(_job(workdir, df), {})
+    assert key == figure_cache.job_hash(_job(workdir, df.copy()), {})
+    assert key != figure_cache.job_hash(_job(workdir, df.assign(papers=[3, 5])), {})
+    assert key != figure_cache.job_hash(_job(workdir, df.rename(columns={"papers": "n"})), {})
+
+
+def test_render_figures_cache(workdir):
+    job = _job(workdir)
+    assert figure_cache.render_figures([job], max_workers=1) == {job.name: "rendered"}
+    assert figure_cache.render_figures([job], max_workers=1) == {job.name: "cached"}
+    assert figure_cache.render_figures([job], max_workers=1, force=True) == {job.name: "rendered"}
+    os.remove(workdir / "out.txt")
+    assert figure_cache.render_figures([job], max_workers=1) == {job.name: "rendered"}
+    (workdir / "input.csv").write_text("changed", encoding="utf-8")
+    assert figure_cache.render_figures([job], max_workers=1) == {job.name: "rendered"}
+    assert len(calls) == 4
+
+
+def test_failed_job_is_not_stored(workdir, capsys):
+    job = figure_cache.figure_job(plot_fails, str(workdir / "fail.txt"), outputs=[str(workdir / "fail.txt")])
+    ok = _job(workdir)
+    assert figure_cache.render_figures([job, ok], max_workers=1) == {job.name: "failed", ok.name: "rendered"}
+    assert "no data" in capsys.readouterr().out
+    assert figure_cache.load_manifest().keys() == {ok.name}
+    assert figure_cache.render_figures([job], max_workers=1) == {job.name: "failed"}
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the HTTP record/replay server."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import http.client
+
+import pytest
+import requests
+
+import http_replay
+
+PERSON_URL = "https://dblp.org/pid/12/3456.xml"
+PERSON_XML = '<dblpperson name="Rónyai Lajos"/>'.encode("utf-8")
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    http_replay.save_fixture(str(tmp_path), "get", PERSON_URL, 200, PERSON_XML,
+                             {"Content-Type": "application/xml", "Set-Cookie": "x", "ETag": "abc"})
+    http_replay.save_fixture(str(tmp_path), "GET", "https://m2.mtmt.hu/logo.png", 200, b"\x89PNG\xff")
+    return str(tmp_path)
+
+
+@pytest.fixture
+def serve(fixtures):
+    servers = []
+
+    def start(**options):
+        server = http_replay.start_server(fixtures, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fixture_key_ignores_the_host():
+    key = http_replay.fixture_key("get", PERSON_URL)
+    assert key == http_replay.fixture_key("GET", "http://127.0.0.1:8765/pid/12/3456.xml")
+    assert key != http_replay.fixture_key("HEAD", PERSON_URL)
+    assert key != http_replay.fixture_key("GET", PERSON_URL + "?x=1")
+
+
+def test_fixture_round_trip(fixtures):
+    entry = http_replay.load_fixture(fixtures, "GET", PERSON_URL)
+    assert (entry["status"], entry["body"]) == (200, PERSON_XML)
+    assert entry["headers"] == {"Content-Type": "application/xml", "ETag": "abc"}
+    assert http_replay.load_fixture(fixtures, "GET", "https://m2.mtmt.hu/logo.png")["body"] == b"\x89PNG\xff"
+    assert http_replay.load_fixture(fixtures, "GET", "https://dblp.org/missing") is None
+
+
+def test_replay(serve):
+    server = serve()
+    response = requests.get(server.url + "/pid/12/3456.xml", timeout=5)
+    assert (response.status_code, response.content) == (200, PERSON_XML)
+    assert response.headers["ETag"] == "abc"
+    assert requests.get(server.url + "/missing", timeout=5).status_code == 404
+    assert requests.get(server.url + "/__stats", timeout=5).json() == {"200": 1, "404": 1}
+
+
+def test_head_sends_only_the_headers(serve):
+    server = serve()
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("HEAD", "/pid/12/3456.xml")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Length") == str(len(PERSON_XML))
+    assert response.read() == b""
+    # the kept-alive connection is not corrupted by a stray body
+    conn.request("GET", "/pid/12/3456.xml")
+    assert conn.getresponse().read() == PERSON_XML
+    conn.close()
+
+
+def test_throttling_and_errors(serve):
+    server = serve(rate_limit=0.5, burst=2)
+    statuses = [requests.get(server.url + "/pid/12/3456.xml", timeout=5).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert server.admit()[0] == "throttled"
+
+    server = serve(error_rate=1.0)
+    response = requests.get(server.url + "/pid/12/3456.xml", timeout=5)
+    assert response.status_code == 503
+    assert server.stats[503] == 1
+
+
+def test_recorder(tmp_path, serve):
+    server = serve()
+    recorded = str(tmp_path / "recorded")
+    uninstall = http_replay.install_recorder(recorded)
+    try:
+        requests.get(server.url + "/pid/12/3456.xml", timeout=5)
+        requests.get(server.url + "/missing", timeout=5)
+    finally:
+        uninstall()
+    assert http_replay.load_fixture(recorded, "GET", PERSON_URL)["body"] == PERSON_XML
+    assert http_replay.load_fixture(recorded, "GET", "/missing")["status"] == 404
+    requests.get(server.url + "/pid/12/3456.xml?after=1", timeout=5)
+    assert len(os.listdir(recorded)) == 2
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the JSON helpers: plain and gzipped files, journals, digests."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import gzip
+import json
+
+import pytest
+
+import io_utils
+from io_utils import append_jsonl, file_digest, json_file, read_json, read_jsonl, write_json
+
+DATA = {"Rónyai Lajos": {"papers": [1, 2.5, None], "hungarian": True}}
+
+
+def test_plain_round_trip(tmp_path):
+    path = str(tmp_path / "a.json")
+    assert write_json(path, DATA) == path
+    assert read_json(path) == DATA
+    # compact, UTF-8 and no temp file left behind
+    raw = (tmp_path / "a.json").read_bytes()
+    assert b'": ' not in raw and b", " not in raw and "Rónyai".encode("utf-8") in raw
+    assert os.listdir(tmp_path) == ["a.json"]
+
+
+def test_pretty(tmp_path):
+    path = str(tmp_path / "a.json")
+    write_json(path, DATA, pretty=True, compress=True)
+    # pretty files are indented and never gzipped by default, but compress=True wins
+    assert json_file(path) == path + ".gz"
+    write_json(path, DATA, pretty=True)
+    assert json.loads((tmp_path / "a.json").read_text(encoding="utf-8")) == DATA
+    assert "\n  " in (tmp_path / "a.json").read_text(encoding="utf-8")
+
+
+def test_gzip_round_trip(tmp_path):
+    path = str(tmp_path / "a.json")
+    assert write_json(path, DATA, compress=True) == path + ".gz"
+    assert json.loads(gzip.decompress((tmp_path / "a.json.gz").read_bytes())) == DATA
+    assert read_json(path) == DATA
+    assert read_json(path + ".gz") == DATA
+
+
+def test_switching_variant_removes_the_stale_file(tmp_path):
+    path = str(tmp_path / "a.json")
+    write_json(path, {"v": 1})
+    write_json(path, {"v": 2}, compress=True)
+    assert sorted(os.listdir(tmp_path)) == ["a.json.gz"]
+    assert read_json(path) == {"v": 2}
+    write_json(path, {"v": 3}, compress=False)
+    assert sorted(os.listdir(tmp_path)) == ["a.json"]
+    assert read_json(path) == {"v": 3}
+
+
+def test_json_gzip_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "JSON_GZIP", True)
+    path = str(tmp_path / "a.json")
+    assert write_json(path, DATA) == path + ".gz"
+    assert write_json(path, DATA, pretty=True) == path
+
+
+def test_missing_file(tmp_path):
+    path = str(tmp_path / "missing.json")
+    assert json_file(path) is None
+    with pytest.raises(FileNotFoundError):
+        read_json(path)
+
+
+def test_replace_json_is_never_compressed(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "JSON_GZIP", True)
+    path = str(tmp_path / "state.json")
+    io_utils.replace_json(path, DATA)
+    assert json.loads((tmp_path / "state.json").read_text(encoding="utf-8")) == DATA
+
+
+def test_journal_skips_a_truncated_line(tmp_path, capsys):
+    path = str(tmp_path / "journal.jsonl")
+    assert read_jsonl(path) == []
+    with open(path, "a", encoding="utf-8") as f:
+        append_jsonl(f, {"id": 1})
+        append_jsonl(f, {"id": 2, "name": "Tóth"})
+        f.write('{"id": 3, "na')
+    assert read_jsonl(path) == [{"id": 1}, {"id": 2, "name": "Tóth"}]
+    assert "corrupt journal line" in capsys.readouterr().out
+
+
+def test_file_digest(tmp_path):
+    path = tmp_path / "input.txt"
+    assert file_digest(str(path)) == ""
+    path.write_text("first", encoding="utf-8")
+    first = file_digest(str(path))
+    assert first == file_digest(str(path)) and len(first) == 64
+    path.write_text("second", encoding="utf-8")
+    assert file_digest(str(path)) not in ("", first)
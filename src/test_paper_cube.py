@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the paper count cube."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import json
+
+import pandas as pd
+import pytest
+
+import paper_cube
+
+MTA_CLASSES = {"INFOCOM": ("1", "1"), "ICC": ("2", "Unknown")}
+PAPERS = {
+    "hungarian": {
+        "A*": {
+            "conf/infocom/1": {"venue": "INFOCOM", "year": "2021", "classfiied": ["BME", "SZTAKI", "international"]},
+            "conf/infocom/2": {"venue": "INFOCOM 2021", "year": "2021", "classfiied": ["theory", "BME", "international"]},
+        },
+        "A": {"conf/icc/1": {"venue": "ICC", "year": "n/a", "classfiied": ["all_hungarian"]}},
+    },
+    "already_abroad": {"Astar": {"conf/infocom/3": {"venue": "INFOCOM", "year": 2019}}},
+}
+
+
+@pytest.fixture(autouse=True)
+def mta_classes(monkeypatch):
+    monkeypatch.setattr(paper_cube, "_mta_classes", lambda venue, crossref, url: MTA_CLASSES.get(venue, ("Unknown", "Unknown")))
+
+
+def test_mta_label():
+    assert paper_cube._mta_label(None) == "Unknown"
+    assert paper_cube._mta_label(float("nan")) == "Unknown"
+    assert paper_cube._mta_label(2.0) == "2"
+    assert paper_cube._mta_label("x") == "x"
+    assert paper_cube._mta_label(pd.Series([3, 4])) == "3"
+    assert paper_cube._mta_label(pd.Series([], dtype="float64")) == "Unknown"
+
+
+def test_paper_cell():
+    paper = PAPERS["hungarian"]["A*"]["conf/infocom/2"]
+    assert paper_cube.paper_cell("hungarian", "Astar", paper) == (
+        "hungarian", "Astar", 2021, "INFOCOM", "1", "1", "BME", "international")
+    assert paper_cube.paper_cell("hungarian", "A", {}) == ("hungarian", "A", -1, "", "Unknown", "Unknown", "", "")
+
+
+def test_build_cube():
+    cube = paper_cube.build_cube(PAPERS)
+    assert list(cube.columns) == paper_cube.DIMENSIONS + ["papers"]
+    assert cube.values.tolist() == [
+        ["already_abroad", "Astar", 2019, "INFOCOM", "1", "1", "", "", 1],
+        ["hungarian", "A", -1, "ICC", "2", "Unknown", "", "all_hungarian", 1],
+        ["hungarian", "Astar", 2021, "INFOCOM", "1", "1", "BME", "international", 2],
+    ]
+    assert paper_cube.build_cube({}).empty
+
+
+def test_slice_counts():
+    cube = paper_cube.build_cube(PAPERS)
+    assert paper_cube.slice_counts(cube, "venue", file="hungarian").to_dict() == {"ICC": 1, "INFOCOM": 2}
+    assert paper_cube.slice_counts(cube, "mta_class", rank=["Astar", "B"]).to_dict() == {"1": 3}
+    assert paper_cube.slice_counts(cube, "venue", file="hungarian", rank=None).sum() == 3
+    assert paper_cube.slice_counts(cube, ["year", "acronym_mta_class"], file="already_abroad").to_dict() == {(2019, "1"): 1}
+    assert paper_cube.slice_counts(cube, "venue", rank="C").empty
+
+
+def test_save_and_load(tmp_path, monkeypatch, capsys):
+    def load_json(name):
+        path = tmp_path / name
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+    monkeypatch.setattr(paper_cube, "RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(paper_cube, "load_json", load_json)
+    for rank, papers in PAPERS["hungarian"].items():
+        (tmp_path / f"hungarian_papers_core{rank.replace('*', 'star')}.json").write_text(json.dumps(papers), encoding="utf-8")
+    path = str(tmp_path / "paper_cube.csv")
+
+    cube = paper_cube.load_cube(path)
+    assert int(cube["papers"].sum()) == 3 and os.path.exists(path)
+    assert "Saved paper cube (2 cells, 3 papers)" in capsys.readouterr().out
+
+    # the saved file is read back with the same values while it is newer than the results
+    loaded = paper_cube.load_cube(path)
+    assert "Saved paper cube" not in capsys.readouterr().out
+    assert loaded.values.tolist() == cube.values.tolist()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the pipeline engine: input hashing, --only and --from."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pytest
+
+import pipeline
+
+
+def _writer(calls, name, path, text=None):
+    def run(ctx):
+        calls.append(name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text if text is not None else name)
+    return run
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    """a -> b -> c; a and c read input.txt, b reads the output of a."""
+    monkeypatch.setattr(pipeline, "PIPELINE_STATE", str(tmp_path / "pipeline_state.json"))
+    source = tmp_path / "input.txt"
+    source.write_text("first", encoding="utf-8")
+    out = {name: str(tmp_path / f"{name}.out") for name in "abc"}
+    calls = []
+    return calls, source, out, [
+        pipeline.stage("a", _writer(calls, "a", out["a"]), inputs=[str(source)], outputs=[out["a"]]),
+        pipeline.stage("b", _writer(calls, "b", out["b"]), after=["a"], inputs=[out["a"]], outputs=[out["b"]]),
+        pipeline.stage("c", _writer(calls, "c", out["c"]), after=["b"], inputs=[str(source)], outputs=[out["c"]]),
+    ]
+
+
+def test_unchanged_inputs_are_cached(stages):
+    calls, _, _, s = stages
+    assert pipeline.run_pipeline(s, {}, max_workers=1) == {"a": "ran", "b": "ran", "c": "ran"}
+    assert pipeline.run_pipeline(s, {}, max_workers=1) == {"a": "cached", "b": "cached", "c": "cached"}
+    assert calls == ["a", "b", "c"]
+
+
+def test_changed_input_reruns_its_readers(stages):
+    calls, source, _, s = stages
+    pipeline.run_pipeline(s, {}, max_workers=1)
+    source.write_text("second version", encoding="utf-8")
+    # a rewrites a.out with the same content, so b keeps its hash
+    assert pipeline.run_pipeline(s, {}, max_workers=1) == {"a": "ran", "b": "cached", "c": "ran"}
+    assert calls == ["a", "b", "c", "a", "c"]
+
+
+def test_missing_output_reruns_the_stage(stages):
+    calls, _, out, s = stages
+    pipeline.run_pipeline(s, {}, max_workers=1)
+    os.remove(out["b"])
+    assert pipeline.run_pipeline(s, {}, max_workers=1) == {"a": "cached", "b": "ran", "c": "cached"}
+
+
+def test_only_runs_the_given_stages(stages):
+    calls, _, _, s = stages
+    pipeline.run_pipeline(s, {}, max_workers=1)
+    assert pipeline.run_pipeline(s, {}, only=["b"], max_workers=1) == {"a": "skipped", "b": "ran", "c": "skipped"}
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_start_runs_the_stage_and_the_ones_after_it(stages):
+    calls, _, _, s = stages
+    pipeline.run_pipeline(s, {}, max_workers=1)
+    assert pipeline.run_pipeline(s, {}, start="b", max_workers=1) == {"a": "skipped", "b": "ran", "c": "ran"}
+    assert calls == ["a", "b", "c", "b", "c"]
+
+
+def test_rerun_ignores_the_stored_hashes(stages):
+    calls, _, _, s = stages
+    pipeline.run_pipeline(s, {}, max_workers=1)
+    assert pipeline.run_pipeline(s, {}, rerun=True, max_workers=1) == {"a": "ran", "b": "ran", "c": "ran"}
+
+
+def test_unknown_stage(stages):
+    _, _, _, s = stages
+    with pytest.raises(ValueError):
+        pipeline.run_pipeline(s, {}, only=["charts"], max_workers=1)
+    with pytest.raises(ValueError):
+        pipeline.run_pipeline(s, {}, start="charts", max_workers=1)
+
+
+def test_failed_stage_skips_the_stages_after_it(stages, capsys):
+    calls, _, out, s = stages
+
+    def fail(ctx):
+        raise RuntimeError("boom")
+
+    s[0] = s[0]._replace(func=fail)
+    assert pipeline.run_pipeline(s, {}, max_workers=1) == {"a": "failed", "b": "failed", "c": "failed"}
+    assert calls == []
+    assert "a" not in pipeline.load_state()
+    err = capsys.readouterr().err
+    assert "Traceback" in err and "RuntimeError: boom" in err
+
+
+def test_parallel_stages_wait_for_their_dependencies(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "PIPELINE_STATE", str(tmp_path / "pipeline_state.json"))
+    calls = []
+    first = str(tmp_path / "first.out")
+    s = [pipeline.stage("first", _writer(calls, "first", first), outputs=[first])]
+    for name in ["x", "y", "z"]:
+        s.append(pipeline.stage(name, _writer(calls, name, str(tmp_path / f"{name}.out")), after=["first"],
+                                parallel=True, inputs=[first], outputs=[str(tmp_path / f"{name}.out")]))
+    assert pipeline.run_pipeline(s, {}, max_workers=3) == {"first": "ran", "x": "ran", "y": "ran", "z": "ran"}
+    assert calls[0] == "first" and sorted(calls[1:]) == ["x", "y", "z"]
+
+
+def test_check_stages():
+    with pytest.raises(ValueError):
+        pipeline.check_stages([pipeline.stage("a", None), pipeline.stage("a", None)])
+    with pytest.raises(ValueError):
+        pipeline.check_stages([pipeline.stage("b", None, after=["a"]), pipeline.stage("a", None)])
+    assert pipeline.downstream([pipeline.stage("a", None), pipeline.stage("b", None, after=["a"]),
+                                pipeline.stage("c", None)], ["a"]) == ["a", "b"]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the query service indexes, reloads and HTTP endpoints."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import json
+
+import pytest
+import requests
+
+import query_service
+
+AUTHORS = {
+    "Tapolcai János": {"dblp_url": "/33/44", "institution": "BME", "category": "applied", "works": "Hungary"},
+    "Rónyai Lajos": {"dblp_url": "/11/22", "institution": "SZTAKI", "category": "theory", "works": "Hungary"},
+}
+PAPERS = {
+    "A*": {
+        "conf/infocom/T15": {"title": "Failure Localization", "venue": "INFOCOM", "year": "2015",
+                             "authors": [["János Tapolcai", "33/44"], ["Lajos Rónyai", "11/22"], ["Pin-Han Ho", "55/66"]],
+                             "classfiied": ["BME", "SZTAKI", "international", "applied"]},
+        "conf/sigcomm/T20": {"title": "Fast Reroute", "venue": "SIGCOMM", "year": "2020",
+                             "authors": [["János Tapolcai", "33/44"]], "classfiied": ["BME", "all_hungarian"]},
+    },
+    "A": {
+        "conf/icc/R18": {"title": "Graph Coloring", "venue": "ICC", "year": "2018",
+                         "authors": [["Lajos Rónyai", "11/22"], ["Anna Kiss", ""]],
+                         "classfiied": ["SZTAKI", "mostly_hungarian", "theory"]},
+    },
+}
+CORE_TABLE = "Name,Acronym,YearsListed,dblp_venue,mta_class\n" \
+             "IEEE Conference on Computer Communications,INFOCOM;INFOCOMM,\"CORE2018_A*, CORE2023_A*\",conf/infocom,1\n"
+
+
+def _write(results_dir, authors=AUTHORS, papers=PAPERS):
+    with open(os.path.join(results_dir, "full_authors_data.json"), "w", encoding="utf-8") as f:
+        json.dump(authors, f)
+    for rank in query_service.PAPER_RANKS:
+        name = "hungarian_papers_core{}.json".format(rank.replace("*", "star"))
+        with open(os.path.join(results_dir, name), "w", encoding="utf-8") as f:
+            json.dump(papers.get(rank, {}), f)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    _write(str(tmp_path))
+    core_table = tmp_path / "core_table.csv"
+    core_table.write_text(CORE_TABLE, encoding="utf-8")
+    return str(tmp_path), str(core_table)
+
+
+@pytest.fixture
+def index(paths):
+    return query_service.QueryIndex(*paths)
+
+
+def _keys(result):
+    return [p["key"] for p in result["papers"]]
+
+
+def test_years():
+    assert list(query_service._years("2018-2020")) == [2018, 2019, 2020]
+    assert list(query_service._years("2022")) == [2022]
+    with pytest.raises(ValueError):
+        query_service._years("recent")
+
+
+def test_papers(index):
+    assert _keys(index.query_papers({})) == ["conf/sigcomm/T20", "conf/icc/R18", "conf/infocom/T15"]
+    assert _keys(index.query_papers({"author": "tapolcai janos"})) == ["conf/sigcomm/T20", "conf/infocom/T15"]
+    assert _keys(index.query_papers({"pid": "11/22", "rank": "astar"})) == ["conf/infocom/T15"]
+    assert _keys(index.query_papers({"institution": "sztaki", "year": "2016-2020"})) == ["conf/icc/R18"]
+    assert _keys(index.query_papers({"collaboration": "all_hungarian"})) == ["conf/sigcomm/T20"]
+    assert _keys(index.query_papers({"category": "theory"})) == ["conf/icc/R18"]
+    assert index.query_papers({"author": "Nobody"})["count"] == 0
+    result = index.query_papers({"limit": "1", "offset": "1"})
+    assert result["count"] == 3 and _keys(result) == ["conf/icc/R18"]
+    # the DBLP names of the sheet authors are replaced with the sheet names
+    assert [a["name"] for a in index.query_papers({"rank": "A"})["papers"][0]["authors"]] == ["Rónyai Lajos", "Anna Kiss"]
+
+
+def test_count(index):
+    assert index.query_count({}) == {"count": 3, "by": "rank", "counts": {"A*": 2, "A": 1}}
+    assert index.query_count({"by": "institution"})["counts"] == {"BME": 2, "SZTAKI": 2}
+    assert index.query_count({"by": "year", "author": "Rónyai Lajos"})["counts"] == {"2015": 1, "2018": 1}
+    with pytest.raises(ValueError):
+        index.query_count({"by": "citations"})
+
+
+def test_author(index):
+    result = index.query_author({"name": "Tapolcai Janos"})
+    assert result["name"] == "Tapolcai János" and result["record"] == AUTHORS["Tapolcai János"]
+    assert (result["papers"], result["by_rank"], result["by_collaboration"]) == (
+        2, {"A*": 2}, {"international": 1, "all_hungarian": 1})
+    assert index.query_author({"pid": "https://dblp.org/pid/11/22"})["papers"] == 2
+    assert index.query_author({"name": "Nobody"}) is None
+
+
+def test_authors(index):
+    assert [r["name"] for r in index.query_authors({})["authors"]] == ["Rónyai Lajos", "Tapolcai János"]
+    assert [r["name"] for r in index.query_authors({"institution": "bme"})["authors"]] == ["Tapolcai János"]
+    result = index.query_authors({"collaboration": "international"})
+    assert [(r["name"], r["share"]) for r in result["authors"]] == [("Rónyai Lajos", 0.5), ("Tapolcai János", 0.5)]
+    assert index.query_authors({"collaboration": "international", "min_share": "0.6"})["count"] == 0
+
+
+def test_venue(index):
+    venue = index.query_venue({"acronym": "infocomm"})
+    assert venue["rank"] == "A*" and venue["history"] == ["CORE2018_A*", "CORE2023_A*"]
+    assert index.query_venue({"dblp": "conf/infocom"}) is venue
+    assert index.query_venue({"acronym": "ICC"}) is None
+    assert index.health()["venues"] == 2
+
+
+def test_reload_waits_for_a_stable_signature(paths, capsys):
+    results_dir, core_table = paths
+    service = query_service.QueryService(results_dir, core_table)
+    old = service.index
+    assert service.reload_if_changed() == service.signature
+
+    _write(results_dir, papers={"A": PAPERS["A"]})
+    pending = service.reload_if_changed()
+    assert service.index is old
+    service.reload_if_changed(pending)
+    assert service.index is not old and len(service.index.papers) == 1
+    assert "Reloaded 1 papers" in capsys.readouterr().out
+
+
+def test_http_endpoints(paths):
+    server = query_service.start_server(query_service.QueryService(*paths))
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        result = requests.get(url + "/count", params={"institution": "BME", "by": "year"}, timeout=5).json()
+        assert result["counts"] == {"2020": 1, "2015": 1} and "ms" in result
+        assert requests.get(url + "/health", timeout=5).json()["papers"] == 3
+        assert requests.get(url + "/author", params={"name": "Nobody"}, timeout=5).status_code == 404
+        assert requests.get(url + "/count", params={"by": "citations"}, timeout=5).status_code == 400
+        assert requests.get(url + "/papers", params={"year": "recent"}, timeout=5).status_code == 400
+        assert requests.get(url + "/missing", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
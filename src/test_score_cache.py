@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the per-author score cache."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import pytest
+
+import score_cache
+from io_utils import write_json
+
+# DBLP person record of Kiss Anna: one paper with Nagy Béla
+DBLP_RECORD = {"dblpperson": {"@pid": "1/1", "r": [
+    {"inproceedings": {"author": [{"#text": "Anna Kiss", "@pid": "1/1"}, {"#text": "Béla Nagy", "@pid": "2/2"}]}},
+]}}
+
+
+def _authors():
+    return {
+        "Kiss Anna": {"dblp_url": "/1/1", "mtmt_id": "11", "location": ["Hungary 2000-"], "institution": "BME"},
+        "Nagy Béla": {"dblp_url": "/2/2", "mtmt_id": "", "location": ["Hungary 2010-"], "institution": "ELTE"},
+        "Tóth Csaba": {"dblp_url": "/3/3", "mtmt_id": "", "location": ["Hungary 2010-"], "institution": "SZTE"},
+    }
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("dblp")
+    os.makedirs("results")
+    write_json(os.path.join("dblp", "Kiss_Anna.json"), DBLP_RECORD)
+    return tmp_path
+
+
+class _Scorer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, name, data):
+        self.calls.append(name)
+        data["Core A* equivalent"] = len(self.calls)
+
+
+def _score(authors, scorer, cache):
+    return score_cache.score_author("Kiss Anna", authors["Kiss Anna"], scorer, cache,
+                                    score_cache.global_digest(), score_cache.classification_map(authors))
+
+
+def test_classification_map():
+    assert score_cache.classification_map(_authors())["/2/2"] == [["Hungary 2010-"], "ELTE", "", ""]
+    assert score_cache.classification_map({"X": {"dblp_url": ""}}) == {}
+
+
+def test_coauthor_pids(workdir):
+    assert score_cache.coauthor_pids(os.path.join("dblp", "Kiss_Anna.json"), "digest") == {"/1/1", "/2/2"}
+
+
+def test_stored_fields_are_reused(workdir):
+    authors, scorer, cache = _authors(), _Scorer(), {}
+    assert _score(authors, scorer, cache) is False
+    assert cache["Kiss Anna"]["fields"] == {"Core A* equivalent": 1}
+
+    # a fresh sheet with a stale value gets the stored one back
+    authors = _authors()
+    assert _score(authors, scorer, cache) is True
+    assert authors["Kiss Anna"]["Core A* equivalent"] == 1
+    assert scorer.calls == ["Kiss Anna"]
+
+
+def test_save_and_load(workdir):
+    cache = {}
+    _score(_authors(), _Scorer(), cache)
+    score_cache.save_score_cache(cache)
+    assert score_cache.load_score_cache() == cache
+    with open(score_cache.SCORE_CACHE_PATH, "w", encoding="utf-8") as f:
+        f.write("[1, 2")
+    assert score_cache.load_score_cache() == {}
+
+
+def test_unrelated_sheet_edit_keeps_the_score(workdir):
+    authors, scorer, cache = _authors(), _Scorer(), {}
+    _score(authors, scorer, cache)
+    authors["Tóth Csaba"]["institution"] = "ELTE"
+    assert _score(authors, scorer, cache) is True
+
+
+def test_coauthor_edit_rescores(workdir):
+    authors, scorer, cache = _authors(), _Scorer(), {}
+    _score(authors, scorer, cache)
+    authors["Nagy Béla"]["location"] = ["Austria 2010-"]
+    assert _score(authors, scorer, cache) is False
+    assert authors["Kiss Anna"]["Core A* equivalent"] == 2
+
+
+def test_own_row_and_dblp_record_changes_rescore(workdir):
+    authors, scorer, cache = _authors(), _Scorer(), {}
+    _score(authors, scorer, cache)
+    authors["Kiss Anna"]["mtmt_id"] = "12"
+    assert _score(authors, scorer, cache) is False
+    write_json(os.path.join("dblp", "Kiss_Anna.json"), {"dblpperson": {"@pid": "1/1", "r": []}})
+    assert _score(authors, scorer, cache) is False
+    assert scorer.calls == ["Kiss Anna"] * 3
+
+
+def test_without_dblp_record_nothing_is_stored(workdir):
+    os.remove(os.path.join("dblp", "Kiss_Anna.json"))
+    authors, scorer, cache = _authors(), _Scorer(), {}
+    assert _score(authors, scorer, cache) is False
+    assert cache == {}
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Offline tests of the full-text paper search."""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import json
+
+import pytest
+
+import title_search
+from author_directory import AuthorDirectory
+
+DIRECTORY = AuthorDirectory({"Rónyai Lajos": {"dblp_url": "https://dblp.org/pid/11/22"},
+                             "Tapolcai János": {"dblp_url": "https://dblp.org/pid/33/44"}})
+PAPERS = {
+    "A*": {
+        "conf/infocom/TapolcaiRH15": {
+            "title": "Network Coding Based Failure Localization", "venue": "INFOCOM", "year": "2015",
+            "authors": [["János Tapolcai", "33/44"], ["Lajos Rónyai", "11/22"], ["Pin-Han Ho", "55/66"]],
+            "classfiied": ["BME", "SZTAKI", "international"], "ee": "https://doi.org/10.1/a"},
+        # titles with markup are dicts in the DBLP records
+        "conf/sigcomm/Tapolcai20": {
+            "title": {"text": "Fast Reroute with Network Coding", "i": "Reroute"}, "venue": "SIGCOMM", "year": "2020",
+            "authors": [["János Tapolcai", "33/44"]], "classfiied": ["BME", "all_hungarian"]},
+    },
+    "A": {
+        "conf/icc/Ronyai18": {
+            "title": "Coding Theory of Graph Coloring", "venue": "ICC", "year": "2018",
+            "authors": [["Lajos Rónyai", "11/22"], ["Anna Kiss", ""]], "classfiied": ["SZTAKI", "mostly_hungarian"]},
+    },
+}
+
+
+def _write_papers(results_dir, papers=PAPERS):
+    for rank, path in zip(title_search.SEARCH_RANKS, title_search.paper_files(str(results_dir))):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(papers.get(rank, {}), f)
+
+
+@pytest.fixture
+def index(tmp_path):
+    _write_papers(tmp_path)
+    return title_search.build_index(str(tmp_path), DIRECTORY)
+
+
+def _keys(result):
+    return [hit["key"] for hit in result["hits"]]
+
+
+def test_tokenize():
+    assert title_search.tokenize("Rónyai, Lajos: k-Means++ (2nd)") == ["ronyai", "lajos", "k", "means", "2nd"]
+
+
+def test_parse_query():
+    terms, filters = title_search.parse_query(
+        '"Network Coding" author:rónyai k-means title:"failure localization" rank:A* year:2015-2024')
+    assert terms == [
+        (["title", "author", "venue"], ["network", "coding"]),
+        (["author"], ["ronyai"]),
+        (["title", "author", "venue"], ["k"]),
+        (["title", "author", "venue"], ["means"]),
+        (["title"], ["failure", "localization"]),
+    ]
+    assert filters == {"rank": "A*", "year": "2015-2024"}
+
+
+def test_parse_query_unknown_field():
+    with pytest.raises(ValueError):
+        title_search.parse_query("journal:ton")
+
+
+def test_build_index(index):
+    assert len(index) == 3
+    assert index.doc(0) == {"key": "conf/infocom/TapolcaiRH15", "rank": "A*", "title": "Network Coding Based Failure Localization",
+                            "venue": "INFOCOM", "year": 2015, "authors": ["Tapolcai János", "Rónyai Lajos", "Pin-Han Ho"],
+                            "ee": "https://doi.org/10.1/a", "institutions": ["BME", "SZTAKI"]}
+    assert index.doc(1)["title"] == "Fast Reroute with Network Coding"
+
+
+def test_words_and_phrases(index):
+    assert index.search("coding")["count"] == 3
+    assert _keys(index.search("graph coding")) == ["conf/icc/Ronyai18"]
+    assert index.search('"graph coding"')["count"] == 0
+    assert _keys(index.search('"coding theory"')) == ["conf/icc/Ronyai18"]
+    assert _keys(index.search("reroute")) == ["conf/sigcomm/Tapolcai20"]
+
+
+def test_ties_are_ordered_newest_first(index):
+    result = index.search('"network coding"')
+    assert _keys(result) == ["conf/sigcomm/Tapolcai20", "conf/infocom/TapolcaiRH15"]
+    assert result["hits"][0]["score"] == result["hits"][1]["score"]
+
+
+def test_author_field(index):
+    # the shorter author field of the single-author paper ranks first
+    assert _keys(index.search("author:tapolcai")) == ["conf/sigcomm/Tapolcai20", "conf/infocom/TapolcaiRH15"]
+    assert index.search("author:ronyai")["count"] == 2
+    assert _keys(index.search('author:"tapolcai janos"')) == ["conf/sigcomm/Tapolcai20", "conf/infocom/TapolcaiRH15"]
+    # a phrase does not run from one author into the next
+    assert index.search('author:"janos ronyai"')["count"] == 0
+    assert index.search("title:tapolcai")["count"] == 0
+    assert _keys(index.search("localization author:ho")) == ["conf/infocom/TapolcaiRH15"]
+
+
+def test_filters_and_facets(index):
+    result = index.search("coding year:2016-2020")
+    assert _keys(result) == ["conf/sigcomm/Tapolcai20", "conf/icc/Ronyai18"]
+    assert result["facets"] == {"rank": {"A*": 1, "A": 1}, "year": {2020: 1, 2018: 1}, "institution": {"BME": 1, "SZTAKI": 1}}
+    assert _keys(index.search("ronyai rank:A")) == ["conf/icc/Ronyai18"]
+    assert _keys(index.search("coding", rank="astar", year="2015")) == ["conf/infocom/TapolcaiRH15"]
+    assert _keys(index.search("venue:sigcomm")) == ["conf/sigcomm/Tapolcai20"]
+
+    result = index.search("institution:sztaki")
+    assert _keys(result) == ["conf/icc/Ronyai18", "conf/infocom/TapolcaiRH15"]
+    assert result["facets"]["institution"] == {"SZTAKI": 2, "BME": 1}
+
+
+def test_limit(index):
+    result = index.search("coding", limit=1)
+    assert result["count"] == 3 and len(result["hits"]) == 1
+
+
+def test_save_and_load(tmp_path, index):
+    path = str(tmp_path / "title_index.pickle")
+    title_search.save_index(index, path)
+    loaded = title_search.load_index(path, str(tmp_path))
+    assert loaded.columns == index.columns
+    assert loaded.search('"network coding"') == index.search('"network coding"')
+
+    # a changed paper file rebuilds the index
+    _write_papers(tmp_path, {"A": PAPERS["A"]})
+    assert len(title_search.load_index(path, str(tmp_path))) == 1
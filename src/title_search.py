@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""Full-text search over the classified Hungarian papers.
+
+An inverted index over the title, author and venue of every paper in
+results/hungarian_papers_core*.json (all ranks). Tokens are accent-folded
+and lower-cased; every posting keeps the token positions, so quoted phrases
+are matched exactly. Hits are ranked with BM25 (per field, weighted by
+FIELD_WEIGHTS) and every result comes with facet counts by rank, year and
+institution.
+
+The index is saved to results/title_index.pickle (packed postings, see
+SearchIndex) together with the size and mtime of the paper files;
+load_index() rebuilds it only when they changed.
+
+Query syntax: words (all must match), "quoted phrases", field:word or
+field:"phrase" (fields: title, author, venue) and the filters rank:A*,
+year:2020 or year:2018-2022, institution:BME.
+
+Usage:
+    python src/title_search.py [--limit N] [--json] [--rebuild] query...
+    python src/title_search.py '"graph coloring"' author:kovacs year:2015-2024
+"""
+import sys, os
+_parent = os.path.dirname(os.path.dirname(__file__))
+_src = os.path.dirname(__file__)
+if _parent not in sys.path: sys.path.insert(0, _parent)
+if _src not in sys.path: sys.path.insert(0, _src)
+
+import argparse
+import json
+import math
+import pickle
+import re
+import time
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from unidecode import unidecode
+
+import author_directory
+from io_utils import RESULTS_DIR, json_file, read_json
+
+INDEX_PATH = os.path.join(RESULTS_DIR, "title_index.pickle")
+# bump when the index layout or the tokenizer changes
+INDEX_VERSION = 2
+SEARCH_RANKS = ["A*", "A", "B", "C", "no_rank"]
+FIELD_WEIGHTS = {"title": 1.0, "author": 1.5, "venue": 0.5}
+FILTERS = ["rank", "year", "institution"]
+DOC_COLUMNS = ["key", "rank", "title", "venue", "year", "authors", "ee", "institutions"]
+ITEMSIZE = array("I").itemsize
+# paper labels that are not institutions (as in paper_cube)
+NON_INSTITUTION_LABELS = {"international", "mostly_hungarian", "all_hungarian", "theory", "applied"}
+# position gap between author names, so that a phrase does not match across two authors
+AUTHOR_GAP = 10
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_QUERY = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(unidecode(str(text)).lower())
+
+
+def paper_files(results_dir: str = RESULTS_DIR) -> List[str]:
+    return [os.path.join(results_dir, "hungarian_papers_core{}.json".format(rank.replace("*", "star"))) for rank in SEARCH_RANKS]
+
+
+def source_signature(results_dir: str = RESULTS_DIR) -> List:
+    """(path, size, mtime) of the paper files the index was built from."""
+    sig = []
+    for path in paper_files(results_dir):
+        actual = json_file(path)
+        st = os.stat(actual) if actual else None
+        sig.append((os.path.basename(actual or path), st.st_size if st else None, st.st_mtime_ns if st else None))
+    return sig
+
+
+def _array(raw: bytes) -> array:
+    a = array("I")
+    a.frombytes(raw)
+    return a
+
+
+class SearchIndex:
+    """Compact positional index of the papers.
+
+    postings: {field: {token: (docs, offsets, positions)}}, three packed
+    array("I") byte strings; the positions of docs[i] are
+    positions[offsets[i]:offsets[i + 1]]. The paper fields are stored column
+    by column (DOC_COLUMNS). Both load as a few large objects, so unpickling
+    takes milliseconds; the arrays of a token are unpacked when it is queried.
+    """
+
+    def __init__(self, columns: Dict[str, List], postings: Dict[str, Dict[str, Tuple[bytes, bytes, bytes]]],
+                 lengths: Dict[str, bytes], signature: Optional[List] = None):
+        self.columns = columns
+        self.postings = postings
+        self.lengths = {f: _array(raw) for f, raw in lengths.items()}
+        self.signature = signature
+        self.avg_length = {f: (sum(n) / len(n) if n else 0.0) for f, n in self.lengths.items()}
+
+    def __len__(self):
+        return len(self.columns["key"])
+
+    def doc(self, i: int) -> Dict:
+        d = {c: self.columns[c][i] for c in DOC_COLUMNS}
+        d["authors"] = d["authors"].split("\n") if d["authors"] else []
+        d["institutions"] = d["institutions"].split("\n") if d["institutions"] else []
+        return d
+
+    # --- matching ---
+    def _idf(self, field: str, token: str) -> float:
+        entry = self.postings[field].get(token)
+        df = len(entry[0]) // ITEMSIZE if entry else 0
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def _match(self, field: str, tokens: List[str]) -> Dict[int, int]:
+        """{doc: number of occurrences} of the token sequence in the field."""
+        entries = [self.postings[field].get(t) for t in tokens]
+        if not tokens or any(e is None for e in entries):
+            return {}
+        lists = [tuple(_array(raw) for raw in e) for e in entries]
+        docs, offsets, positions = lists[0]
+        if len(tokens) == 1:
+            return {doc: offsets[i + 1] - offsets[i] for i, doc in enumerate(docs)}
+        rest = [{doc: set(pos[off[i]:off[i + 1]]) for i, doc in enumerate(ds)} for ds, off, pos in lists[1:]]
+        found = {}
+        for i, doc in enumerate(docs):
+            if not all(doc in r for r in rest):
+                continue
+            n = sum(1 for p in positions[offsets[i]:offsets[i + 1]]
+                    if all(p + k + 1 in rest[k][doc] for k in range(len(rest))))
+            if n:
+                found[doc] = n
+        return found
+
+    def _score_term(self, fields: List[str], tokens: List[str]) -> Dict[int, float]:
+        """BM25 score of one word or phrase, summed over the fields it is searched in."""
+        scores = defaultdict(float)
+        for field in fields:
+            idf = sum(self._idf(field, t) for t in tokens)
+            avg = self.avg_length[field] or 1.0
+            lengths = self.lengths[field]
+            for doc, tf in self._match(field, tokens).items():
+                norm = 1 - BM25_B + BM25_B * lengths[doc] / avg
+                scores[doc] += FIELD_WEIGHTS[field] * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        return scores
+
+    def _institutions(self, doc: int) -> List[str]:
+        raw = self.columns["institutions"][doc]
+        return raw.split("\n") if raw else []
+
+    def search(self, query: str, rank: Optional[str] = None, year: Optional[str] = None,
+               institution: Optional[str] = None, limit: int = 20) -> Dict:
+        """Ranked hits of the query with facet counts by rank, year and institution.
+
+        year is a year or an inclusive range ('2018-2022'); ValueError for an unknown field or a bad year.
+        """
+        terms, filters = parse_query(query)
+        rank = filters.get("rank", rank)
+        year = filters.get("year", year)
+        institution = filters.get("institution", institution)
+        rank = "A*" if rank and rank.lower() == "astar" else rank
+        years = None
+        if year:
+            first, _, last = str(year).partition("-")
+            years = range(int(first), int(last or first) + 1)
+
+        scores = None
+        for fields, tokens in terms:
+            term_scores = self._score_term(fields, tokens)
+            if scores is None:
+                scores = dict(term_scores)
+            else:
+                scores = {doc: s + term_scores[doc] for doc, s in scores.items() if doc in term_scores}
+            if not scores:
+                break
+        if scores is None:  # only filters: every paper, newest first
+            scores = dict.fromkeys(range(len(self)), 0.0)
+        ranks, years_col = self.columns["rank"], self.columns["year"]
+        hits = list(scores)
+        if rank:
+            hits = [doc for doc in hits if ranks[doc] == rank]
+        if years:
+            hits = [doc for doc in hits if years_col[doc] in years]
+        if institution:
+            key = author_directory.name_key(institution)
+            hits = [doc for doc in hits if key in {author_directory.name_key(i) for i in self._institutions(doc)}]
+        hits.sort(key=lambda doc: (-scores[doc], -(years_col[doc] or 0), doc))
+
+        facets = {"rank": Counter(), "year": Counter(), "institution": Counter()}
+        for doc in hits:
+            facets["rank"][ranks[doc]] += 1
+            facets["year"][years_col[doc]] += 1
+            facets["institution"].update(self._institutions(doc))
+        return {"count": len(hits),
+                "hits": [dict(self.doc(doc), score=round(scores[doc], 3)) for doc in hits[:limit]],
+                "facets": {name: dict(c.most_common()) for name, c in facets.items()}}
+
+
+def parse_query(query: str) -> Tuple[List[Tuple[List[str], List[str]]], Dict[str, str]]:
+    """([(fields, tokens), ...], {filter: value}); a phrase is one term with several tokens."""
+    terms, filters = [], {}
+    for field, fphrase, field2, fword, phrase, word in _QUERY.findall(query):
+        field = (field or field2).lower()
+        text = fphrase or fword or phrase or word
+        if field in FILTERS:
+            filters[field] = text
+            continue
+        if field and field not in FIELD_WEIGHTS:
+            raise ValueError(f"Unknown field: {field} (fields: {', '.join(list(FIELD_WEIGHTS) + FILTERS)})")
+        fields = [field] if field else list(FIELD_WEIGHTS)
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        if phrase or fphrase:
+            terms.append((fields, tokens))
+        else:  # words split by the tokenizer (e.g. 'k-means') still have to match all parts
+            terms.extend((fields, [t]) for t in tokens)
+    return terms, filters
+
+
+def title_text(title) -> str:
+    """DBLP titles with markup are parsed into dicts; keep their text as classify_paper does."""
+    if isinstance(title, dict):
+        title = title.get("text") or title.get("#text", "")
+    return title if isinstance(title, str) else ""
+
+
+def load_directory(results_dir: str = RESULTS_DIR) -> author_directory.AuthorDirectory:
+    """AuthorDirectory over results/full_authors_data.json (empty if it is missing)."""
+    path = os.path.join(results_dir, "full_authors_data.json")
+    return author_directory.AuthorDirectory(read_json(path) if json_file(path) else None)
+
+
+def build_index(results_dir: str = RESULTS_DIR, directory: Optional[author_directory.AuthorDirectory] = None) -> SearchIndex:
+    """Index the papers of every rank; author names are resolved with directory (default: load_directory)."""
+    directory = load_directory(results_dir) if directory is None else directory
+    signature = source_signature(results_dir)
+    columns = {c: [] for c in DOC_COLUMNS}
+    postings = {f: defaultdict(lambda: (array("I"), array("I", [0]), array("I"))) for f in FIELD_WEIGHTS}
+    lengths = {f: array("I") for f in FIELD_WEIGHTS}
+    doc = 0
+    for rank, path in zip(SEARCH_RANKS, paper_files(results_dir)):
+        papers = read_json(path) if json_file(path) else {}
+        for key, paper in papers.items():
+            try:
+                year = int(paper.get("year"))
+            except (TypeError, ValueError):
+                year = None
+            names = []
+            author_tokens = []
+            for author, pid in paper.get("authors", []):
+                name = directory.name_for_pid(pid, author) if pid else author
+                names.append(name)
+                if author_tokens:
+                    author_tokens.extend([None] * AUTHOR_GAP)
+                # the sheet name and the DBLP name (they can differ in order and accents)
+                name_tokens = tokenize(name)
+                author_tokens.extend(name_tokens + [t for t in tokenize(author) if t not in name_tokens])
+            title = title_text(paper.get("title", ""))
+            values = {"key": key, "rank": rank, "title": title, "venue": paper.get("venue", ""),
+                      "year": year, "authors": "\n".join(names), "ee": paper.get("ee", ""),
+                      "institutions": "\n".join(c for c in paper.get("classfiied") or [] if c not in NON_INSTITUTION_LABELS)}
+            for c in DOC_COLUMNS:
+                columns[c].append(values[c])
+            fields = {"title": tokenize(title), "author": author_tokens,
+                      "venue": tokenize(paper.get("venue", "")) + tokenize(paper.get("crossref") or "")}
+            for field, tokens in fields.items():
+                positions = defaultdict(list)
+                for pos, token in enumerate(tokens):
+                    if token is not None:
+                        positions[token].append(pos)
+                for token, pos in positions.items():
+                    docs, offsets, flat = postings[field][token]
+                    docs.append(doc)
+                    flat.extend(pos)
+                    offsets.append(len(flat))
+                lengths[field].append(sum(1 for t in tokens if t is not None))
+            doc += 1
+    packed = {f: {t: tuple(a.tobytes() for a in arrays) for t, arrays in p.items()} for f, p in postings.items()}
+    return SearchIndex(columns, packed, {f: a.tobytes() for f, a in lengths.items()}, signature)
+
+
+def save_index(index: SearchIndex, path: Optional[str] = None) -> str:
+    path = path or INDEX_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": INDEX_VERSION, "itemsize": ITEMSIZE, "signature": index.signature, "columns": index.columns,
+                     "postings": index.postings, "lengths": {f: a.tobytes() for f, a in index.lengths.items()}},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    print(f"Saved search index ({len(index)} papers, {sum(len(p) for p in index.postings.values())} terms) to: {path}")
+    return path
+
+
+def load_index(path: Optional[str] = None, results_dir: str = RESULTS_DIR) -> SearchIndex:
+    """Load the saved index, or build and save it if it is missing or older than the paper files."""
+    path = path or INDEX_PATH
+    try:
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+        if (stored.get("version") == INDEX_VERSION and stored.get("itemsize") == ITEMSIZE
+                and stored.get("signature") == source_signature(results_dir)):
+            return SearchIndex(stored["columns"], stored["postings"], stored["lengths"], stored["signature"])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+    index = build_index(results_dir)
+    save_index(index, path)
+    return index
+
+
+def _print_results(result: Dict, seconds: float) -> None:
+    print(f"{result['count']} papers ({seconds * 1000:.1f} ms)")
+    for hit in result["hits"]:
+        print(f"{hit['score']:>7.2f}  {hit['year'] or '':<4}  {hit['rank']:<7} {hit['venue']:<12.12} {hit['title']}")
+        print(f"{'':>23}{', '.join(hit['authors'])}")
+    for name, counts in result["facets"].items():
+        if counts:
+            print(f"{name}: " + ", ".join(f"{k} ({v})" for k, v in list(counts.items())[:15]))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("query", nargs="*", help="search terms, see the module docstring for the syntax")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index even if it is up to date")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.rebuild:
+        save_index(build_index())
+    index = load_index()
+    loaded = time.perf_counter()
+    print(f"Index of {len(index)} papers loaded in {(loaded - started) * 1000:.1f} ms", file=sys.stderr)
+    if not args.query:
+        return 0
+    # keep quoted phrases given as one shell argument
+    query = " ".join(f'"{q}"' if " " in q and '"' not in q and ":" not in q else q for q in args.query)
+    try:
+        result = index.search(query, limit=args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_results(result, time.perf_counter() - loaded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
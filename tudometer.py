@@ -4,22 +4,31 @@ Tudometer - Main module for author record creation and paper counting
 Coordinates DBLP, MTMT, and MTA ATT data to build comprehensive author profiles.
 """
 import sys
+import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from collections import OrderedDict
 from typing import OrderedDict as TOrderedDict
-import pandas as pd
 
-# Import utility modules
+# Import utility modules (pandas and mta_att_utils are imported where they are needed)
 from src import dblp_utils
 from src import mtmt_utils
-from src import mta_att_utils
 from src import google_author_sheet 
-import run_every_day
 from src import classify_author
+from src import author_directory
+from src import affiliation_matcher
 from src import classify_paper
 
 
-def find_dblp_in_google_sheets(mtmt_id):
+def load_shared_state():
+    """Download the author sheet once and prepare the PID map and the author directory."""
+    authors_data = google_author_sheet.download_author_google_sheet()
+    classify_author.create_pid_to_name_map(authors_data)
+    author_directory.get_directory(authors_data)
+    return authors_data
+
+
+def find_dblp_in_google_sheets(mtmt_id, authors_data=None):
     # Load full_authors_data.json which contains all ranking fields
     # try:
     #     with open("results/full_authors_data.json", "r", encoding="utf-8") as f:
@@ -27,13 +36,9 @@ def find_dblp_in_google_sheets(mtmt_id):
     # except FileNotFoundError:
     #     # Fallback to downloading from Google Sheet (won't have ranking fields)
     #     print("Warning: results/full_authors_data.json not found, downloading from Google Sheet (ranking fields will be missing)")
-    authors_data = google_author_sheet.download_author_google_sheet()
-    classify_author.create_pid_to_name_map(authors_data)
-    
-    for author, data in authors_data.items():
-        if 'mtmt_id' in data and data['mtmt_id']!='' and int(data['mtmt_id'])==int(mtmt_id):
-            return author, data        
-    return None, None
+    if authors_data is None:
+        authors_data = load_shared_state()
+    return author_directory.get_directory(authors_data).get_by_mtmt_id(mtmt_id)
 
 
 def check_paper(paper_dict, first_author_pid, hungarian_affil, name_prefix, data, print_log=False, first_paper_year=None,last_paper_year=None):
@@ -141,6 +146,7 @@ def count_CORE_papers_by_author(author, data, dblp_record=None, print_log=False,
 
 def safe_get_value(row, key, default=''):
     """Safely get value from pandas Series, handling NaN and None."""
+    import pandas as pd
     if key not in row:
         return default
     val = row[key]
@@ -275,18 +281,8 @@ def add_mta_att_record(angol_nev, row,  mtmt_id, magyar_nev, data, dblp_record=N
     return False, data
 
 def get_mta_att_row(mtmt_id):
-    for output_file in ["vi_osztaly_tagok.csv","iii_osztaly_tagok.csv"]:
-        osztaly = pd.read_csv("inputs/"+output_file, encoding='utf-8-sig')
-        for idx, row in osztaly.iterrows():
-            if 'Publikációk' in row:
-                publikaciok = safe_get_value(row, 'Publikációk')
-                if publikaciok:
-                    try:
-                        if int(mtmt_id) == int(publikaciok):
-                            return row
-                    except (ValueError, TypeError):
-                        pass
-    return None
+    from src import mta_att_utils
+    return mta_att_utils.get_mta_att_row(mtmt_id)
 
 def categorize(val):
     theory_kw = ["matematik", "elmélet", "gráf", "logika", "kombinatórik","kombinatorik","tudomány","algoritmus","operációkutatás","geometria","algebra","theory","matematika","formális","statisztika"]
@@ -323,10 +319,7 @@ def location_of_affiliation(dblp_record,mtmt_record):
                         continue
                 else:
                     dblp_affiliations=f"{affil}"
-                if "budapest" in affil or "hungary" in affil or "magyarország" in affil or "szeged" in affil or "egyetem" in affil or "renyi" in affil:
-                    return dblp_affiliations,"hungary"
-                else:
-                    return dblp_affiliations,"abroad"
+                return dblp_affiliations,affiliation_matcher.location_of(affil)
     return dblp_affiliations,""
 
 def build_author_record(mtmt_record, pub_rec,dblp_record):
@@ -485,15 +478,14 @@ def print_author_hu(name, data: dict):
         for k in remaining_keys:
             print(f"{k}: {format_value(k, data[k])}")
 
-if __name__ == "__main__":
-    # for debugging
-    mtmt_id = 10017593
-    #mtmt_id = 10028156
+def resolve_and_score(mtmt_id, authors_data):
+    """Build (or refresh) the record of one MTMT id and count its CORE papers.
 
-    if len(sys.argv)>1:
-        mtmt_id = sys.argv[1]
-
-    author, data = find_dblp_in_google_sheets(mtmt_id)
+    authors_data is the already loaded sheet; an existing entry is updated in
+    place, the caller decides how the returned record is merged back.
+    Returns (name, record) or (None, None) if no DBLP record could be matched.
+    """
+    author, data = find_dblp_in_google_sheets(mtmt_id, authors_data)
     if author and data:
         print(f"DBLP azonosító a Google táblázatban: {author} - {data.get('dblp_url','N/A')}")
         # Preserve specific fields from Google Sheet if they exist (Category, MTMT Status, Works, Affiliations)
@@ -512,18 +504,99 @@ if __name__ == "__main__":
                     data[field] = existing_value
         record = data  # Use merged data as the record
     else:
-        print("Nincs DBLP azonosító a Google táblázatban, MTMT alapján keresünk...")
+        print(f"Nincs DBLP azonosító a Google táblázatban ({mtmt_id}), MTMT alapján keresünk...")
         record, dblp_person=create_record(str(mtmt_id))
     if record and "dblp_author_name" in record:
         name=record["dblp_author_name"]
+        return name, count_CORE_papers_by_author(name, record, dblp_person)
+    return None, None
+
+
+def read_mtmt_ids(args):
+    """Collect MTMT ids from the command line: plain ids or files with one id per line ('#' starts a comment)."""
+    ids = []
+    for arg in args:
+        if os.path.isfile(arg):
+            with open(arg, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.split("#")[0].strip()
+                    if line:
+                        ids.append(line)
+        else:
+            ids.append(arg)
+    # keep the order, drop duplicates
+    return list(dict.fromkeys(ids))
+
+
+def score_many(mtmt_ids, authors_data=None, max_workers=8, rescore_all=False, verbose=False):
+    """Batch mode: resolve and score many MTMT ids with one shared sheet/PID map.
+
+    The lookups (MTMT, DBLP, scoring) run in parallel threads; the results are
+    merged into authors_data and authors_data.csv / full_authors_data.json are
+    regenerated once at the end. Existing authors keep their sheet values
+    unless rescore_all is set.
+    """
+    if authors_data is None:
+        authors_data = load_shared_state()
+    # built here, not lazily from the worker threads
+    author_directory.get_directory(authors_data)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda mtmt_id: resolve_and_score(mtmt_id, authors_data), mtmt_ids))
+
+    scored = {}
+    for mtmt_id, (name, record) in zip(mtmt_ids, results):
+        if name is None:
+            print(f"⚠️ {mtmt_id}: nem sikerült a szerzőt azonosítani")
+            continue
+        scored[name] = record
+    directory = author_directory.get_directory(authors_data)
+    for name, record in scored.items():
+        directory.add(name, record)
+    if scored:
+        google_author_sheet.generate_author_google_sheet(authors_data, print_only=False, no_processing=not rescore_all)
+    for name in scored:
+        data = authors_data[name]
+        print(f"{name}: Core A* equivalent {data.get('Core A* equivalent', '')}, "
+              f"magyar {data.get('Hungarian Core A* equivalent', '')}, "
+              f"első szerzős {data.get('First Author Core A* equivalent', '')}")
+        if verbose:
+            print_author_hu(name, data)
+    print(f"Batch kész: {len(scored)}/{len(mtmt_ids)} szerző feldolgozva")
+    return scored
+
+
+if __name__ == "__main__":
+    if len(sys.argv)>1 and sys.argv[1]=="batch":
+        # python tudometer.py batch [--workers N] [--rescore-all] [--verbose] <mtmt_id|ids.txt> ...
+        args = sys.argv[2:]
+        workers = 8
+        if "--workers" in args:
+            i = args.index("--workers")
+            workers = int(args[i+1])
+            del args[i:i+2]
+        rescore_all = "--rescore-all" in args
+        verbose = "--verbose" in args
+        args = [a for a in args if a not in ("--rescore-all", "--verbose")]
+        score_many(read_mtmt_ids(args), max_workers=workers, rescore_all=rescore_all, verbose=verbose)
+        sys.exit(0)
+
+    # for debugging
+    mtmt_id = 10017593
+    #mtmt_id = 10028156
+
+    if len(sys.argv)>1:
+        mtmt_id = sys.argv[1]
+
+    authors_data = load_shared_state()
+    name, record = resolve_and_score(mtmt_id, authors_data)
+    if name:
         author_data={}
-        author_data[name] = count_CORE_papers_by_author(name, record, dblp_person)
-        authors_data=google_author_sheet.download_author_google_sheet()
+        author_data[name] = record
         if name not in authors_data:
             no_processing=False
         else:
             no_processing=True
-        authors_data[name]=author_data[name]
+        author_directory.get_directory(authors_data).add(name, author_data[name])
         # Generate CSV and JSON with ranking fields, then print the single author
         google_author_sheet.generate_author_google_sheet(authors_data, print_only=False, no_processing=no_processing)
         author_data[name]=authors_data[name] # copy back single author